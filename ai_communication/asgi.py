@@ -10,15 +10,26 @@ import os
 from django.core.asgi import get_asgi_application
 
 from channels.auth import AuthMiddlewareStack
-from channels.routing import ProtocolTypeRouter, URLRouter
-
-import app.routing
+from channels.routing import ChannelNameRouter, ProtocolTypeRouter, URLRouter
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_communication.settings")
 
 # Standard Django ASGI application (handles HTTP requests)
 django_asgi_app = get_asgi_application()
 
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+
+import app.routing  # noqa: E402
+from app.consumers import stt_spec, stt_tier_specs  # noqa: E402
+from app.services.model_registry import registry  # noqa: E402
+
+# Load the speech-to-text model(s) in the background so the server accepts
+# connections right away and the first session does not pay the load
+if settings.SPEECH_TO_TEXT.get("WARM_UP", True):
+    for spec in stt_tier_specs or [stt_spec]:
+        registry.warm_up(spec)
+
 # Top-level ASGI application
 application = ProtocolTypeRouter(
     {
@@ -30,5 +41,7 @@ application = ProtocolTypeRouter(
                 app.routing.websocket_urlpatterns  # Load WebSocket routes from app
             )
         ),
+        # Transcription and feedback jobs for `manage.py runworker`
+        "channel": ChannelNameRouter(app.routing.channel_routes),
     }
 )
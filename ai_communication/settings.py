@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -125,8 +126,106 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Per-process overload protection for /ws/audio/ sessions (see
+# app/services/admission.py). The transcription queue is saturated once
+# MAX_QUEUE_DEPTH segments wait for a worker (with CHANNEL_WORKERS, once
+# that many jobs wait for a worker reply); POLICY is "reject" (refuse new
+# sessions), "drop" (keep only the newest pending utterance) or "coalesce"
+# (merge pending utterances into fewer decodes). 0 disables a limit.
+ADMISSION = {
+    "MAX_SESSIONS": int(os.getenv("ADMISSION_MAX_SESSIONS", "0")),
+    "MAX_QUEUE_DEPTH": int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "16")),
+    "POLICY": os.getenv("ADMISSION_POLICY", "coalesce"),
+    "MAX_PENDING_SECS": float(os.getenv("ADMISSION_MAX_PENDING_SECS", "30")),
+}
+
+# The in-memory layer only connects consumers of one process (development
+# and tests). Channel workers on other processes or nodes need a shared
+# backend, e.g. CHANNEL_LAYER_BACKEND=channels_redis.core.RedisChannelLayer
+# with CHANNEL_LAYER_URL=redis://host:6379/0.
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "BACKEND": os.getenv(
+            "CHANNEL_LAYER_BACKEND", "channels.layers.InMemoryChannelLayer"
+        ),
+        "CONFIG": (
+            {"hosts": [os.getenv("CHANNEL_LAYER_URL")], "capacity": 1000}
+            if os.getenv("CHANNEL_LAYER_URL")
+            else {"capacity": 1000}
+        ),
     }
 }
+
+# Background workers (`manage.py runworker stt-transcribe llm-feedback`).
+# When enabled, sessions publish transcription and feedback jobs on these
+# channels instead of running them in the WebSocket process.
+CHANNEL_WORKERS = {
+    "ENABLED": os.getenv("CHANNEL_WORKERS", "0") == "1",
+    "TRANSCRIBE_CHANNEL": "stt-transcribe",
+    "FEEDBACK_CHANNEL": "llm-feedback",
+    # Longest wait for the next worker reply once a session has ended;
+    # past it the session finishes with the transcripts received so far
+    "REPLY_TIMEOUT_SECS": float(os.getenv("CHANNEL_WORKERS_REPLY_TIMEOUT_SECS", "60")),
+}
+
+# OpenAI-compatible endpoint used for feedback generation.
+OPENAI = {
+    # Unset: sessions get no feedback
+    "API_KEY": os.getenv("OPENAI_API_KEY"),
+    "BASE_URL": os.getenv(
+        "OPENAI_BASE_URL", "https://aiportalapi.stu-platform.live/jpe"
+    ),
+    "MODEL": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+    # Per-request timeout, in-flight request cap and HTTP pool size (per process)
+    "TIMEOUT_SECS": float(os.getenv("OPENAI_TIMEOUT_SECS", "30")),
+    "MAX_CONCURRENCY": int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+    "MAX_CONNECTIONS": int(os.getenv("OPENAI_MAX_CONNECTIONS", "32")),
+    # Classify custom topics locally; below this score the model is asked.
+    # 0 disables the local router.
+    "TOPIC_ROUTER_MIN_SCORE": float(os.getenv("OPENAI_TOPIC_ROUTER_MIN_SCORE", "0.12")),
+    # Response cache: SQLite path (":memory:" = per process), size limit
+    # (0 disables the cache), entry lifetime, and cosine similarity for
+    # near-duplicate hits (0 = exact matches only)
+    "CACHE_PATH": os.getenv("OPENAI_CACHE_PATH", ":memory:"),
+    "CACHE_MAX_ENTRIES": int(os.getenv("OPENAI_CACHE_MAX_ENTRIES", "4096")),
+    "CACHE_TTL_SECS": float(os.getenv("OPENAI_CACHE_TTL_SECS", str(7 * 24 * 3600))),
+    "CACHE_SIMILARITY": float(os.getenv("OPENAI_CACHE_SIMILARITY", "0")),
+}
+
+# Speech-to-text engine used by the WebSocket consumer.
+# See app.services.engines.create_speech_to_text for the available keys.
+SPEECH_TO_TEXT = {
+    "ENGINE": os.getenv("STT_ENGINE", "whisper"),
+    "MODEL": os.getenv("STT_MODEL", "medium.en"),
+    "DEVICE": os.getenv("STT_DEVICE", "cuda"),
+    "COMPUTE_TYPE": os.getenv("STT_COMPUTE_TYPE", "int8"),
+    "NUM_PROCESSES": int(os.getenv("STT_NUM_PROCESSES", "0")) or None,
+    "THREADS_PER_PROCESS": int(os.getenv("STT_THREADS_PER_PROCESS", "0")) or None,
+    # Draft model for assisted (speculative) decoding with the "whisper"
+    # engine, e.g. "tiny.en" or "distil-whisper/distil-medium.en". Same
+    # transcripts, lower latency; check with `manage.py check_assisted_decoding`.
+    "ASSISTANT_MODEL": os.getenv("STT_ASSISTANT_MODEL", ""),
+    # Streaming mode sends partial text and commits words by local agreement.
+    "STREAMING": os.getenv("STT_STREAMING", "0") == "1",
+    "STREAM_STRIDE_SECS": float(os.getenv("STT_STREAM_STRIDE_SECS", "1.0")),
+    # Streaming re-decodes reuse the log-mel frames already computed for the
+    # utterance instead of recomputing them ("whisper" engine; other
+    # engines decode the audio as before).
+    "INCREMENTAL_FEATURES": os.getenv("STT_INCREMENTAL_FEATURES", "0") == "1",
+    # Models are loaded lazily; WARM_UP loads and exercises the model in the
+    # background when the ASGI app starts. Idle models are unloaded (least
+    # recently used first) once their estimated size exceeds the budget
+    # (0 = no limit).
+    "WARM_UP": os.getenv("STT_WARM_UP", "1") == "1",
+    "MEMORY_BUDGET_MB": int(os.getenv("STT_MEMORY_BUDGET_MB", "0")),
+    # ENGINE "remote" sends audio to the inference server started with
+    # `manage.py run_inference_server`, which runs SERVER_ENGINE with the
+    # model settings above; every web worker then shares one model copy.
+    "SOCKET_PATH": os.getenv("STT_SOCKET_PATH", "/tmp/ai_communication_stt.sock"),
+    "SERVER_ENGINE": os.getenv("STT_SERVER_ENGINE", "faster_whisper"),
+    # Model tiers, smallest first (e.g. "tiny.en,small.en,medium.en"): each
+    # batch is decoded by the largest one expected to clear the queued audio
+    # within LATENCY_TARGET_SECS. Empty = always MODEL.
+    "TIERS": [m for m in os.getenv("STT_TIERS", "").split(",") if m.strip()],
+    "LATENCY_TARGET_SECS": float(os.getenv("STT_LATENCY_TARGET_SECS", "2.0")),
+}
@@ -1,91 +1,566 @@
+import asyncio
+import json
+from typing import Optional
+
+from django.conf import settings
+
 import numpy as np
-import webrtcvad
 from channels.generic.websocket import AsyncWebsocketConsumer
 
-from app.services.whisper import Whisper
-from app.services.open_ai import AIUtilityClient
+from app.services import session_protocol as protocol
+from app.services.admission import CLOSE_OVERLOADED, AdmissionController
+from app.services.codecs import create_decoder, negotiate
+from app.services.features import IncrementalLogMel, n_mels_for
+from app.services.inference_server import encode_segments
+from app.services.metrics import ACTIVE_SESSIONS, QUEUE_DEPTH, STAGE_SECONDS
+from app.services.model_registry import ModelSpec, registry
+from app.services.model_tiers import ModelTier, TierSelector
+from app.services.open_ai import AsyncAIUtilityClient
+from app.services.response_cache import ResponseCache
+from app.services.segmenter import UtteranceSegmenter
+from app.services.speech_to_text import to_float32
+from app.services.streaming import LocalAgreementStreamer
+from app.services.topic_router import TopicRouter
+from app.services.transcription_scheduler import TranscriptionScheduler
+from app.services.vad import SpeechDetector
 
-import os
-# Initialize Whisper once (shared across clients)
-whisper = Whisper(model_name="medium.en", device="cuda")
+# The speech-to-text engine is shared across clients and loaded on first use
+# (or by the warm-up started in asgi.py), not when this module is imported
+registry.memory_budget_bytes = settings.SPEECH_TO_TEXT["MEMORY_BUDGET_MB"] * 2**20
+stt_spec = ModelSpec.from_config(settings.SPEECH_TO_TEXT)
+stt_engine = registry.engine(stt_spec)
+# Optional smaller/larger models chosen per batch from the current load
+stt_tier_specs = [
+    ModelSpec.from_config(dict(settings.SPEECH_TO_TEXT, MODEL=model.strip()))
+    for model in settings.SPEECH_TO_TEXT["TIERS"]
+]
+stt_tiers = (
+    TierSelector(
+        [ModelTier(spec.model, registry.engine(spec)) for spec in stt_tier_specs],
+        latency_target_secs=settings.SPEECH_TO_TEXT["LATENCY_TARGET_SECS"],
+    )
+    if stt_tier_specs
+    else None
+)
+# Decode on a worker thread so one transcription never blocks the event loop
+scheduler = TranscriptionScheduler(
+    stt_engine,
+    max_batch_size=8,  # segments from concurrent sessions decoded together
+    max_wait_secs=0.05,  # latency budget for filling a batch
+    tiers=stt_tiers,
+)
+QUEUE_DEPTH.set_function(lambda: scheduler.queue_depth)
+# Overload protection: session limit, per-session audio backlog budget and
+# what to do while the transcription queue is saturated
+admission = AdmissionController(
+    max_sessions=settings.ADMISSION["MAX_SESSIONS"],
+    max_queue_depth=settings.ADMISSION["MAX_QUEUE_DEPTH"],
+    policy=settings.ADMISSION["POLICY"],
+    max_pending_secs=settings.ADMISSION["MAX_PENDING_SECS"],
+)
 
 SAMPLE_RATE = 16000
-BUFFER_DURATION_SECS = 3  # accumulate 3 seconds of speech before transcribing
 VAD_MODE = 2  # 0=least aggressive, 3=most aggressive
-OVERLAP_SECS = 0.5  # keep last 0.5s to preserve short words
 RMS_THRESHOLD = 500  # adjust based on microphone input
+# Utterances end at natural pauses instead of every few seconds
+PADDING_MS = 300  # silence kept around each utterance
+HANGOVER_MS = 600  # pause that ends an utterance
+MIN_SPEECH_SECS = 0.3  # shorter voiced bursts are dropped as noise
+MAX_UTTERANCE_SECS = 15  # cut long monologues even without a pause
+# Streaming mode: re-decode the uncommitted window every STREAM_STRIDE_SECS,
+# send partial text and commit words two consecutive decodes agree on
+STREAMING = settings.SPEECH_TO_TEXT.get("STREAMING", False)
+STREAM_STRIDE_SECS = settings.SPEECH_TO_TEXT.get("STREAM_STRIDE_SECS", 1.0)
+# Streaming: keep log-mel frames per utterance so each re-decode only
+# computes the new 10 ms hops
+INCREMENTAL_FEATURES = settings.SPEECH_TO_TEXT.get("INCREMENTAL_FEATURES", False)
+# Channel-layer jobs handled by app.workers (see OffloadedAudioConsumer)
+TRANSCRIBE_CHANNEL = settings.CHANNEL_WORKERS["TRANSCRIBE_CHANNEL"]
+FEEDBACK_CHANNEL = settings.CHANNEL_WORKERS["FEEDBACK_CHANNEL"]
+REPLY_TIMEOUT_SECS = settings.CHANNEL_WORKERS.get("REPLY_TIMEOUT_SECS", 60.0)
+
+
+def _create_ai_client() -> Optional[AsyncAIUtilityClient]:
+    """The feedback client, or None (feedback off) without an API key."""
+    if not settings.OPENAI["API_KEY"]:
+        print("[WARN] OPENAI_API_KEY is not set: feedback is disabled")
+        return None
+    return AsyncAIUtilityClient(
+        settings.OPENAI["API_KEY"],
+        settings.OPENAI["BASE_URL"],
+        settings.OPENAI["MODEL"],
+        timeout_secs=settings.OPENAI["TIMEOUT_SECS"],
+        max_concurrency=settings.OPENAI["MAX_CONCURRENCY"],
+        max_connections=settings.OPENAI["MAX_CONNECTIONS"],
+        # Custom topics are classified locally when confident, saving a request
+        topic_router=(
+            TopicRouter(min_score=settings.OPENAI["TOPIC_ROUTER_MIN_SCORE"])
+            if settings.OPENAI["TOPIC_ROUTER_MIN_SCORE"] > 0
+            else None
+        ),
+        # Repeated answers are served from the cache instead of the API
+        response_cache=(
+            ResponseCache(
+                settings.OPENAI["CACHE_PATH"],
+                max_entries=settings.OPENAI["CACHE_MAX_ENTRIES"],
+                ttl_secs=settings.OPENAI["CACHE_TTL_SECS"],
+                similarity_threshold=settings.OPENAI["CACHE_SIMILARITY"],
+            )
+            if settings.OPENAI["CACHE_MAX_ENTRIES"] > 0
+            else None
+        ),
+    )
+
+
+# One async OpenAI client (and HTTP connection pool) shared by all sessions
+ai_client = _create_ai_client()
 
-API_KEY = "sk-YfSO3RgAtWp8-SBGwXva1w"
-BASE_URL = "https://aiportalapi.stu-platform.live/jpe"
-MODEL_NAME = "gpt-4o-mini"
 
 class AudioConsumer(AsyncWebsocketConsumer):
     async def connect(self) -> None:
-        await self.accept()
-        self.audio_buffer = b""  # per-client buffer
         self.transcribed_texts = []  # list to store texts
         self.final_text = []
-        self.ai_client = AIUtilityClient(API_KEY, BASE_URL, MODEL_NAME)
-        self.vad = webrtcvad.Vad()
-        self.vad.set_mode(VAD_MODE)
-        print("Client connected")
-
-    def _is_speech(self, audio_bytes: bytes) -> bool:
-        """Return True if any 30ms frame contains speech above RMS threshold."""
-        frame_duration_ms = 30
-        bytes_per_frame = int(SAMPLE_RATE * 2 * frame_duration_ms / 1000)  # 16-bit PCM
-
-        for i in range(0, len(audio_bytes), bytes_per_frame):
-            frame = audio_bytes[i : i + bytes_per_frame]
-            if len(frame) != bytes_per_frame:
-                continue
-
-            if self.vad.is_speech(frame, SAMPLE_RATE):
-                # Compute RMS to filter very low-energy noise
-                audio_np = np.frombuffer(frame, dtype=np.int16)
-                rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
-                if rms > RMS_THRESHOLD:
-                    return True
-        return False
+        # Session settings, set by the "start" control message
+        self.topic = protocol.CUSTOM_TOPIC
+        self.want_feedback = ai_client is not None
+        self.ended = False
+        self.streaming = STREAMING
+        self.active = False  # counted in the active sessions gauge
+        self.admitted = False  # holds an admission slot
+        # Utterances waiting for transcription, drained by backlog_task
+        self.backlog = admission.backlog()
+        self.backlog_task = None
+        self.segmenter = UtteranceSegmenter(
+            SpeechDetector(SAMPLE_RATE, VAD_MODE, RMS_THRESHOLD),
+            padding_ms=PADDING_MS,
+            hangover_ms=HANGOVER_MS,
+            min_speech_secs=MIN_SPEECH_SECS,
+            max_utterance_secs=MAX_UTTERANCE_SECS,
+        )
+        self.streamer = LocalAgreementStreamer(SAMPLE_RATE, STREAM_STRIDE_SECS)
+        self.mel = (
+            IncrementalLogMel(n_mels_for(stt_spec.model))
+            if INCREMENTAL_FEATURES and self.streaming
+            else None
+        )
+
+        # Audio format is negotiated as a subprotocol ("audio.opus" or
+        # "audio.pcm16"); clients that offer none send raw PCM16
+        offered = self.scope.get("subprotocols", [])
+        subprotocol = negotiate(offered)
+        if offered and subprotocol is None:
+            await self.close()
+            return
+        self.decoder = create_decoder(subprotocol)
+        await self.accept(subprotocol)
+        if not admission.try_admit(self._queue_depth()):
+            # Accepted first so the client can read why it is refused
+            self.ended = True
+            await self.send_event(protocol.ERROR, message="Server busy, try later")
+            await self.close(code=CLOSE_OVERLOADED)
+            print("Client refused, server overloaded")
+            return
+        self.admitted = True
+        self.active = True
+        ACTIVE_SESSIONS.inc()
+        print(f"Client connected ({self.decoder.subprotocol})")
+
+    async def send_event(self, event_type: str, **payload) -> None:
+        """Send a JSON event ({"type": ..., ...}) to the client."""
+        with STAGE_SECONDS.time(stage="ws_send"):
+            await self.send(text_data=json.dumps({"type": event_type, **payload}))
 
     async def receive(self, text_data=None, bytes_data=None) -> None:
-        if bytes_data:
-            # Append only if chunk contains real speech
-            if self._is_speech(bytes_data):
-                self.audio_buffer += bytes_data
-
-            # Transcribe if enough speech accumulated
-            min_bytes = SAMPLE_RATE * 2 * BUFFER_DURATION_SECS
-            if len(self.audio_buffer) >= min_bytes:
-                pcm16 = np.frombuffer(self.audio_buffer, dtype=np.int16)
-                text = whisper.transcribe(pcm16)
-
-                if text.strip():
-                    print("Transcribed:", text)
-                    self.transcribed_texts.append(text) #collect text
-                    await self.send(text_data=text)
-
-                # Keep last 0.5s for overlap to catch short words
-                overlap_bytes = int(SAMPLE_RATE * 2 * OVERLAP_SECS)
-                self.audio_buffer = self.audio_buffer[-overlap_bytes:]
+        if text_data is not None:
+            await self.receive_control(text_data)
+            return
+        if not bytes_data or self.ended:
+            return
+        try:
+            bytes_data = self.decoder.decode(bytes_data)
+        except ValueError as e:
+            # One bad packet costs its few milliseconds of audio, not the session
+            await self.send_event(protocol.ERROR, message=f"Audio dropped: {e}")
+            return
+        await self.receive_audio(bytes_data)
 
-    async def disconnect(self, code):
+    async def receive_audio(self, pcm: bytes) -> None:
+        """Segment decoded PCM16 audio and transcribe finished utterances."""
+        # Each completed utterance ends at a pause (or the max duration)
+        for utterance in self.segmenter.feed(pcm):
+            if self.streaming:
+                await self._finish_stream(utterance)
+            else:
+                self.backlog.push(utterance)
+        if not self.streaming:
+            # Transcribed in the background so audio keeps being read (and
+            # the backlog bounded) while the scheduler is busy
+            self._schedule_backlog()
+            return
+
+        utterance = self.segmenter.current()
+        if not self.segmenter.in_speech:
+            self.streamer.reset()  # utterance dropped as noise
+            if self.mel is not None:
+                self.mel.reset()
+        elif self.streamer.ready(len(utterance)) and not admission.skip_partial(
+            self._queue_depth()
+        ):
+            await self._stream_step(utterance)
+
+    async def receive_control(self, text_data: str) -> None:
+        """Handle a JSON control message (see session_protocol)."""
+        try:
+            message = protocol.parse_control(text_data)
+        except protocol.ProtocolError as e:
+            await self.send_event(protocol.ERROR, message=str(e))
+            return
+
+        if message["type"] == protocol.START:
+            self.topic = protocol.resolve_topic(message.get("topic"))
+            self.want_feedback = ai_client is not None and bool(
+                message.get("feedback", True)
+            )
+            await self.send_event(
+                protocol.ACK,
+                request=protocol.START,
+                topic=self.topic,
+                audio=self.decoder.subprotocol,
+                streaming=self.streaming,
+                feedback=self.want_feedback,
+            )
+        elif message["type"] == protocol.END and not self.ended:
+            await self.send_event(protocol.ACK, request=protocol.END)
+            await self.finish_session()
+
+    async def finish_session(self) -> None:
+        """
+        Flush the last utterance, send the final transcript and feedback,
+        then close. Runs while the socket is still open so nothing computed
+        here is thrown away.
+        """
+        self.ended = True
+        for utterance in self.segmenter.flush():
+            if self.streaming:
+                await self._finish_stream(utterance)
+            else:
+                self.backlog.push(utterance)
+        self.streamer.reset()
+        self._schedule_backlog()
+        if self.backlog_task is not None:
+            await self.backlog_task
+        await self.complete_session()
+
+    async def complete_session(self) -> None:
+        """Send the final transcript and the feedback, then close."""
         self.final_text = " ".join(self.transcribed_texts)
-        await self.get_feedback()
+        await self.send_event(protocol.FINAL_TRANSCRIPT, text=self.final_text)
+        if self.want_feedback and self.final_text.strip():
+            await self.get_feedback()
+        await self.close(code=1000)
+
+    def _schedule_backlog(self) -> None:
+        """Start draining the backlog unless a drain is already running."""
+        if self.backlog and (self.backlog_task is None or self.backlog_task.done()):
+            self.backlog_task = asyncio.create_task(self._drain_backlog())
+
+    def _queue_depth(self) -> int:
+        """Segments waiting for inference: the load admission control sees."""
+        return scheduler.queue_depth
+
+    async def _drain_backlog(self) -> None:
+        """Transcribe pending utterances in order, shed or merged while saturated."""
+        while True:
+            utterance = admission.next_utterance(self.backlog, self._queue_depth())
+            if utterance is None:
+                return
+            try:
+                await self._transcribe_utterance(utterance, self.backlog.last_popped)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Keep draining: finish_session still sends the final transcript
+                print("Transcription failed:", e)
+                await self.send_event(
+                    protocol.ERROR, message=f"Transcription failed: {e}"
+                )
+
+    async def _transcribe_utterance(self, utterance: np.ndarray, number: int) -> None:
+        """
+        Transcribe a complete utterance and send it as final text, tagged
+        with the number of the (last) utterance it covers.
+        """
+        result = await scheduler.submit(utterance)
+        text = result.text
+
+        if text.strip():
+            print(
+                f"Transcribed ({result.model or stt_spec.model}, "
+                f"wait {result.wait_secs:.2f}s, "
+                f"compute {result.compute_secs:.2f}s, "
+                f"queue {scheduler.queue_depth}):",
+                text,
+            )
+            self.transcribed_texts.append(text)  # collect text
+            await self.send_event(
+                protocol.TRANSCRIPT, text=text, final=True, utterance=number
+            )
+
+    async def _stream_step(self, utterance: np.ndarray) -> None:
+        """Re-decode the uncommitted window and send committed/partial text."""
+        window = self.streamer.window(utterance)
+        result = await scheduler.submit(
+            window, word_timestamps=True, features=self._features(utterance, window)
+        )
+        update = self.streamer.update(result.words)
+        if update.committed:
+            print("Committed:", update.committed)
+            self.transcribed_texts.append(update.committed)
+            await self.send_event(
+                protocol.TRANSCRIPT, text=update.committed, final=True
+            )
+        await self.send_event(protocol.TRANSCRIPT, text=update.partial, final=False)
+
+    async def _finish_stream(self, utterance: np.ndarray) -> None:
+        """Commit whatever is left of a completed utterance."""
+        window = self.streamer.window(utterance)
+        words = []
+        if len(window):
+            result = await scheduler.submit(
+                window, word_timestamps=True, features=self._features(utterance, window)
+            )
+            words = result.words
+        if self.mel is not None:
+            self.mel.reset()
+        update = self.streamer.finish(words)
+        if update.committed:
+            self.transcribed_texts.append(update.committed)
+        await self.send_event(protocol.TRANSCRIPT, text=update.committed, final=True)
+
+    def _features(self, utterance: np.ndarray, window: np.ndarray) -> np.ndarray | None:
+        """Log-mel features of `window`, the uncommitted tail of `utterance`."""
+        if self.mel is None:
+            return None
+        return self.mel.window(to_float32(utterance), len(utterance) - len(window))
+
+    async def disconnect(self, code):
+        if self.backlog_task is not None and not self.backlog_task.done():
+            self.backlog_task.cancel()
+        if self.admitted:
+            self.admitted = False
+            admission.release()
+        if self.active:
+            self.active = False
+            ACTIVE_SESSIONS.dec()
+        if not self.ended:
+            # Closed without "end": nobody is left to read a transcript or
+            # feedback, so skip the flush and the LLM call
+            print("Session abandoned, buffered audio dropped")
         print("Client disconnected")
 
     async def get_feedback(self):
+        # Forward feedback as it is generated: the first words show up after
+        # the time-to-first-token instead of the whole completion time
+        pieces = []
         try:
-            feedback = self.ai_client.generate_feedback(self.final_text, topic="custom_topic")
-            await self.send(text_data=f"[AI Feedback]: {feedback}")
+            async for delta in ai_client.stream_feedback(
+                self.final_text, topic=self.topic
+            ):
+                pieces.append(delta)
+                await self.send_event(protocol.FEEDBACK_DELTA, text=delta)
+            feedback = "".join(pieces)
+            await self.send_event(protocol.FEEDBACK_DONE, text=feedback)
             print(f"[AI Feedback]: {feedback}")
         except Exception as e:
             print("Error calling OpenAI:", e)
-            await self.send(text_data="[AI Feedback]: Error generating feedback")
+            await self.send_event(
+                protocol.FEEDBACK_DONE, text="Error generating feedback", error=True
+            )
             print("[AI Feedback]: Error generating feedback")
-            
 
 
+class OffloadedAudioConsumer(AudioConsumer):
+    """
+    AudioConsumer that runs no inference itself: each utterance and the
+    feedback request are published as channel-layer jobs for the
+    background workers in app.workers, which reply to this consumer's
+    channel name. The WebSocket processes only segment audio and relay
+    results, so inference scales with the number of workers.
+
+    Replies are handled as channel events (`transcribe_result`,
+    `feedback_delta`, `feedback_done`) rather than awaited, because a
+    consumer handles one message at a time. Streaming mode is not
+    offloaded; these sessions always transcribe whole utterances.
+
+    Once the client has ended the session, each reply must arrive within
+    REPLY_TIMEOUT_SECS of the previous one. Otherwise the workers are
+    taken for lost: the client gets an error event and the session
+    finishes with what was received.
+
+    Admission control sees the jobs of the process's sessions waiting for
+    a worker reply instead of the (unused) local scheduler queue.
+    """
+
+    jobs_in_flight = 0  # transcription jobs of this process awaiting a reply
+
+    async def connect(self) -> None:
+        self.pending = {}  # request id -> worker reply (None = waiting)
+        self.utterance_numbers = {}  # request id -> utterance number
+        self.next_utterance = 0
+        self.next_to_send = 0
+        self.awaiting_feedback = False
+        self.reply_timer = None  # deadline of the next reply, once ended
+        self.timeout_task = None
+        await super().connect()
+        self.streaming = False
+
+    async def disconnect(self, code):
+        self._stop_reply_timer()
+        if self.timeout_task is not None and not self.timeout_task.done():
+            self.timeout_task.cancel()
+        self._forget_jobs(self.pending)
+        self.pending.clear()
+        self.utterance_numbers.clear()
+        await super().disconnect(code)
+
+    def _queue_depth(self) -> int:
+        return OffloadedAudioConsumer.jobs_in_flight
+
+    @staticmethod
+    def _forget_jobs(replies) -> None:
+        """Stop counting the jobs of replies that are still missing."""
+        missing = sum(1 for reply in replies.values() if reply is None)
+        OffloadedAudioConsumer.jobs_in_flight -= missing
+
+    async def _transcribe_utterance(self, utterance: np.ndarray, number: int) -> None:
+        """Publish an utterance; its text arrives in transcribe_result."""
+        request_id = self.next_utterance
+        self.next_utterance += 1
+        self.pending[request_id] = None
+        self.utterance_numbers[request_id] = number
+        OffloadedAudioConsumer.jobs_in_flight += 1
+        shapes, buffers = encode_segments([utterance])
+        await self.channel_layer.send(
+            TRANSCRIBE_CHANNEL,
+            {
+                "type": "transcribe.request",
+                "reply_channel": self.channel_name,
+                "request_id": request_id,
+                "segments": shapes,
+                "audio": b"".join(buffers),
+            },
+        )
+
+    async def transcribe_result(self, event: dict) -> None:
+        """Send worker transcripts to the client in utterance order."""
+        if self.pending.get(event["request_id"], False) is not None:
+            return  # unknown, abandoned at the deadline, or a duplicate
+        OffloadedAudioConsumer.jobs_in_flight -= 1
+        self.pending[event["request_id"]] = event
+        while self.pending.get(self.next_to_send) is not None:
+            result = self.pending.pop(self.next_to_send)
+            self.next_to_send += 1
+            await self._send_result(result)
+        if self.ended:
+            await self.complete_session()
+
+    async def _send_result(self, result: dict) -> None:
+        """Forward one worker reply: a transcript or an error event."""
+        number = self.utterance_numbers.pop(result["request_id"], None)
+        if result.get("error"):
+            print("Transcription worker error:", result["error"])
+            await self.send_event(
+                protocol.ERROR, message=f"Transcription failed: {result['error']}"
+            )
+            return
+        text = result["text"]
+        if text.strip():
+            print(
+                f"Transcribed (worker, {result.get('model') or stt_spec.model}, "
+                f"compute {result['compute_secs']:.2f}s):",
+                text,
+            )
+            self.transcribed_texts.append(text)
+            await self.send_event(
+                protocol.TRANSCRIPT, text=text, final=True, utterance=number
+            )
+
+    async def complete_session(self) -> None:
+        """
+        Send the final transcript, then publish the feedback job. Waits
+        (returns) while replies are pending: the last one completes, or
+        the reply deadline does.
+        """
+        if self.pending:
+            self._start_reply_timer()
+            return
+        self._stop_reply_timer()
+        self.final_text = " ".join(self.transcribed_texts)
+        await self.send_event(protocol.FINAL_TRANSCRIPT, text=self.final_text)
+        if not (self.want_feedback and self.final_text.strip()):
+            await self.close(code=1000)
+            return
+        self.awaiting_feedback = True
+        self._start_reply_timer()
+        await self.channel_layer.send(
+            FEEDBACK_CHANNEL,
+            {
+                "type": "feedback.request",
+                "reply_channel": self.channel_name,
+                "text": self.final_text,
+                "topic": self.topic,
+            },
+        )
+
+    async def feedback_delta(self, event: dict) -> None:
+        if self.awaiting_feedback:
+            self._start_reply_timer()
+            await self.send_event(protocol.FEEDBACK_DELTA, text=event["text"])
+
+    async def feedback_done(self, event: dict) -> None:
+        if not self.awaiting_feedback:
+            return  # too late: the deadline already finished the session
+        self.awaiting_feedback = False
+        self._stop_reply_timer()
+        flags = {"error": True} if event.get("error") else {}
+        await self.send_event(protocol.FEEDBACK_DONE, text=event["text"], **flags)
+        print(f"[AI Feedback]: {event['text']}")
+        await self.close(code=1000)
+
+    def _start_reply_timer(self) -> None:
+        """(Re)start the deadline of the next worker reply."""
+        self._stop_reply_timer()
+        self.reply_timer = asyncio.get_running_loop().call_later(
+            REPLY_TIMEOUT_SECS, self._reply_deadline_passed
+        )
 
+    def _reply_deadline_passed(self) -> None:
+        self.reply_timer = None
+        self.timeout_task = asyncio.create_task(self._replies_timed_out())
 
+    def _stop_reply_timer(self) -> None:
+        if self.reply_timer is not None:
+            self.reply_timer.cancel()
+            self.reply_timer = None
 
+    async def _replies_timed_out(self) -> None:
+        """Finish the session without the replies that did not arrive."""
+        if self.pending:
+            missing = sorted(k for k, result in self.pending.items() if not result)
+            print(f"Transcription workers timed out on utterances {missing}")
+            self._forget_jobs(self.pending)
+            await self.send_event(
+                protocol.ERROR,
+                message=f"{len(missing)} utterance(s) not transcribed in time",
+            )
+            # Replies already received still go out, in order; late ones
+            # are ignored by transcribe_result
+            for request_id in sorted(self.pending):
+                result = self.pending.pop(request_id)
+                if result is not None:
+                    await self._send_result(result)
+            self.next_to_send = self.next_utterance
+            await self.complete_session()
+        elif self.awaiting_feedback:
+            print("Feedback worker timed out")
+            await self.feedback_done(
+                {"text": "Error generating feedback", "error": True}
+            )
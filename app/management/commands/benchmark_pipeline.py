@@ -0,0 +1,417 @@
+"""
+benchmark_pipeline.py
+
+Management command measuring the STT + feedback pipeline end to end.
+
+Recorded audio is replayed through `AudioConsumer` with Channels'
+`WebsocketCommunicator` (no server or network involved) for N concurrent
+simulated clients, at real-time pace by default. Feedback requests go to
+a local OpenAI stub so their latency is predictable and free. The report
+(latency percentiles, real-time factor, event-loop lag, memory) is
+printed and saved as JSON; pass a previous report with --baseline to see
+the relative change of every latency metric.
+
+Example:
+    python manage.py benchmark_pipeline --clients 8 --model tiny.en \\
+        --output bench.json --baseline previous.json
+"""
+
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+import numpy as np
+from channels.testing import WebsocketCommunicator
+
+from app import consumers
+from app.services import session_protocol as protocol
+from app.services.batch_transcription import read_wav
+from app.services.codecs import PCM16
+from app.services.model_registry import ModelSpec, registry
+from app.services.open_ai import AsyncAIUtilityClient
+from app.services.openai_stub import OpenAIStub
+from app.services.segmenter import UtteranceSegmenter
+from app.services.transcription_scheduler import SchedulerStats
+from app.services.vad import SpeechDetector
+
+DEFAULT_AUDIO = os.path.join(
+    os.path.dirname(consumers.__file__), "services", "tests", "recorded.wav"
+)
+LOOP_LAG_INTERVAL_SECS = 0.01
+SESSION_TIMEOUT_SECS = 600
+
+
+def summarize(values: list[float]) -> dict[str, float] | None:
+    """Percentiles of a list of milliseconds (None when empty)."""
+    if not values:
+        return None
+    data = np.asarray(values, dtype=np.float64)
+    return {
+        "count": len(values),
+        "mean": round(float(data.mean()), 2),
+        "p50": round(float(np.percentile(data, 50)), 2),
+        "p90": round(float(np.percentile(data, 90)), 2),
+        "p99": round(float(np.percentile(data, 99)), 2),
+        "max": round(float(data.max()), 2),
+    }
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def expected_emissions(chunks: list[np.ndarray]) -> list[int]:
+    """
+    Index of the chunk after which the consumer's segmenter completes each
+    utterance, to time transcripts from the moment their audio was sent.
+    """
+    segmenter = UtteranceSegmenter(
+        SpeechDetector(
+            consumers.SAMPLE_RATE, consumers.VAD_MODE, consumers.RMS_THRESHOLD
+        ),
+        padding_ms=consumers.PADDING_MS,
+        hangover_ms=consumers.HANGOVER_MS,
+        min_speech_secs=consumers.MIN_SPEECH_SECS,
+        max_utterance_secs=consumers.MAX_UTTERANCE_SECS,
+    )
+    emissions = []
+    for k, chunk in enumerate(chunks):
+        emissions.extend(k for _ in segmenter.feed(chunk))
+    return emissions
+
+
+async def run_client(
+    chunks: list[np.ndarray],
+    chunk_secs: float,
+    pace: float,
+    topic: str,
+    feedback: bool,
+    emissions: list[int],
+) -> dict[str, Any]:
+    """Replay one session and return its timings in milliseconds."""
+    communicator = WebsocketCommunicator(
+        consumers.AudioConsumer.as_asgi(), "/ws/audio/", subprotocols=[PCM16]
+    )
+    connected, _ = await communicator.connect()
+    if not connected:
+        raise CommandError("AudioConsumer rejected the connection")
+
+    events: list[tuple[float, dict]] = []
+
+    async def read_events() -> None:
+        while True:
+            message = await communicator.receive_output(SESSION_TIMEOUT_SECS)
+            if message["type"] == "websocket.close":
+                return
+            if message.get("text"):
+                events.append((time.perf_counter(), json.loads(message["text"])))
+
+    reader = asyncio.create_task(read_events())
+    await communicator.send_json_to(
+        {"type": protocol.START, "topic": topic, "feedback": feedback}
+    )
+
+    sent_at = []
+    started_at = time.perf_counter()
+    for k, chunk in enumerate(chunks):
+        sent_at.append(time.perf_counter())
+        await communicator.send_to(bytes_data=chunk.tobytes())
+        if pace > 0:
+            delay = started_at + (k + 1) * chunk_secs / pace - time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+        else:
+            await asyncio.sleep(0)  # let the consumer and other clients run
+    end_sent_at = time.perf_counter()
+    await communicator.send_json_to({"type": protocol.END})
+    await reader
+    await communicator.disconnect()
+
+    return session_timings(events, sent_at, end_sent_at, emissions)
+
+
+def session_timings(
+    events: list[tuple[float, dict]],
+    sent_at: list[float],
+    end_sent_at: float,
+    emissions: list[int],
+) -> dict[str, Any]:
+    """Milliseconds between the client's messages and the server's events."""
+
+    def since_end(event_type: str) -> float | None:
+        for at, event in events:
+            if event["type"] == event_type:
+                return (at - end_sent_at) * 1000
+        return None
+
+    # Utterance latency: audio that completed an utterance sent -> its
+    # transcript received. Transcripts name their utterance, so ones that
+    # decode to nothing or are dropped do not shift the others; the
+    # utterance flushed by "end" and streaming commits have no emission.
+    utterance_ms = [
+        (at - sent_at[emissions[event["utterance"]]]) * 1000
+        for at, event in events
+        if event["type"] == protocol.TRANSCRIPT
+        and event.get("utterance") is not None
+        and event["utterance"] < len(emissions)
+    ]
+    return {
+        "utterance_ms": utterance_ms,
+        "final_transcript_ms": since_end(protocol.FINAL_TRANSCRIPT),
+        "feedback_first_token_ms": since_end(protocol.FEEDBACK_DELTA),
+        "feedback_done_ms": since_end(protocol.FEEDBACK_DONE),
+    }
+
+
+async def run_benchmark(
+    samples: np.ndarray,
+    clients: int,
+    chunk_ms: int,
+    pace: float,
+    topic: str,
+    feedback: bool,
+) -> dict[str, Any]:
+    """Run `clients` concurrent sessions and aggregate their timings."""
+    chunk_samples = consumers.SAMPLE_RATE * chunk_ms // 1000
+    chunks = [
+        np.asarray(samples[i : i + chunk_samples])
+        for i in range(0, len(samples), chunk_samples)
+    ]
+    emissions = expected_emissions(chunks)
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    async def monitor_loop_lag() -> None:
+        while not stop.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL_SECS)
+            lags.append((time.perf_counter() - before - LOOP_LAG_INTERVAL_SECS) * 1000)
+
+    monitor = asyncio.create_task(monitor_loop_lag())
+    started_at = time.perf_counter()
+    sessions = await asyncio.gather(
+        *(
+            run_client(chunks, chunk_ms / 1000, pace, topic, feedback, emissions)
+            for _ in range(clients)
+        )
+    )
+    wall_secs = time.perf_counter() - started_at
+    stop.set()
+    await monitor
+
+    def collect(key: str) -> list[float]:
+        return [s[key] for s in sessions if s[key] is not None]
+
+    audio_secs = len(samples) / consumers.SAMPLE_RATE * clients
+    stats = consumers.scheduler.stats
+    return {
+        "latency_ms": {
+            "utterance": summarize([ms for s in sessions for ms in s["utterance_ms"]]),
+            "final_transcript": summarize(collect("final_transcript_ms")),
+            "feedback_first_token": summarize(collect("feedback_first_token_ms")),
+            "feedback_done": summarize(collect("feedback_done_ms")),
+        },
+        "event_loop_lag_ms": summarize(lags),
+        "throughput": {
+            "audio_secs": round(audio_secs, 2),
+            "wall_secs": round(wall_secs, 2),
+            # Engine time per second of audio (< 1 is faster than real time)
+            "rtf": round(stats.total_compute_secs / audio_secs, 4),
+            "segments": stats.completed,
+            "mean_batch_size": round(stats.mean_batch_size, 2),
+            "mean_queue_wait_ms": round(stats.mean_wait_secs * 1000, 2),
+        },
+    }
+
+
+def _latency_summaries(report: dict) -> dict[str, dict | None]:
+    results = report["results"]
+    summaries = {f"latency_ms.{k}": v for k, v in results["latency_ms"].items()}
+    summaries["event_loop_lag_ms"] = results["event_loop_lag_ms"]
+    return summaries
+
+
+def compare(baseline: dict, report: dict) -> list[str]:
+    """Relative change of every latency percentile against a baseline."""
+    old_summaries = _latency_summaries(baseline)
+    lines = []
+    for name, new in _latency_summaries(report).items():
+        old = old_summaries.get(name)
+        if not old or not new:
+            continue
+        for key in ("p50", "p90", "p99"):
+            if old[key]:
+                change = (new[key] - old[key]) / old[key]
+                lines.append(
+                    f"{name} {key}: {old[key]:.1f} -> {new[key]:.1f} ms "
+                    f"({change:+.0%})"
+                )
+    return lines
+
+
+class Command(BaseCommand):
+    """Benchmark AudioConsumer with simulated concurrent clients."""
+
+    help = (
+        "Replay a WAV file through AudioConsumer for N concurrent clients "
+        "with a local OpenAI stub and report latency, RTF, event-loop lag "
+        "and memory as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--audio", default=DEFAULT_AUDIO, help="16 kHz mono PCM16 WAV file."
+        )
+        parser.add_argument("--clients", type=int, default=4)
+        parser.add_argument(
+            "--chunk-ms", type=int, default=500, help="Audio per WebSocket message."
+        )
+        parser.add_argument(
+            "--pace",
+            type=float,
+            default=1.0,
+            help="Replay speed (1 = real time, 0 = as fast as possible).",
+        )
+        parser.add_argument("--topic", default="free_talk")
+        parser.add_argument(
+            "--no-feedback", action="store_true", help="Skip the feedback step."
+        )
+        parser.add_argument("--streaming", action="store_true")
+        parser.add_argument("--engine", help="Defaults to SPEECH_TO_TEXT ENGINE.")
+        parser.add_argument("--model", default="tiny.en")
+        parser.add_argument("--device", default="cpu")
+        parser.add_argument("--compute-type")
+        parser.add_argument(
+            "--stub-first-token-ms",
+            type=float,
+            default=200,
+            help="Latency of the OpenAI stub before its first token.",
+        )
+        parser.add_argument("--stub-token-ms", type=float, default=10)
+        parser.add_argument("-o", "--output", default="benchmark.json")
+        parser.add_argument("--baseline", help="Previous report to compare with.")
+
+    def handle(self, *args, **options):
+        try:
+            samples = read_wav(options["audio"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e)) from e
+        if not len(samples):
+            raise CommandError(f"No audio in {options['audio']}")
+        config = dict(settings.SPEECH_TO_TEXT)
+        config.update(MODEL=options["model"], DEVICE=options["device"])
+        if options["engine"]:
+            config["ENGINE"] = options["engine"]
+        if options["compute_type"]:
+            config["COMPUTE_TYPE"] = options["compute_type"]
+        spec = ModelSpec.from_config(config)
+
+        scheduler = consumers.scheduler
+        saved = (
+            scheduler.engine,
+            scheduler.tiers,
+            consumers.ai_client,
+            consumers.STREAMING,
+        )
+        stub = OpenAIStub(
+            first_token_secs=options["stub_first_token_ms"] / 1000,
+            token_secs=options["stub_token_ms"] / 1000,
+        )
+        try:
+            # Every batch goes to the engine under test, not to the tiers
+            scheduler.engine, scheduler.tiers = registry.engine(spec), None
+            load_started_at = time.perf_counter()
+            registry.warm_up(spec, background=False)
+            load_secs = time.perf_counter() - load_started_at
+
+            stub.start()
+            consumers.ai_client = AsyncAIUtilityClient("benchmark", stub.base_url)
+            consumers.STREAMING = options["streaming"]
+            scheduler.stats = SchedulerStats()
+
+            rss_before = _rss_bytes()
+            results = asyncio.run(
+                run_benchmark(
+                    samples,
+                    options["clients"],
+                    options["chunk_ms"],
+                    options["pace"],
+                    options["topic"],
+                    not options["no_feedback"],
+                )
+            )
+        finally:
+            stub.stop()
+            (
+                scheduler.engine,
+                scheduler.tiers,
+                consumers.ai_client,
+                consumers.STREAMING,
+            ) = saved
+
+        results["memory_mb"] = {
+            "rss_before": round(rss_before / 2**20, 1),
+            "rss_after": round(_rss_bytes() / 2**20, 1),
+            "peak_rss": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        }
+        results["model_load_secs"] = round(load_secs, 2)
+        report = {
+            "config": {
+                "audio": options["audio"],
+                "audio_secs": round(len(samples) / consumers.SAMPLE_RATE, 2),
+                "clients": options["clients"],
+                "chunk_ms": options["chunk_ms"],
+                "pace": options["pace"],
+                "streaming": options["streaming"],
+                "feedback": not options["no_feedback"],
+                "model": str(spec),
+                "stub_first_token_ms": options["stub_first_token_ms"],
+                "stub_token_ms": options["stub_token_ms"],
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "revision": _git_revision(),
+            },
+            "results": results,
+        }
+
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Report saved to {options['output']}"))
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            for line in compare(baseline, report):
+                self.stdout.write(line)
@@ -0,0 +1,115 @@
+"""
+check_assisted_decoding.py
+
+Management command checking that assisted decoding keeps transcripts
+unchanged, and measuring how much faster it is.
+
+Every utterance of the given recordings is decoded by the same Whisper
+model with and without the assistant model. The command fails when the
+word error rate of the assisted transcripts, taking the plain ones as
+reference, is above --max-wer.
+
+Example:
+    python manage.py check_assisted_decoding recordings/ \\
+        --model medium.en --assistant tiny.en --device cuda
+"""
+
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.batch_transcription import (
+    SAMPLE_RATE,
+    find_recordings,
+    iter_utterances,
+    read_wav,
+)
+from app.services.decoding_parity import compare_decoding
+from app.services.segmenter import UtteranceSegmenter
+from app.services.vad import SpeechDetector
+
+
+class Command(BaseCommand):
+    """Compare plain and assisted Whisper decoding on recordings."""
+
+    help = (
+        "Decode the utterances of 16 kHz mono WAV recordings with and "
+        "without an assistant model and compare transcripts and latency."
+    )
+
+    def add_arguments(self, parser):
+        stt = settings.SPEECH_TO_TEXT
+        parser.add_argument(
+            "paths", nargs="+", help="WAV files, or directories searched for them."
+        )
+        parser.add_argument("--model", default=stt["MODEL"], help="Main model.")
+        parser.add_argument(
+            "--assistant",
+            default=stt["ASSISTANT_MODEL"] or "tiny.en",
+            help="Draft model (SPEECH_TO_TEXT ASSISTANT_MODEL, else tiny.en).",
+        )
+        parser.add_argument("--device", default=stt["DEVICE"], help="cuda or cpu.")
+        parser.add_argument(
+            "--max-segments", type=int, default=100, help="Utterances compared."
+        )
+        parser.add_argument(
+            "--max-wer",
+            type=float,
+            default=0.0,
+            help="Highest accepted word error rate of the assisted transcripts.",
+        )
+
+    def handle(self, *args, **options):
+        recordings = []
+        for path in options["paths"]:
+            if os.path.isdir(path):
+                recordings += find_recordings(path)
+            elif os.path.isfile(path):
+                recordings.append(path)
+            else:
+                raise CommandError(f"No such file or directory: {path}")
+        if not recordings:
+            raise CommandError("No recordings found")
+
+        # pylint: disable-next=import-outside-toplevel
+        from app.services.whisper import Whisper
+
+        self.stdout.write(
+            f"Loading {options['model']} with assistant {options['assistant']}..."
+        )
+        engine = Whisper(
+            model_name=options["model"],
+            device=options["device"],
+            assistant_model_name=options["assistant"],
+        )
+        try:
+            segments = list(
+                islice(self._utterances(recordings), options["max_segments"])
+            )
+            if not segments:
+                raise CommandError("No speech found in the recordings")
+            # Keep CUDA and allocator warm-up out of the timings
+            engine.transcribe_plain(segments[0])
+            engine.transcribe(segments[0])
+            report = compare_decoding(
+                engine.transcribe_plain, engine.transcribe, segments
+            )
+        finally:
+            engine.close()
+
+        for index, expected, actual in report.mismatches:
+            self.stdout.write(f"#{index}\n  plain:    {expected}\n  assisted: {actual}")
+        self.stdout.write(f"Assisted decoding: {report}")
+        if report.word_error_rate > options["max_wer"]:
+            raise CommandError(
+                f"WER {report.word_error_rate:.2%} above {options['max_wer']:.2%}"
+            )
+        self.stdout.write(self.style.SUCCESS("Assisted decoding keeps parity"))
+
+    @staticmethod
+    def _utterances(recordings: list[str]):
+        for path in recordings:
+            segmenter = UtteranceSegmenter(SpeechDetector(SAMPLE_RATE, mode=2))
+            yield from iter_utterances(read_wav(path), segmenter)
@@ -0,0 +1,108 @@
+"""
+run_inference_server.py
+
+Management command running the shared speech-to-text inference server.
+
+Start one per machine (or per GPU) and set STT_ENGINE=remote for the web
+workers: they send audio over the Unix socket instead of each loading
+the model.
+
+Example:
+    STT_SERVER_ENGINE=faster_whisper STT_MODEL=small.en \\
+        python manage.py run_inference_server --max-batch-size 16
+    STT_ENGINE=remote daphne -b 0.0.0.0 -p 8000 ai_communication.asgi:application
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.services.inference_server import InferenceServer
+from app.services.model_registry import ModelSpec, registry
+
+
+class Command(BaseCommand):
+    """Serve speech-to-text to every web worker on one Unix socket."""
+
+    help = (
+        "Run the inference server that owns the speech-to-text models and "
+        "answers RemoteSpeechToText clients on a Unix domain socket."
+    )
+
+    def add_arguments(self, parser):
+        stt = settings.SPEECH_TO_TEXT
+        parser.add_argument(
+            "--socket", default=stt["SOCKET_PATH"], help="Path of the Unix socket."
+        )
+        parser.add_argument(
+            "--engine",
+            default=stt["SERVER_ENGINE"],
+            help="Engine of the default model (SPEECH_TO_TEXT SERVER_ENGINE).",
+        )
+        parser.add_argument("--model", help="Overrides SPEECH_TO_TEXT MODEL.")
+        parser.add_argument("--device", help="Overrides SPEECH_TO_TEXT DEVICE.")
+        parser.add_argument(
+            "--compute-type", help="Overrides SPEECH_TO_TEXT COMPUTE_TYPE."
+        )
+        parser.add_argument(
+            "--max-batch-size",
+            type=int,
+            default=8,
+            help="Segments per engine call, across all workers.",
+        )
+        parser.add_argument(
+            "--max-wait-ms",
+            type=float,
+            default=20,
+            help="How long to wait for more segments before decoding.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Decode threads per thread-safe model.",
+        )
+        parser.add_argument(
+            "--no-warm-up",
+            action="store_true",
+            help="Load the default model on the first request instead.",
+        )
+
+    def handle(self, *args, **options):
+        config = dict(settings.SPEECH_TO_TEXT, ENGINE=options["engine"])
+        for option, key in [
+            ("model", "MODEL"),
+            ("device", "DEVICE"),
+            ("compute_type", "COMPUTE_TYPE"),
+        ]:
+            if options[option]:
+                config[key] = options[option]
+        spec = ModelSpec.from_config(config)
+        # The web workers' load tiers (SPEECH_TO_TEXT TIERS); no other model
+        # is served
+        tier_specs = [
+            ModelSpec.from_config(dict(config, MODEL=model.strip()))
+            for model in config["TIERS"]
+        ]
+
+        registry.memory_budget_bytes = config["MEMORY_BUDGET_MB"] * 2**20
+        if not options["no_warm_up"]:
+            registry.warm_up(spec, background=False)
+
+        server = InferenceServer(
+            options["socket"],
+            default_spec=spec,
+            max_batch_size=options["max_batch_size"],
+            max_wait_secs=options["max_wait_ms"] / 1000,
+            num_workers=options["workers"],
+            specs=tier_specs,
+        )
+        self.stdout.write(f"Serving {spec} on {options['socket']} (Ctrl+C to stop)")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            registry.close()
+        self.stdout.write("Inference server stopped")
@@ -0,0 +1,137 @@
+"""
+transcribe_recordings.py
+
+Management command transcribing a directory of recorded sessions offline.
+
+Example:
+    python manage.py transcribe_recordings recordings/ -o transcripts.jsonl \\
+        --workers 2 --batch-size 8 --engine faster_whisper --model small.en
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.batch_transcription import (
+    completed_paths,
+    find_recordings,
+    recording_key,
+    transcribe_file,
+)
+from app.services.model_registry import ModelSpec, registry
+
+
+class Command(BaseCommand):
+    """Transcribe WAV recordings to JSONL, resuming an interrupted run."""
+
+    help = (
+        "Transcribe every 16 kHz mono WAV file under a directory to JSONL "
+        "(one line per file). Files already in the output are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory searched recursively.")
+        parser.add_argument(
+            "-o", "--output", default="transcripts.jsonl", help="JSONL output file."
+        )
+        parser.add_argument("--pattern", default="*.wav", help="File name pattern.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Files transcribed concurrently (use with a thread-safe or "
+            "process_pool engine).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=8, help="Utterances per engine call."
+        )
+        parser.add_argument("--engine", help="Overrides SPEECH_TO_TEXT ENGINE.")
+        parser.add_argument("--model", help="Overrides SPEECH_TO_TEXT MODEL.")
+        parser.add_argument("--device", help="Overrides SPEECH_TO_TEXT DEVICE.")
+        parser.add_argument(
+            "--compute-type", help="Overrides SPEECH_TO_TEXT COMPUTE_TYPE."
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options["directory"]):
+            raise CommandError(f"Not a directory: {options['directory']}")
+
+        output = options["output"]
+        root = options["directory"]
+        done = completed_paths(output)
+        recordings = find_recordings(root, options["pattern"])
+        pending = [path for path in recordings if recording_key(path, root) not in done]
+        self.stdout.write(
+            f"{len(recordings)} recordings, {len(recordings) - len(pending)} "
+            f"already transcribed, {len(pending)} to go"
+        )
+        if not pending:
+            return
+
+        config = dict(settings.SPEECH_TO_TEXT)
+        for option, key in [
+            ("engine", "ENGINE"),
+            ("model", "MODEL"),
+            ("device", "DEVICE"),
+            ("compute_type", "COMPUTE_TYPE"),
+        ]:
+            if options[option]:
+                config[key] = options[option]
+        engine = registry.engine(ModelSpec.from_config(config))
+
+        _terminate_last_line(output)
+        started_at = time.perf_counter()
+        audio_secs = 0.0
+        failed = 0
+        with (
+            open(output, "a", encoding="utf-8") as out,
+            ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool,
+        ):
+            futures = {
+                pool.submit(transcribe_file, engine, path, options["batch_size"]): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    failed += 1
+                    self.stderr.write(f"{path}: {e}")
+                    continue
+                record["path"] = recording_key(path, root)
+                # One complete line per file, flushed so a crash loses at
+                # most the files still in flight
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                audio_secs += record["audio_secs"]
+                self.stdout.write(
+                    f"{path}: {record['audio_secs']:.1f}s audio, "
+                    f"RTF {record['rtf']:.3f}"
+                )
+
+        wall_secs = time.perf_counter() - started_at
+        rtf = wall_secs / audio_secs if audio_secs else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Transcribed {len(pending) - failed} files "
+                f"({audio_secs / 60:.1f} min of audio) in {wall_secs:.1f}s: "
+                f"RTF {rtf:.3f} ({1 / rtf if rtf else 0:.1f}x real time), "
+                f"{failed} failed"
+            )
+        )
+
+
+def _terminate_last_line(path: str) -> None:
+    """End a line truncated by an interrupted run before appending."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
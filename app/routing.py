@@ -1,16 +1,43 @@
 """
 WebSocket URL routing for the 'app' Django application.
 
-This module maps WebSocket endpoints to their corresponding consumer classes.
-It is imported by the project's ASGI configuration to register WebSocket routes.
+This module maps WebSocket endpoints to their corresponding consumer classes,
+and channel-layer channels to the background workers that consume them.
+It is imported by the project's ASGI configuration to register both.
 """
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import re_path
 
-from .consumers import AudioConsumer
+from .consumers import AudioConsumer, OffloadedAudioConsumer
+from .workers import FeedbackWorker, TranscriptionWorker
+
+# With channel workers enabled, sessions hand inference to `runworker`
+# processes instead of running it in the WebSocket server. Those only
+# receive jobs through a layer shared between processes.
+_in_memory_layer = settings.CHANNEL_LAYERS["default"]["BACKEND"].endswith(
+    "InMemoryChannelLayer"
+)
+if settings.CHANNEL_WORKERS["ENABLED"] and _in_memory_layer:
+    raise ImproperlyConfigured(
+        "CHANNEL_WORKERS needs a channel layer shared with the runworker "
+        "processes; InMemoryChannelLayer cannot reach them. Set "
+        "CHANNEL_LAYER_BACKEND and CHANNEL_LAYER_URL."
+    )
+audio_consumer = (
+    OffloadedAudioConsumer if settings.CHANNEL_WORKERS["ENABLED"] else AudioConsumer
+)
 
 # WebSocket endpoint definitions for the app.
 # Each path maps to an AsyncWebsocketConsumer subclass.
 websocket_urlpatterns = [
-    re_path(r"^ws/audio/$", AudioConsumer.as_asgi()),
+    re_path(r"^ws/audio/$", audio_consumer.as_asgi()),
 ]
+
+# Background worker channels, served by
+# `python manage.py runworker stt-transcribe llm-feedback`.
+channel_routes = {
+    settings.CHANNEL_WORKERS["TRANSCRIBE_CHANNEL"]: TranscriptionWorker.as_asgi(),
+    settings.CHANNEL_WORKERS["FEEDBACK_CHANNEL"]: FeedbackWorker.as_asgi(),
+}
@@ -11,8 +11,96 @@ speech_to_text
     Defines the abstract base class `SpeechToText` that all STT engines must implement.
 
 whisper
-    Provides a concrete implementation of the `SpeechToText` interface using Whisper
-    or Faster-Whisper for audio transcription.
+    Provides a concrete implementation of the `SpeechToText` interface using the
+    transformers Whisper pipeline for audio transcription.
+
+microphone
+    Optional PyAudio capture and the blocking local transcription loop, kept
+    out of the engines so they run headless.
+
+batch_transcription
+    Offline transcription of recordings (memory-mapped WAV, VAD
+    segmentation, batched decoding, resumable JSONL), used by the
+    `transcribe_recordings` management command.
+
+decoding_parity
+    Transcript agreement, word error rate and speedup of one decoding mode
+    against another, used to check assisted decoding.
+
+fast_whisper
+    Provides a `SpeechToText` implementation backed by a quantized CTranslate2
+    (Faster-Whisper) model.
+
+process_pool
+    CPU-only `SpeechToText` backend that decodes segments in parallel on a
+    pool of worker processes, each holding its own Whisper pipeline.
+
+engines
+    Factory that builds the `SpeechToText` engine selected in settings.
+
+model_registry
+    Process-wide registry that loads engines lazily, shares them by
+    (engine, model, device, precision), warms them up in the background and
+    unloads idle ones under a memory budget.
+
+inference_server
+    Unix socket server owning the engines for every web worker of a
+    machine, and `RemoteSpeechToText`, its `SpeechToText` client.
+
+model_tiers
+    Load-adaptive choice between model sizes: each batch goes to the
+    largest model expected to clear the queued audio within a latency
+    target.
+
+transcription_scheduler
+    Queues segments from many async consumers onto a shared `SpeechToText`
+    engine and runs the decode off the event loop.
+
+ring_buffer
+    Preallocated mirrored ring buffer that accumulates session audio without
+    reallocating or copying on append, window or tail retention.
+
+vad
+    Vectorized, energy-gated WebRTC speech detection returning per-frame flags.
+
+features
+    Whisper log-mel features and a per-session cache that computes only
+    the new hops of an utterance that is re-decoded while it grows.
+
+segmenter
+    Endpoint-driven segmentation that emits utterances at natural pauses.
+
+streaming
+    Incremental transcription that commits words agreed on by consecutive
+    decodes and reports the rest as partial text.
+
+codecs
+    Negotiation and per-session decoding of the WebSocket audio transport
+    (Opus packets or raw PCM16).
+
+session_protocol
+    JSON control messages of a /ws/audio/ session (start, end, transcripts,
+    feedback, ack) and the mapping of page topics to feedback prompts.
+
+topic_router
+    Local TF-IDF topic classifier used before falling back to the remote
+    keyword-extraction tool call for custom-topic feedback.
+
+response_cache
+    SQLite-backed TTL/LRU cache of LLM responses with optional
+    near-duplicate lookup.
+
+admission
+    Per-process session limit, bounded per-session audio backlog and the
+    overload policy (reject, drop or coalesce) used by the consumers.
+
+metrics
+    Per-stage latency histograms, real-time factor and live gauges
+    (sessions, queue depth) exposed in Prometheus text format at /metrics.
+
+openai_stub
+    Local stand-in for the chat completions endpoint, used by the
+    `benchmark_pipeline` management command.
 
 Purpose
 -------
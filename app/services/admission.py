@@ -0,0 +1,237 @@
+"""
+admission.py
+
+Per-process admission control and backpressure for audio sessions.
+
+Without limits, every extra session adds work for the shared engine, so
+under overload the latency of all sessions grows without bound and
+memory grows with unprocessed audio. Instead:
+
+- `AdmissionController` caps the number of active sessions and decides
+  whether the transcription queue is saturated (its depth has reached
+  `max_queue_depth`). Refused sessions are closed with
+  `CLOSE_OVERLOADED`.
+- `PendingAudio` is a session's backlog of utterances waiting to be
+  transcribed, bounded by a budget in seconds of audio: past the budget
+  the oldest (stalest) utterances are dropped, whatever the policy.
+
+What happens while the queue is saturated depends on the policy:
+
+    reject     new sessions are refused
+    drop       only the newest pending utterance of a session is
+               transcribed; the older ones are dropped as stale
+    coalesce   consecutive pending utterances are merged into one
+               segment, up to the 30 s Whisper window, so a backlog costs
+               one decode instead of one per utterance
+
+Streaming partials are skipped under saturation with every policy, since
+the next one supersedes them anyway.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from .metrics import OVERLOAD_EVENTS
+
+REJECT = "reject"
+DROP = "drop"
+COALESCE = "coalesce"
+POLICIES = (REJECT, DROP, COALESCE)
+
+# "Try Again Later" (RFC 6455 registry): the server is overloaded
+CLOSE_OVERLOADED = 1013
+SAMPLE_RATE = 16000
+MAX_SEGMENT_SECS = 30.0  # Whisper decodes (and pads to) 30 s windows
+COALESCE_GAP_SECS = 0.1  # silence inserted between merged utterances
+
+
+@dataclass
+class AdmissionStats:
+    """
+    Overload counters of one process.
+
+    Attributes:
+        admitted (int): Sessions accepted.
+        rejected (int): Sessions refused (too many, or queue saturated).
+        dropped (int): Utterances dropped to stay within the budget.
+        dropped_secs (float): Audio dropped, in seconds.
+        coalesced (int): Utterances merged into a preceding one.
+        skipped_partials (int): Streaming partial decodes skipped.
+    """
+
+    admitted: int = 0
+    rejected: int = 0
+    dropped: int = 0
+    dropped_secs: float = 0.0
+    coalesced: int = 0
+    skipped_partials: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.admitted} admitted, {self.rejected} rejected, "
+            f"{self.dropped} utterances dropped ({self.dropped_secs:.1f}s), "
+            f"{self.coalesced} coalesced, {self.skipped_partials} partials skipped"
+        )
+
+
+class AdmissionController:
+    """
+    Session limit and overload policy shared by the sessions of a process.
+
+    Attributes:
+        max_sessions (int): Active sessions allowed (0 = no limit).
+        max_queue_depth (int): Queued segments at which the transcription
+            queue counts as saturated (0 = never).
+        policy (str): One of REJECT, DROP or COALESCE.
+        max_pending_secs (float): Per-session backlog budget, in seconds
+            of audio (0 = no limit).
+        stats (AdmissionStats): Counters.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 0,
+        max_queue_depth: int = 0,
+        policy: str = COALESCE,
+        max_pending_secs: float = 30.0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy {policy!r}, use {POLICIES}")
+        self.max_sessions = max_sessions
+        self.max_queue_depth = max_queue_depth
+        self.policy = policy
+        self.max_pending_secs = max_pending_secs
+        self.active = 0
+        self.stats = AdmissionStats()
+
+    def saturated(self, queue_depth: int) -> bool:
+        """Whether the transcription queue is too deep to take more work."""
+        return 0 < self.max_queue_depth <= queue_depth
+
+    def try_admit(self, queue_depth: int = 0) -> bool:
+        """Count a new session in, or refuse it (returns False)."""
+        if (self.max_sessions and self.active >= self.max_sessions) or (
+            self.policy == REJECT and self.saturated(queue_depth)
+        ):
+            self.stats.rejected += 1
+            OVERLOAD_EVENTS.inc(action="rejected")
+            return False
+        self.active += 1
+        self.stats.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Count a session admitted by `try_admit()` out."""
+        self.active = max(0, self.active - 1)
+
+    def skip_partial(self, queue_depth: int) -> bool:
+        """Whether to skip a streaming partial decode now."""
+        if self.saturated(queue_depth):
+            self.stats.skipped_partials += 1
+            OVERLOAD_EVENTS.inc(action="skipped_partial")
+            return True
+        return False
+
+    def coalesce(self, queue_depth: int) -> bool:
+        """Whether to merge pending utterances before queueing them now."""
+        return self.policy == COALESCE and self.saturated(queue_depth)
+
+    def shed(self, queue_depth: int) -> bool:
+        """Whether to drop all but the newest pending utterance now."""
+        return self.policy == DROP and self.saturated(queue_depth)
+
+    def next_utterance(
+        self, backlog: "PendingAudio", queue_depth: int
+    ) -> np.ndarray | None:
+        """
+        Take the next utterance to transcribe from a session's backlog,
+        shedding or merging pending ones as the policy says while the
+        queue is saturated. None when the backlog is empty.
+        """
+        if self.shed(queue_depth):
+            backlog.drop_stale()
+        return backlog.pop(self.coalesce(queue_depth))
+
+    def backlog(self) -> "PendingAudio":
+        """A pending-audio backlog for a new session."""
+        return PendingAudio(self.max_pending_secs, self.stats)
+
+
+class PendingAudio:
+    """
+    FIFO of utterances waiting for transcription, bounded in seconds.
+
+    Attributes:
+        budget_secs (float): Audio kept at most (0 = no limit). A single
+            utterance longer than the budget is still kept.
+        stats (AdmissionStats): Where drops and merges are counted.
+        pushed (int): Utterances queued so far; the n-th one pushed is
+            utterance number n - 1.
+        last_popped (int): Number of the last utterance in the segment
+            returned by the latest `pop()` (-1 before any).
+    """
+
+    def __init__(self, budget_secs: float = 0.0, stats: AdmissionStats | None = None):
+        self.budget_secs = budget_secs
+        self.stats = stats or AdmissionStats()
+        self.pushed = 0
+        self.last_popped = -1
+        self._utterances: deque[np.ndarray] = deque()
+        self._samples = 0
+
+    def __len__(self) -> int:
+        return len(self._utterances)
+
+    @property
+    def pending_secs(self) -> float:
+        """Audio waiting, in seconds."""
+        return self._samples / SAMPLE_RATE
+
+    def push(self, utterance: np.ndarray) -> None:
+        """Queue an utterance, dropping the oldest ones past the budget."""
+        self._utterances.append(utterance)
+        self._samples += len(utterance)
+        self.pushed += 1
+        budget = int(self.budget_secs * SAMPLE_RATE)
+        while budget and self._samples > budget and len(self._utterances) > 1:
+            self._drop_oldest()
+
+    def drop_stale(self) -> None:
+        """Drop every utterance but the newest."""
+        while len(self._utterances) > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        dropped = self._utterances.popleft()
+        self._samples -= len(dropped)
+        self.stats.dropped += 1
+        self.stats.dropped_secs += len(dropped) / SAMPLE_RATE
+        OVERLOAD_EVENTS.inc(action="dropped")
+
+    def pop(self, coalesce: bool = False) -> np.ndarray | None:
+        """
+        The oldest utterance, or None when empty. With `coalesce=True`,
+        the following utterances are appended to it (separated by a short
+        silence) as long as the result fits in one Whisper window.
+        """
+        if not self._utterances:
+            return None
+        parts = [self._utterances.popleft()]
+        length = len(parts[0])
+        gap = np.zeros(int(COALESCE_GAP_SECS * SAMPLE_RATE), parts[0].dtype)
+        max_length = int(MAX_SEGMENT_SECS * SAMPLE_RATE)
+        while (
+            coalesce
+            and self._utterances
+            and length + len(gap) + len(self._utterances[0]) <= max_length
+        ):
+            parts += [gap, self._utterances.popleft()]
+            length += len(gap) + len(parts[-1])
+            self.stats.coalesced += 1
+            OVERLOAD_EVENTS.inc(action="coalesced")
+        self._samples -= sum(len(part) for part in parts[::2])
+        # Drops only remove the oldest, so the queue holds the last numbers
+        self.last_popped = self.pushed - len(self._utterances) - 1
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
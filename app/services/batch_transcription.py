@@ -0,0 +1,163 @@
+"""
+batch_transcription.py
+
+Offline transcription of recorded sessions.
+
+A WAV file is memory-mapped instead of read into memory, fed through the
+same VAD segmenter as the live WebSocket path in fixed-size windows, and
+its utterances are decoded `batch_size` at a time with
+`SpeechToText.transcribe_batch()`. Only one window and one batch of
+utterances per file are held in memory at once.
+
+Results are appended as one JSON line per file, under the file's path
+relative to the input directory. A run that is stopped can be restarted
+with the same output file, however the directory is spelled: files
+already present in it are skipped.
+"""
+
+import json
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from .segmenter import UtteranceSegmenter
+from .speech_to_text import SpeechToText
+from .vad import SpeechDetector
+
+SAMPLE_RATE = 16000
+WINDOW_SECS = 30.0  # audio fed to the segmenter per step
+
+
+def read_wav(path: str | os.PathLike) -> np.ndarray:
+    """
+    Memory-map the samples of a 16 kHz mono PCM16 WAV file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not an uncompressed 16 kHz mono PCM16 WAV.
+    """
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    if fmt is None:
+        raise ValueError(f"{path}: no fmt chunk")
+    audio_format, channels, sample_rate, _, _, bits = fmt
+    if (audio_format, channels, sample_rate, bits) != (1, 1, SAMPLE_RATE, 16):
+        raise ValueError(
+            f"{path}: expected 16 kHz mono PCM16, got format={audio_format} "
+            f"channels={channels} rate={sample_rate} bits={bits}"
+        )
+
+    # Some writers leave the data size at 0 or past the end of the file
+    available = os.path.getsize(path) - data_offset
+    num_samples = min(chunk_size, available) // 2
+    if num_samples == 0:
+        return np.empty(0, dtype="<i2")
+    return np.memmap(path, dtype="<i2", mode="r", offset=data_offset, shape=num_samples)
+
+
+def iter_utterances(
+    samples: np.ndarray,
+    segmenter: UtteranceSegmenter,
+    window_secs: float = WINDOW_SECS,
+) -> Iterator[np.ndarray]:
+    """Yield the utterances of a recording, reading it window by window."""
+    window = int(window_secs * SAMPLE_RATE)
+    for start in range(0, len(samples), window):
+        yield from segmenter.feed(np.asarray(samples[start : start + window]))
+    yield from segmenter.flush()
+
+
+def transcribe_file(
+    engine: SpeechToText,
+    path: str | os.PathLike,
+    batch_size: int = 8,
+    vad_mode: int = 2,
+) -> dict:
+    """
+    Transcribe one recording.
+
+    Returns
+    -------
+    dict
+        JSON-serializable record with the path, the per-utterance and
+        joined text, the audio duration, the processing time and the
+        real-time factor (processing time / audio duration).
+    """
+    started_at = time.perf_counter()
+    samples = read_wav(path)
+    segmenter = UtteranceSegmenter(SpeechDetector(SAMPLE_RATE, mode=vad_mode))
+
+    segments: list[str] = []
+    batch: list[np.ndarray] = []
+    for utterance in iter_utterances(samples, segmenter):
+        batch.append(utterance)
+        if len(batch) >= batch_size:
+            segments.extend(engine.transcribe_batch(batch))
+            batch = []
+    if batch:
+        segments.extend(engine.transcribe_batch(batch))
+
+    segments = [text for text in segments if text.strip()]
+    audio_secs = len(samples) / SAMPLE_RATE
+    processing_secs = time.perf_counter() - started_at
+    return {
+        "path": str(path),
+        "text": " ".join(segments),
+        "segments": segments,
+        "audio_secs": round(audio_secs, 3),
+        "processing_secs": round(processing_secs, 3),
+        "rtf": round(processing_secs / audio_secs, 4) if audio_secs else 0.0,
+    }
+
+
+def recording_key(path: str | os.PathLike, root: str | os.PathLike) -> str:
+    """
+    Name of a recording in the JSONL output: its path relative to the
+    resolved input directory, with forward slashes.
+    """
+    return Path(path).resolve().relative_to(Path(root).resolve()).as_posix()
+
+
+def completed_paths(output_path: str | os.PathLike) -> set[str]:
+    """
+    Paths already transcribed in an existing JSONL output. A truncated
+    last line (from an interrupted run) is ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["path"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return done
+
+
+def find_recordings(directory: str | os.PathLike, pattern: str = "*.wav") -> list[str]:
+    """Recordings under `directory` (recursively), in a stable order."""
+    return sorted(str(path) for path in Path(directory).rglob(pattern))
@@ -0,0 +1,121 @@
+"""
+codecs.py
+
+Audio transports accepted on the /ws/audio/ WebSocket.
+
+The client offers its formats as WebSocket subprotocols (most compact
+first) and the server accepts the first one it can decode. Every decoder
+turns one binary WebSocket message into 16 kHz mono PCM16 bytes, so the
+rest of the pipeline (segmenter, VAD, transcription) never sees the wire
+format. A message that cannot be decoded raises ValueError; the consumer
+drops it and the session goes on.
+
+- ``audio.opus``: one raw Opus packet per message (WebCodecs
+  ``AudioEncoder`` output), about 24 kbit/s. Needs the optional
+  ``opuslib`` package and the system ``libopus`` library.
+- ``audio.pcm16``: raw little-endian PCM16 at 16 kHz, 256 kbit/s. Always
+  available and used when the client offers no subprotocol.
+"""
+
+import importlib.util
+from functools import lru_cache
+
+SAMPLE_RATE = 16000
+
+PCM16 = "audio.pcm16"
+OPUS = "audio.opus"
+
+
+class Pcm16Decoder:
+    """
+    Pass-through decoder for raw PCM16 messages.
+
+    Attributes:
+        subprotocol (str): The WebSocket subprotocol it decodes.
+    """
+
+    subprotocol = PCM16
+
+    def decode(self, payload: bytes) -> bytes:
+        """Return the payload, which must hold whole 16-bit samples."""
+        if len(payload) % 2:
+            raise ValueError(f"PCM16 message of odd length {len(payload)}")
+        return payload
+
+
+class OpusDecoder:
+    """
+    Stateful Opus decoder for one stream of packets.
+
+    Opus decodes directly at 16 kHz, so no resampling is needed. A decoder
+    keeps inter-packet state and must not be shared between sessions.
+
+    Attributes:
+        subprotocol (str): The WebSocket subprotocol it decodes.
+        sample_rate (int): Output sample rate in Hz.
+        max_frame_samples (int): Largest packet the decoder accepts (120 ms,
+            the Opus maximum).
+    """
+
+    subprotocol = OPUS
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        # pylint: disable-next=import-outside-toplevel
+        import opuslib
+
+        self.sample_rate = sample_rate
+        self.max_frame_samples = sample_rate * 120 // 1000
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._error = opuslib.OpusError
+
+    def decode(self, payload: bytes) -> bytes:
+        """
+        Decode one Opus packet to PCM16 bytes.
+
+        Raises
+        ------
+        ValueError
+            If libopus rejects the packet (corrupt or truncated).
+        """
+        try:
+            return self._decoder.decode(payload, self.max_frame_samples)
+        except self._error as e:
+            raise ValueError(f"Invalid Opus packet: {e}") from e
+
+
+@lru_cache(maxsize=None)
+def opus_available() -> bool:
+    """True if opuslib and libopus can be loaded."""
+    if importlib.util.find_spec("opuslib") is None:
+        return False
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        import opuslib  # noqa: F401  (raises if libopus is missing)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return False
+    return True
+
+
+def supported_subprotocols() -> list[str]:
+    """Subprotocols this server can decode, most compact first."""
+    return [OPUS, PCM16] if opus_available() else [PCM16]
+
+
+def negotiate(offered: list[str]) -> str | None:
+    """
+    Pick the first subprotocol offered by the client that the server
+    supports. Returns None when the client offered none (plain PCM16
+    without a subprotocol header) or none of them is supported.
+    """
+    supported = supported_subprotocols()
+    for subprotocol in offered:
+        if subprotocol in supported:
+            return subprotocol
+    return None
+
+
+def create_decoder(subprotocol: str | None) -> Pcm16Decoder | OpusDecoder:
+    """Build a per-session decoder for a negotiated subprotocol."""
+    if subprotocol == OPUS:
+        return OpusDecoder()
+    return Pcm16Decoder()
@@ -0,0 +1,139 @@
+"""
+decoding_parity.py
+
+Accuracy and latency comparison of two decoding modes of one model.
+
+Assisted decoding (see whisper.py) must not change what the main model
+transcribes, only how fast. `compare_decoding` runs the same segments
+through a reference and a candidate transcription function, times both
+and reports how many transcripts differ, the word error rate of the
+candidate against the reference and the speedup.
+
+Usage:
+    report = compare_decoding(engine.transcribe_plain, engine.transcribe, segments)
+    print(report)
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from .speech_to_text import AudioInput
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _words(text: str) -> list[str]:
+    """Lower-cased words without punctuation."""
+    return _WORD_RE.findall(text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Substitutions, insertions and deletions between two transcripts."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class ParityReport:
+    """
+    Outcome of `compare_decoding`.
+
+    Attributes:
+        segments (int): Segments decoded in both modes.
+        identical (int): Segments with exactly the same transcript.
+        word_errors (int): Word edits from reference to candidate.
+        reference_words (int): Words in the reference transcripts.
+        reference_secs (float): Total reference decoding time.
+        candidate_secs (float): Total candidate decoding time.
+        mismatches (list[tuple[int, str, str]]): Segment index, reference
+            and candidate text of every differing segment.
+    """
+
+    segments: int = 0
+    identical: int = 0
+    word_errors: int = 0
+    reference_words: int = 0
+    reference_secs: float = 0.0
+    candidate_secs: float = 0.0
+    mismatches: list[tuple[int, str, str]] = field(default_factory=list)
+
+    @property
+    def word_error_rate(self) -> float:
+        """Candidate WER, taking the reference transcripts as ground truth."""
+        if not self.reference_words:
+            return float(self.word_errors > 0)
+        return self.word_errors / self.reference_words
+
+    @property
+    def speedup(self) -> float:
+        """Reference time over candidate time (> 1: candidate is faster)."""
+        if not self.candidate_secs:
+            return 0.0
+        return self.reference_secs / self.candidate_secs
+
+    def __str__(self) -> str:
+        return (
+            f"{self.identical}/{self.segments} identical, "
+            f"WER {self.word_error_rate:.2%}, "
+            f"{self.reference_secs:.2f}s -> {self.candidate_secs:.2f}s "
+            f"({self.speedup:.2f}x)"
+        )
+
+
+def compare_decoding(
+    reference: Callable[[AudioInput], str],
+    candidate: Callable[[AudioInput], str],
+    segments: Iterable[AudioInput],
+) -> ParityReport:
+    """
+    Transcribe every segment in both modes and compare.
+
+    The modes alternate per segment, so warm-up and caches affect both
+    alike. Run one throwaway segment first to keep model loading out of
+    the timings.
+
+    Parameters
+    ----------
+    reference : Callable
+        Transcription taken as correct, e.g. `Whisper.transcribe_plain`.
+    candidate : Callable
+        Transcription under test, e.g. an assisted `Whisper.transcribe`.
+    segments : Iterable[bytes or np.ndarray]
+        Audio segments.
+
+    Returns
+    -------
+    ParityReport
+        Agreement and timings.
+    """
+    report = ParityReport()
+    for index, segment in enumerate(segments):
+        started_at = time.perf_counter()
+        expected = reference(segment)
+        report.reference_secs += time.perf_counter() - started_at
+        started_at = time.perf_counter()
+        actual = candidate(segment)
+        report.candidate_secs += time.perf_counter() - started_at
+
+        report.segments += 1
+        report.reference_words += len(_words(expected))
+        if expected == actual:
+            report.identical += 1
+            continue
+        report.word_errors += word_errors(expected, actual)
+        report.mismatches.append((index, expected, actual))
+    return report
@@ -0,0 +1,88 @@
+"""
+engines.py
+
+Factory for building the configured SpeechToText implementation.
+
+The engine is chosen from the `SPEECH_TO_TEXT` Django setting so that a
+deployment can switch backends without editing the consumer code.
+Backends are imported lazily, so optional dependencies of an unused
+engine are never loaded.
+"""
+
+from typing import Any
+
+from .speech_to_text import SpeechToText
+
+
+def create_speech_to_text(config: dict[str, Any]) -> SpeechToText:
+    """
+    Build a SpeechToText engine from a settings dictionary.
+
+    Parameters
+    ----------
+    config : dict
+        Keys:
+            - ENGINE: "whisper" (in-process pipeline), "faster_whisper"
+              (quantized CTranslate2 model), "process_pool"
+              (CPU worker processes) or "remote" (inference server)
+            - MODEL: Whisper checkpoint, e.g. "medium.en"
+            - DEVICE: "cuda" or "cpu" (in-process engines only)
+            - COMPUTE_TYPE: CTranslate2 quantization (faster_whisper only)
+            - ASSISTANT_MODEL: draft checkpoint for assisted decoding
+              (whisper only; empty = plain decoding)
+            - NUM_PROCESSES: worker processes (process pool only)
+            - THREADS_PER_PROCESS: threads per worker (process pool only)
+            - SOCKET_PATH: inference server socket (remote only)
+            - SERVER_ENGINE: engine run by the inference server (remote
+              only); the model settings above describe its model
+
+    Returns
+    -------
+    SpeechToText
+        A ready-to-use engine instance.
+    """
+    engine = config.get("ENGINE", "whisper")
+    model_name = config.get("MODEL", "medium.en")
+
+    if engine == "whisper":
+        from .whisper import Whisper  # pylint: disable=import-outside-toplevel
+
+        return Whisper(
+            model_name=model_name,
+            device=config.get("DEVICE", "cuda"),
+            assistant_model_name=config.get("ASSISTANT_MODEL") or None,
+        )
+
+    if engine == "faster_whisper":
+        # pylint: disable-next=import-outside-toplevel
+        from .fast_whisper import FasterWhisper
+
+        return FasterWhisper(
+            model_name=model_name,
+            device=config.get("DEVICE", "cpu"),
+            compute_type=config.get("COMPUTE_TYPE", "int8"),
+        )
+
+    if engine == "process_pool":
+        # pylint: disable-next=import-outside-toplevel
+        from .process_pool import ProcessPoolWhisper
+
+        return ProcessPoolWhisper(
+            model_name=model_name,
+            num_processes=config.get("NUM_PROCESSES"),
+            threads_per_process=config.get("THREADS_PER_PROCESS"),
+        )
+
+    if engine == "remote":
+        # pylint: disable-next=import-outside-toplevel
+        from .inference_server import RemoteSpeechToText
+
+        server_config = {
+            key: value
+            for key, value in config.items()
+            if key not in ("SOCKET_PATH", "SERVER_ENGINE")
+        }
+        server_config["ENGINE"] = config.get("SERVER_ENGINE", "faster_whisper")
+        return RemoteSpeechToText(config["SOCKET_PATH"], model=server_config)
+
+    raise ValueError(f"Unknown speech-to-text engine: {engine!r}")
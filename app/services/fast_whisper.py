@@ -0,0 +1,86 @@
+"""
+fast_whisper.py
+
+Concrete implementation of the SpeechToText abstract class using
+Faster-Whisper, a CTranslate2 re-implementation of Whisper with
+int8 / int8_float16 quantized weights.
+"""
+
+from faster_whisper import WhisperModel
+
+from .speech_to_text import AudioInput, SpeechToText, Word, to_float32
+
+
+class FasterWhisper(SpeechToText):
+    """
+    Whisper STT engine running a quantized CTranslate2 model.
+
+    Compared with the full-precision transformers pipeline this lowers
+    both the real-time factor and the resident memory of each replica,
+    which matters most on CPU-only nodes.
+
+    Attributes:
+        model_name (str): Faster-Whisper model size or CTranslate2 model path.
+        device (str): "cpu", "cuda" or "auto".
+        compute_type (str): Quantization, e.g. "int8" or "int8_float16".
+    """
+
+    thread_safe = True  # CTranslate2 models accept concurrent calls
+
+    def __init__(
+        self,
+        model_name: str = "medium.en",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        beam_size: int = 1,
+    ):
+        """Load the CTranslate2 Whisper model."""
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.language = "en" if model_name.endswith(".en") else None
+        self.model = WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+        )
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        """Return raw PCM16 mono audio (already PCM16)."""
+        return audio_bytes
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        """
+        Transcribe with the CTranslate2 model.
+        """
+        segments, _ = self.model.transcribe(
+            to_float32(audio_bytes),
+            language=self.language,
+            beam_size=self.beam_size,
+            condition_on_previous_text=False,
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        """
+        Transcribe with the CTranslate2 model and return word timestamps.
+        """
+        segments, _ = self.model.transcribe(
+            to_float32(audio_bytes),
+            language=self.language,
+            beam_size=self.beam_size,
+            condition_on_previous_text=False,
+            word_timestamps=True,
+        )
+        return [
+            Word(text=word.word.strip(), start=word.start, end=word.end)
+            for segment in segments
+            for word in segment.words or []
+        ]
+
+    def close(self) -> None:
+        """Release the CTranslate2 model."""
+        del self.model
@@ -0,0 +1,245 @@
+"""
+features.py
+
+Whisper log-mel features, computed incrementally per session.
+
+The transformers pipeline turns every segment it receives into a log-mel
+spectrogram (25 ms Hann windows every 10 ms, padded to 30 s). In
+streaming mode the same utterance is re-decoded every stride from the
+last committed word, so nearly all of that work repeats what the
+previous decode already did. `IncrementalLogMel` keeps the log-mel
+frames of the utterance in progress and only computes the hops added
+since the last call; assembling a decode window is then a copy plus the
+per-window normalization.
+
+Frames match `WhisperFeatureExtractor` (slaney mel filters, log10 with a
+1e-10 floor, clamped to 8 below the window maximum, scaled to about
+[-1, 1]), except for the first two frames of a window that does not
+start the utterance: those see the audio before the window rather than
+a reflection of its first samples. Windows start on the 10 ms hop grid.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400  # 25 ms analysis window
+HOP_LENGTH = 160  # 10 ms between frames
+N_FRAMES = 3000  # frames in Whisper's 30 s input
+LOG_FLOOR = -10.0  # log10 of the 1e-10 power floor, i.e. of silence
+DYNAMIC_RANGE = 8.0  # log10 units kept below the loudest frame
+
+
+def n_mels_for(model_name: str) -> int:
+    """Mel bins a Whisper checkpoint expects (128 for large-v3 and turbo)."""
+    name = model_name.lower()
+    return 128 if "large-v3" in name or "turbo" in name else 80
+
+
+def _hertz_to_mel(freq: np.ndarray) -> np.ndarray:
+    """Slaney mel scale: linear below 1 kHz, logarithmic above."""
+    mels = 3.0 * freq / 200.0
+    log_region = freq >= 1000.0
+    mels[log_region] = 15.0 + np.log(freq[log_region] / 1000.0) * 27.0 / np.log(6.4)
+    return mels
+
+
+def _mel_to_hertz(mels: np.ndarray) -> np.ndarray:
+    freq = 200.0 * mels / 3.0
+    log_region = mels >= 15.0
+    freq[log_region] = 1000.0 * np.exp(np.log(6.4) / 27.0 * (mels[log_region] - 15.0))
+    return freq
+
+
+def mel_filters(n_mels: int = 80) -> np.ndarray:
+    """
+    Slaney-normalized triangular mel filter bank of Whisper.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (N_FFT // 2 + 1, n_mels): power spectrum bins to mel bins.
+    """
+    fft_freqs = np.linspace(0, SAMPLE_RATE // 2, N_FFT // 2 + 1)
+    mel_edges = np.linspace(
+        _hertz_to_mel(np.array([0.0]))[0],
+        _hertz_to_mel(np.array([SAMPLE_RATE / 2]))[0],
+        n_mels + 2,
+    )
+    filter_freqs = _mel_to_hertz(mel_edges)
+    filter_diff = np.diff(filter_freqs)
+    slopes = filter_freqs[np.newaxis, :] - fft_freqs[:, np.newaxis]
+    down_slopes = -slopes[:, :-2] / filter_diff[:-1]
+    up_slopes = slopes[:, 2:] / filter_diff[1:]
+    filters = np.maximum(0.0, np.minimum(down_slopes, up_slopes))
+    return filters * (2.0 / (filter_freqs[2:] - filter_freqs[:-2]))
+
+
+_WINDOW = np.hanning(N_FFT + 1)[:-1]  # periodic Hann
+
+
+def _frame_samples(audio: np.ndarray, first: int, last: int) -> np.ndarray:
+    """
+    Samples covered by frames `first` to `last - 1`, with the reflection
+    padding of a centered STFT at the start and silence past the end.
+    """
+    start = first * HOP_LENGTH - N_FFT // 2
+    stop = (last - 1) * HOP_LENGTH + N_FFT // 2
+    pieces = []
+    if start < 0:
+        pieces.append(audio[1 : 1 - start][::-1])
+    pieces.append(audio[max(start, 0) : stop])
+    if stop > len(audio):
+        pieces.append(np.zeros(stop - max(start, len(audio)), audio.dtype))
+    return np.concatenate(pieces)
+
+
+def _log_mel_frames(
+    audio: np.ndarray, first: int, last: int, filters: np.ndarray
+) -> np.ndarray:
+    """Unnormalized log10 mel frames `first` to `last - 1`, shape (frames, mels)."""
+    if last <= first:
+        return np.empty((0, filters.shape[1]), np.float32)
+    samples = _frame_samples(audio.astype(np.float64), first, last)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP_LENGTH]
+    power = np.abs(np.fft.rfft(frames * _WINDOW, axis=1)) ** 2
+    return np.log10(np.maximum(power @ filters, 1e-10)).astype(np.float32)
+
+
+def _num_frames(num_samples: int) -> int:
+    """Frames overlapping the first `num_samples` samples of a window."""
+    return (num_samples + N_FFT // 2 - 1) // HOP_LENGTH + 1
+
+
+def normalize(log_mel: np.ndarray, num_frames: int = N_FRAMES) -> np.ndarray:
+    """
+    Pad (with silence) or cut unnormalized frames to `num_frames` and apply
+    Whisper's dynamic range clamp and scaling.
+
+    Parameters
+    ----------
+    log_mel : np.ndarray
+        Shape (frames, mels), as cached by `IncrementalLogMel`.
+
+    Returns
+    -------
+    np.ndarray
+        Model input of shape (mels, num_frames), float32.
+    """
+    features = np.full((log_mel.shape[1], num_frames), LOG_FLOOR, np.float32)
+    used = min(num_frames, len(log_mel))
+    features[:, :used] = log_mel[:used].T
+    np.maximum(features, features.max() - DYNAMIC_RANGE, out=features)
+    return (features + 4.0) / 4.0
+
+
+def log_mel_spectrogram(audio: np.ndarray, n_mels: int = 80) -> np.ndarray:
+    """
+    Whisper input features of a whole segment (float32 samples in [-1, 1]),
+    computed in one go.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (n_mels, N_FRAMES).
+    """
+    frames = _log_mel_frames(audio, 0, _num_frames(len(audio)), mel_filters(n_mels))
+    return normalize(frames)
+
+
+@dataclass
+class FeatureStats:
+    """
+    Work done by an IncrementalLogMel.
+
+    Attributes:
+        computed (int): Frames computed, including provisional tail frames.
+        reused (int): Frames served from the cache.
+    """
+
+    computed: int = 0
+    reused: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.computed} frames computed, {self.reused} reused"
+
+
+class IncrementalLogMel:
+    """
+    Log-mel frame cache of one session's utterance in progress.
+
+    Usage:
+        features = mel.window(utterance, start)  # every re-decode
+        ...
+        mel.reset()  # when the utterance is finished or dropped
+
+    `utterance` is the whole utterance so far (float32 in [-1, 1]); each
+    call must pass a continuation of the previous one. A frame is cached
+    once all of its samples are known. The last frames of a window, which
+    overlap audio not received yet, are computed for that window only.
+
+    Attributes:
+        n_mels (int): Mel bins (80, or 128 for large-v3 models).
+        stats (FeatureStats): Frames computed and reused.
+    """
+
+    def __init__(self, n_mels: int = 80):
+        self.n_mels = n_mels
+        self.stats = FeatureStats()
+        self._filters = mel_filters(n_mels)
+        self._frames = np.empty((0, n_mels), np.float32)
+        self._edge = np.empty(0, np.float32)  # last samples seen, to check
+        self._num_samples = 0
+
+    @property
+    def cached_frames(self) -> int:
+        """Complete frames held for the current utterance."""
+        return len(self._frames)
+
+    def reset(self) -> None:
+        """Forget the current utterance."""
+        self._frames = self._frames[:0]
+        self._edge = self._edge[:0]
+        self._num_samples = 0
+
+    def _continues(self, utterance: np.ndarray) -> bool:
+        """Whether `utterance` extends the audio the cache was built from."""
+        seen = self._num_samples
+        return len(utterance) >= seen and np.array_equal(
+            utterance[seen - len(self._edge) : seen], self._edge
+        )
+
+    def update(self, utterance: np.ndarray) -> None:
+        """Compute the frames completed by the audio added since last call."""
+        if not self._continues(utterance):
+            self.reset()
+        # Frame i is complete once sample i * HOP_LENGTH + N_FFT / 2 arrived
+        complete = max(0, (len(utterance) - N_FFT // 2) // HOP_LENGTH + 1)
+        if len(utterance) <= N_FFT // 2:
+            complete = 0  # the start reflection needs N_FFT / 2 samples
+        new = _log_mel_frames(utterance, len(self._frames), complete, self._filters)
+        self.stats.computed += len(new)
+        self._frames = np.concatenate([self._frames, new])
+        self._num_samples = len(utterance)
+        self._edge = np.array(utterance[-N_FFT:], np.float32)
+
+    def window(self, utterance: np.ndarray, start: int = 0) -> np.ndarray:
+        """
+        Model input for `utterance[start:]`, with `start` rounded down to
+        the hop grid.
+
+        Returns
+        -------
+        np.ndarray
+            Shape (n_mels, N_FRAMES).
+        """
+        self.update(utterance)
+        first = start // HOP_LENGTH
+        last = first + _num_frames(len(utterance) - first * HOP_LENGTH)
+        last = min(last, first + N_FRAMES)
+        cached = self._frames[first:last]
+        tail = _log_mel_frames(utterance, first + len(cached), last, self._filters)
+        self.stats.reused += len(cached)
+        self.stats.computed += len(tail)
+        return normalize(np.concatenate([cached, tail]))
@@ -0,0 +1,404 @@
+"""
+inference_server.py
+
+Out-of-process speech-to-text shared by several ASGI workers.
+
+`InferenceServer` owns the engines (through a `ModelRegistry`) and serves
+transcription requests on a Unix domain socket. Segments from every
+connected worker go through one `TranscriptionScheduler` per model, so
+they are batched together and the model is loaded once per box instead
+of once per Daphne process. `RemoteSpeechToText` is the client side: a
+`SpeechToText` that forwards each call to the server, selected with
+`SPEECH_TO_TEXT["ENGINE"] = "remote"`.
+
+Wire format, in both directions: a frame is
+
+    <u32 header length> <u32 payload length> <JSON header> <payload>
+
+A request header names the operation ("transcribe", "words" or "ping"),
+the model to use and the dtype ("int16" or "float32") and sample count
+of each segment; the payload holds the raw samples back to back. The
+response header carries the texts, the words or an error message, and
+has an empty payload.
+
+The server only decodes with the models it was configured with (its
+default and the load tiers); requests naming any other model get an
+error. A frame larger than MAX_HEADER_BYTES / MAX_PAYLOAD_BYTES is
+answered with an error (with a null id) and the connection is closed.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import struct
+import threading
+from typing import Any
+
+import numpy as np
+
+from .model_registry import ModelRegistry, ModelSpec, registry as default_registry
+from .speech_to_text import AudioInput, SpeechToText, Word
+from .transcription_scheduler import TranscriptionScheduler
+
+FRAME_HEADER = struct.Struct("<II")
+MAX_HEADER_BYTES = 1 << 20
+MAX_PAYLOAD_BYTES = 64 << 20  # a batch of 30 s float32 segments is ~2 MB each
+TRANSCRIBE = "transcribe"
+WORDS = "words"
+PING = "ping"
+# Failures that leave the request unsent, so it is safe to send it again
+RETRIABLE_ERRORS = (ConnectionRefusedError, BrokenPipeError)
+
+
+class InferenceServerError(RuntimeError):
+    """The inference server failed a request or could not be reached."""
+
+
+def encode_segments(segments: list[AudioInput]) -> tuple[list[list], list[bytes]]:
+    """
+    Describe segments as (dtype, sample count) pairs and raw buffers.
+
+    PCM16 bytes and int16 arrays are sent as int16, float32 arrays as is;
+    other arrays are converted to float32.
+    """
+    shapes, buffers = [], []
+    for segment in segments:
+        if isinstance(segment, (bytes, bytearray, memoryview)):
+            array = np.frombuffer(segment, dtype="<i2")
+        elif segment.dtype == np.int16:
+            array = np.ascontiguousarray(segment, dtype="<i2")
+        else:
+            array = np.ascontiguousarray(segment, dtype="<f4")
+        shapes.append([array.dtype.name, len(array)])
+        buffers.append(array.data)
+    return shapes, buffers
+
+
+def decode_segments(shapes: list[list], payload: bytes) -> list[np.ndarray]:
+    """Inverse of `encode_segments` (arrays are views into `payload`)."""
+    segments, offset = [], 0
+    for dtype_name, length in shapes:
+        if dtype_name not in ("int16", "float32"):
+            raise ValueError(f"Unsupported segment dtype: {dtype_name!r}")
+        dtype = np.dtype("<i2" if dtype_name == "int16" else "<f4")
+        segments.append(np.frombuffer(payload, dtype, length, offset))
+        offset += length * dtype.itemsize
+    if offset != len(payload):
+        raise ValueError("Segment sizes do not match the payload")
+    return segments
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> tuple[dict, bytes]:
+    header_len, payload_len = FRAME_HEADER.unpack(
+        await reader.readexactly(FRAME_HEADER.size)
+    )
+    if header_len > MAX_HEADER_BYTES:
+        raise ValueError(f"Frame header too large: {header_len} bytes")
+    if payload_len > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Frame payload too large: {payload_len} bytes")
+    header = json.loads(await reader.readexactly(header_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return header, payload
+
+
+class InferenceServer:
+    """
+    Asyncio server answering transcription requests on a Unix socket.
+
+    Usage:
+        server = InferenceServer("/run/stt.sock", default_spec=spec)
+        asyncio.run(server.serve_forever())
+
+    Attributes:
+        path (str): Filesystem path of the socket.
+        default_spec (ModelSpec | None): Model used by requests that do
+            not name one.
+        specs (list[ModelSpec]): Other models served, e.g. load tiers.
+            Requests naming a model that is neither are refused.
+        max_batch_size (int): Upper bound on segments per engine call,
+            across all connected workers.
+        max_wait_secs (float): Batching window of the schedulers.
+        num_workers (int): Decode threads per model. Engines that are not
+            thread-safe still decode one batch at a time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        registry: ModelRegistry = default_registry,
+        default_spec: ModelSpec | None = None,
+        max_batch_size: int = 8,
+        max_wait_secs: float = 0.02,
+        num_workers: int = 1,
+        specs: list[ModelSpec] | None = None,
+    ):
+        self.path = path
+        self.registry = registry
+        self.default_spec = default_spec
+        self.specs = list(specs or [])
+        self.max_batch_size = max_batch_size
+        self.max_wait_secs = max_wait_secs
+        self.num_workers = num_workers
+        # Handler task -> writer of each connected client
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._schedulers: dict[ModelSpec, TranscriptionScheduler] = {}
+        # Requested spec -> configured one, whose options (process counts,
+        # ...) are used whatever the client sent
+        self._served = {
+            spec: spec for spec in [default_spec, *self.specs] if spec is not None
+        }
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def connections(self) -> int:
+        """Number of connected clients."""
+        return len(self._connections)
+
+    def scheduler(self, spec: ModelSpec) -> TranscriptionScheduler:
+        """The scheduler (and engine) shared by all requests for `spec`."""
+        if spec not in self._schedulers:
+            self._schedulers[spec] = TranscriptionScheduler(
+                self.registry.engine(spec),
+                num_workers=self.num_workers,
+                max_batch_size=self.max_batch_size,
+                max_wait_secs=self.max_wait_secs,
+            )
+        return self._schedulers[spec]
+
+    async def start(self) -> None:
+        """Listen on the socket, replacing a stale one left by a crash."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+        os.chmod(self.path, 0o660)  # the web workers' user and group only
+        print(f"[INFO] Inference server listening on {self.path}")
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled, then clean up."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Stop listening, drop the connected clients and release the
+        schedulers and their engines.
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writer in self._connections.values():
+            writer.close()  # handlers see EOF and return
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        for scheduler in self._schedulers.values():
+            await scheduler.close()
+        self._schedulers.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one client connection; requests may be pipelined."""
+        self._connections[asyncio.current_task()] = writer
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def answer(header: dict, payload: bytes) -> None:
+            try:
+                response = await self._respond(header, payload)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                response = {"error": f"{type(e).__name__}: {e}"}
+            response["id"] = header.get("id")
+            data = json.dumps(response).encode("utf-8")
+            async with write_lock:
+                writer.write(FRAME_HEADER.pack(len(data), 0) + data)
+                await writer.drain()
+
+        try:
+            while True:
+                header, payload = await _read_frame(reader)
+                task = asyncio.create_task(answer(header, payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client went away
+        except ValueError as e:
+            # The stream cannot be resynchronized: report, then hang up
+            print("[WARN] Inference server: malformed request,", e)
+            data = json.dumps({"id": None, "error": f"Malformed request: {e}"})
+            async with write_lock:
+                writer.write(FRAME_HEADER.pack(len(data), 0) + data.encode("utf-8"))
+                with contextlib.suppress(ConnectionError):
+                    await writer.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _respond(self, header: dict, payload: bytes) -> dict[str, Any]:
+        op = header.get("op")
+        if op == PING:
+            return {
+                "models": [str(spec) for spec in self.registry.loaded()],
+                "connections": self.connections,
+            }
+        if op not in (TRANSCRIBE, WORDS):
+            raise ValueError(f"Unknown operation: {op!r}")
+
+        spec = self._resolve(header.get("model"))
+        scheduler = self.scheduler(spec)
+        segments = decode_segments(header.get("segments", []), payload)
+
+        # Each segment is queued separately so it can share an engine call
+        # with segments from other connections
+        results = await asyncio.gather(
+            *(scheduler.submit(s, word_timestamps=op == WORDS) for s in segments)
+        )
+        if op == WORDS:
+            return {
+                "words": [[[w.text, w.start, w.end] for w in r.words] for r in results]
+            }
+        return {"texts": [result.text for result in results]}
+
+    def _resolve(self, model: Any) -> ModelSpec:
+        """The configured spec a request's `model` description names."""
+        if not model:
+            if self.default_spec is None:
+                raise ValueError("No model requested and no default model")
+            return self.default_spec
+        if not isinstance(model, dict):
+            raise ValueError("The requested model must be an object")
+        requested = ModelSpec.from_config(model)
+        if requested not in self._served:
+            raise ValueError(f"Model not served: {requested}")
+        return self._served[requested]
+
+
+class RemoteSpeechToText(SpeechToText):
+    """
+    `SpeechToText` client of an `InferenceServer`.
+
+    Thread-safe; calls share one connection and are serialized. The
+    connection is opened on first use and re-opened once per call when
+    the server refused it or had closed it (broken pipe), so web workers
+    survive a restart of the server. Timeouts are not retried: the server
+    may still be decoding the request.
+
+    Attributes:
+        socket_path (str): Path of the server socket.
+        model (dict | None): `SPEECH_TO_TEXT`-style description of the
+            model the server should use (its default when None).
+        timeout_secs (float): Socket timeout per call.
+    """
+
+    thread_safe = True
+
+    def __init__(
+        self,
+        socket_path: str,
+        model: dict[str, Any] | None = None,
+        timeout_secs: float = 120.0,
+    ):
+        self.socket_path = socket_path
+        self.model = model
+        self.timeout_secs = timeout_secs
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        return self.transcribe_batch([audio_bytes])[0]
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        if not audio_batch:
+            return []
+        return self._call(TRANSCRIBE, audio_batch)["texts"]
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        words = self._call(WORDS, [audio_bytes])["words"][0]
+        return [Word(text, start, end) for text, start, end in words]
+
+    def ping(self) -> dict[str, Any]:
+        """Loaded models and connection count of the server."""
+        return self._call(PING, [])
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _call(self, op: str, segments: list[AudioInput]) -> dict[str, Any]:
+        shapes, buffers = encode_segments(segments)
+        with self._lock:
+            self._next_id += 1
+            header = {"id": self._next_id, "op": op, "segments": shapes}
+            if self.model:
+                header["model"] = self.model
+            for attempt in range(2):
+                try:
+                    response = self._exchange(header, buffers)
+                    break
+                except OSError as e:
+                    # A frame may be half sent or received: start over
+                    self._disconnect()
+                    if isinstance(e, TimeoutError):
+                        raise InferenceServerError(
+                            f"No reply from the inference server at "
+                            f"{self.socket_path} within {self.timeout_secs}s"
+                        ) from e
+                    if attempt or not isinstance(e, RETRIABLE_ERRORS):
+                        raise InferenceServerError(
+                            f"Inference server at {self.socket_path} unreachable: {e}"
+                        ) from e
+        if "error" in response:
+            raise InferenceServerError(response["error"])
+        return response
+
+    def _exchange(self, header: dict, buffers: list) -> dict[str, Any]:
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout_secs)
+            self._sock.connect(self.socket_path)
+        data = json.dumps(header).encode("utf-8")
+        payload_len = sum(memoryview(buffer).nbytes for buffer in buffers)
+        self._sock.sendall(FRAME_HEADER.pack(len(data), payload_len) + data)
+        for buffer in buffers:
+            self._sock.sendall(buffer)
+
+        header_len, payload_len = FRAME_HEADER.unpack(
+            self._recv_exactly(FRAME_HEADER.size)
+        )
+        response = json.loads(self._recv_exactly(header_len))
+        self._recv_exactly(payload_len)
+        if response.get("id") is None and "error" in response:
+            self._disconnect()  # the server hangs up after a malformed frame
+            return response
+        if response.get("id") != header["id"]:
+            raise ConnectionError("Out-of-order response from inference server")
+        return response
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = bytearray(size)
+        view = memoryview(data)
+        received = 0
+        while received < size:
+            count = self._sock.recv_into(view[received:])
+            if count == 0:
+                raise ConnectionError("Inference server closed the connection")
+            received += count
+        return bytes(data)
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
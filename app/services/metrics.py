@@ -0,0 +1,318 @@
+"""
+metrics.py
+
+In-process latency histograms, counters and gauges for the speech
+pipeline, rendered in the Prometheus text exposition format.
+
+Each stage of a session is timed into the `STAGE_SECONDS` histogram,
+labelled by stage:
+
+    vad        WebRTC VAD over an incoming chunk
+    buffer     utterance accumulation in the segmenter
+    queue      wait for an STT worker (including the batching window)
+    decode     engine time per batch
+    llm        one chat completion, or a whole streamed one
+    llm_first_token
+               time to the first streamed token
+    ws_send    one WebSocket send
+
+Decode speed is tracked as the `REAL_TIME_FACTOR` histogram (engine time
+per second of audio, per batch) and the `AUDIO_SECONDS` and
+`DECODE_SECONDS` counters, whose rate ratio is the RTF over any window.
+With model tiers, `SEGMENTS_BY_MODEL` counts the segments of each model.
+The metrics are process-local: every ASGI worker exposes its own.
+
+Usage:
+    with STAGE_SECONDS.time(stage="vad"):
+        flags = detector.frame_flags(samples)
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# Seconds, from sub-millisecond VAD calls to slow LLM completions
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Name, help text and label names shared by every metric type."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        return _format_labels({**dict(zip(self.labelnames, key)), **extra})
+
+    def samples(self) -> list[str]:
+        """Sample lines in the text exposition format."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing total (the name should end in `_total`)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down. Either set explicitly or read from a
+    callback at scrape time (`set_function`), e.g. a queue size.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """Read the value from `function` at every scrape instead."""
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._value
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative bucket counts, sum and count of observed values.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds, in increasing order;
+            +Inf is implied.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: observations per bucket (+Inf last) and their sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        with self._lock:
+            if key not in self._counts:
+                self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            self._counts[key][index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block, in seconds."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, list(counts), self._sums[key])
+                for key, counts in self._counts.items()
+            )
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _format_value(bound)
+                lines.append(
+                    f"{self.name}_bucket{self._labels(key, le=le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Shared by the consumer, the services and the /metrics view
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "ai_communication_stage_seconds",
+    "Time spent in each stage of a speaking session.",
+    labelnames=("stage",),
+)
+REAL_TIME_FACTOR = metrics.histogram(
+    "ai_communication_real_time_factor",
+    "Decode time per second of audio, per engine batch.",
+    buckets=RTF_BUCKETS,
+)
+AUDIO_SECONDS = metrics.counter(
+    "ai_communication_audio_seconds_total", "Seconds of audio decoded."
+)
+DECODE_SECONDS = metrics.counter(
+    "ai_communication_decode_seconds_total", "Engine time spent decoding."
+)
+ACTIVE_SESSIONS = metrics.gauge(
+    "ai_communication_active_sessions", "Open /ws/audio/ sessions."
+)
+QUEUE_DEPTH = metrics.gauge(
+    "ai_communication_transcription_queue_depth",
+    "Segments waiting for a speech-to-text worker.",
+)
+SEGMENTS_BY_MODEL = metrics.counter(
+    "ai_communication_segments_total",
+    "Segments decoded, by model tier.",
+    labelnames=("model",),
+)
+OVERLOAD_EVENTS = metrics.counter(
+    "ai_communication_overload_total",
+    "Sessions rejected, utterances dropped or coalesced and partials skipped "
+    "under overload.",
+    labelnames=("action",),
+)
@@ -0,0 +1,139 @@
+"""
+microphone.py
+
+Optional local microphone capture for command-line transcription.
+
+Engines only do inference; capture lives here so that the server, batch
+commands and tests never open an audio device or start PortAudio
+threads. PyAudio is imported when a `Microphone` is opened, so it is not
+needed unless this module is actually used.
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+from .segmenter import UtteranceSegmenter
+from .speech_to_text import SpeechToText
+from .vad import SpeechDetector
+
+SAMPLE_RATE = 16000
+CHUNK_DURATION_IN_SECS = 0.512
+FRAMES_PER_BUFFER = 1024
+
+
+class Microphone:
+    """
+    PCM16 mono input stream from the default audio device.
+
+    Usage:
+        with Microphone() as microphone:
+            for chunk in microphone.chunks():
+                ...
+
+    Attributes:
+        sample_rate (int): Capture rate in Hz.
+        chunk_secs (float): Duration of each chunk returned by `read_chunk()`.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        chunk_secs: float = CHUNK_DURATION_IN_SECS,
+        frames_per_buffer: int = FRAMES_PER_BUFFER,
+    ):
+        self.sample_rate = sample_rate
+        self.chunk_secs = chunk_secs
+        self.frames_per_buffer = frames_per_buffer
+        self._audio = None
+        self._stream = None
+
+    def open(self) -> "Microphone":
+        """Open the input stream (imports PyAudio on first use)."""
+        if self._stream is not None:
+            return self
+        import pyaudio  # pylint: disable=import-outside-toplevel
+
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+        )
+        return self
+
+    def __enter__(self) -> "Microphone":
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read_chunk(self) -> bytes:
+        """Record one chunk of raw PCM16 audio."""
+        if self._stream is None:
+            self.open()
+        num_buffers = int(self.sample_rate * self.chunk_secs / self.frames_per_buffer)
+        return b"".join(
+            self._stream.read(self.frames_per_buffer, exception_on_overflow=False)
+            for _ in range(num_buffers)
+        )
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield chunks until the caller stops iterating."""
+        while True:
+            yield self.read_chunk()
+
+    def close(self) -> None:
+        """Stop the stream and release PortAudio."""
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+            if self._audio is not None:
+                self._audio.terminate()
+        except (OSError, ValueError) as e:
+            print(f"[close] PyAudio error: {e}")
+        finally:
+            self._stream = None
+            self._audio = None
+
+
+def transcribe_microphone(
+    engine: SpeechToText,
+    microphone: Microphone | None = None,
+    segmenter: UtteranceSegmenter | None = None,
+) -> str:
+    """
+    Transcribe the microphone utterance by utterance, printing each one,
+    until KeyboardInterrupt. The utterance in progress at that point is
+    transcribed too. Returns the full transcript.
+    """
+    microphone = microphone or Microphone()
+    segmenter = segmenter or UtteranceSegmenter(
+        SpeechDetector(microphone.sample_rate, mode=2)
+    )
+    transcript = []
+    print("Listening... Press Ctrl+C to stop.")
+
+    def emit(utterances: list[np.ndarray]) -> None:
+        for utterance in utterances:
+            transcription = engine.transcribe(utterance)
+            if transcription:
+                print("\033[92m" + transcription + "\033[0m")
+                transcript.append(transcription)
+
+    with microphone:
+        try:
+            for chunk in microphone.chunks():
+                # Transcribe each utterance once the speaker pauses
+                emit(segmenter.feed(chunk))
+        except KeyboardInterrupt:
+            pass
+    emit(segmenter.flush())
+
+    full_transcript = " ".join(transcript)
+    print("\n--- Transcription finished ---")
+    print("Full transcript:\n", full_transcript)
+    return full_transcript
@@ -0,0 +1,408 @@
+"""
+model_registry.py
+
+Process-wide registry of speech-to-text engines.
+
+Engines are identified by a `ModelSpec` (engine, model, device,
+precision, assistant model) and loaded on first use, so importing the consumer, running
+management commands or serving HTTP views no longer pays for a model
+load. Every caller asking for the same spec shares one instance, a
+background warm-up can load a model and run a short decode at startup,
+and when the estimated size of the loaded models exceeds the memory
+budget the least recently used idle ones are unloaded.
+
+Callers normally hold a `RegisteredEngine` (see `ModelRegistry.engine`),
+a `SpeechToText` that resolves the real engine on every call. A model
+that is being used is never evicted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from .engines import create_speech_to_text
+from .speech_to_text import AudioInput, SpeechToText, Word
+
+SAMPLE_RATE = 16000
+WARM_UP_SECS = 1.0
+
+# Approximate parameter counts of the Whisper checkpoints, for the budget
+_PARAMETERS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "turbo": 809_000_000,
+    "large": 1_550_000_000,
+}
+_BYTES_PER_PARAMETER = {
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int8": 1,
+}
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    Identity of a loaded engine. Two specs that compare equal share one
+    instance.
+
+    Attributes:
+        engine (str): Backend name, see `create_speech_to_text`.
+        model (str): Whisper checkpoint, e.g. "medium.en".
+        device (str): "cuda" or "cpu".
+        compute_type (str): Weight precision, e.g. "float32" or "int8".
+        assistant (str): Draft checkpoint for assisted decoding, or ""
+            for plain decoding.
+        options (dict): Extra engine settings (process counts, server
+            socket, ...). Not part of the identity.
+    """
+
+    engine: str
+    model: str
+    device: str
+    compute_type: str
+    assistant: str = ""
+    options: dict[str, Any] = field(default_factory=dict, compare=False, hash=False)
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "ModelSpec":
+        """
+        Build a spec from a `SPEECH_TO_TEXT`-style settings dictionary.
+
+        An assistant model no smaller than the main model cannot speed it
+        up and is dropped, e.g. for a tiny.en tier assisted by tiny.en.
+        """
+        engine = config.get("ENGINE", "whisper")
+        device = config.get("DEVICE", "cuda" if engine == "whisper" else "cpu")
+        if engine == "whisper":
+            compute_type = "float32"  # the transformers pipeline default
+        elif engine == "process_pool":
+            compute_type, device = "float32", "cpu"
+        else:
+            compute_type = config.get("COMPUTE_TYPE", "int8")
+        options = {
+            key: config[key]
+            for key in (
+                "NUM_PROCESSES",
+                "THREADS_PER_PROCESS",
+                "SOCKET_PATH",
+                "SERVER_ENGINE",
+            )
+            if config.get(key)
+        }
+        model = config.get("MODEL", "medium.en")
+        assistant = config.get("ASSISTANT_MODEL") or ""
+        if assistant and _parameters(assistant) >= _parameters(model):
+            assistant = ""
+        return cls(engine, model, device, compute_type, assistant, options)
+
+    def to_config(self) -> dict[str, Any]:
+        """Settings dictionary accepted by `create_speech_to_text`."""
+        return {
+            "ENGINE": self.engine,
+            "MODEL": self.model,
+            "DEVICE": self.device,
+            "COMPUTE_TYPE": self.compute_type,
+            "ASSISTANT_MODEL": self.assistant,
+            **self.options,
+        }
+
+    def __str__(self) -> str:
+        name = f"{self.engine}:{self.model}@{self.device}/{self.compute_type}"
+        return f"{name}+{self.assistant}" if self.assistant else name
+
+
+def _parameters(model: str) -> int:
+    """Approximate parameter count of a checkpoint name."""
+    name = model.lower().rsplit("/", 1)[-1]
+    return next(
+        (count for size, count in _PARAMETERS.items() if size in name),
+        _PARAMETERS["medium"],
+    )
+
+
+def estimate_model_bytes(spec: ModelSpec) -> int:
+    """
+    Rough memory footprint of an engine, from the checkpoint size and the
+    weight precision. Unknown checkpoints count as "medium". Remote
+    engines hold no weights in this process; an assistant model adds its
+    own weights.
+    """
+    if spec.engine == "remote":
+        return 0
+    parameters = _parameters(spec.model)
+    if spec.assistant:
+        parameters += _parameters(spec.assistant)
+    copies = 1
+    if spec.engine == "process_pool":
+        copies = spec.options.get("NUM_PROCESSES") or 1
+    return parameters * _BYTES_PER_PARAMETER.get(spec.compute_type, 4) * copies
+
+
+@dataclass
+class RegistryStats:
+    """
+    Counters of a ModelRegistry.
+
+    Attributes:
+        loads (int): Engines loaded.
+        evictions (int): Engines unloaded to stay under the budget or
+            because they were idle.
+        load_secs (float): Total time spent loading engines.
+    """
+
+    loads: int = 0
+    evictions: int = 0
+    load_secs: float = 0.0
+
+
+@dataclass(eq=False)
+class _Entry:
+    spec: ModelSpec
+    engine: SpeechToText | None = None
+    size_bytes: int = 0
+    in_use: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    load_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, deduplicated engines with LRU eviction.
+
+    Thread-safe: engines are used from scheduler worker threads, and
+    concurrent first uses of a spec load it only once.
+
+    Attributes:
+        memory_budget_bytes (int): Estimated size above which idle engines
+            are unloaded, least recently used first. 0 means no limit.
+        stats (RegistryStats): Load and eviction counters.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = 0,
+        loader: Callable[[ModelSpec], SpeechToText] | None = None,
+        estimator: Callable[[ModelSpec], int] = estimate_model_bytes,
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.stats = RegistryStats()
+        self._loader = loader or (lambda spec: create_speech_to_text(spec.to_config()))
+        self._estimator = estimator
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[ModelSpec, _Entry] = OrderedDict()
+
+    def loaded(self) -> list[ModelSpec]:
+        """Specs of the loaded engines, least recently used first."""
+        with self._lock:
+            return [s for s, e in self._entries.items() if e.engine is not None]
+
+    @property
+    def loaded_bytes(self) -> int:
+        """Estimated memory held by the loaded engines."""
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values() if e.engine)
+
+    def engine(self, spec: ModelSpec) -> "RegisteredEngine":
+        """A `SpeechToText` handle that loads `spec` on first use."""
+        return RegisteredEngine(self, spec)
+
+    @contextmanager
+    def use(self, spec: ModelSpec) -> Iterator[SpeechToText]:
+        """
+        Load `spec` if needed and keep it from being evicted while the
+        block runs.
+        """
+        entry = self._acquire(spec)
+        try:
+            yield entry.engine
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+            # Models pinned during a load may have kept us over budget
+            self._close_all(self._evict_over_budget())
+
+    def _acquire(self, spec: ModelSpec) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(spec)
+            if entry is None:
+                entry = self._entries[spec] = _Entry(spec)
+            self._entries.move_to_end(spec)
+            entry.in_use += 1
+
+        try:
+            with entry.load_lock:
+                if entry.engine is None:
+                    started_at = time.perf_counter()
+                    print(f"[INFO] Loading speech-to-text model {spec}...")
+                    entry.engine = self._loader(spec)
+                    entry.size_bytes = self._estimator(spec)
+                    self.stats.loads += 1
+                    self.stats.load_secs += time.perf_counter() - started_at
+        except BaseException:
+            with self._lock:
+                entry.in_use -= 1
+                if entry.engine is None and self._entries.get(spec) is entry:
+                    del self._entries[spec]
+            raise
+
+        self._close_all(self._evict_over_budget())
+        return entry
+
+    def _evict_over_budget(self) -> list[_Entry]:
+        """Pop idle LRU entries until under the budget; returns them."""
+        if self.memory_budget_bytes <= 0:
+            return []
+        evicted = []
+        with self._lock:
+            total = sum(e.size_bytes for e in self._entries.values() if e.engine)
+            for spec, entry in list(self._entries.items()):
+                if total <= self.memory_budget_bytes:
+                    break
+                if entry.engine is None or entry.in_use:
+                    continue
+                del self._entries[spec]
+                total -= entry.size_bytes
+                evicted.append(entry)
+        return evicted
+
+    def unload_idle(self, idle_secs: float) -> list[ModelSpec]:
+        """Unload engines unused for at least `idle_secs`."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                spec
+                for spec, entry in self._entries.items()
+                if entry.engine is not None
+                and not entry.in_use
+                and now - entry.last_used >= idle_secs
+            ]
+            evicted = [self._entries.pop(spec) for spec in idle]
+        self._close_all(evicted)
+        return idle
+
+    def unload(self, spec: ModelSpec) -> bool:
+        """Unload `spec` now unless it is in use. Returns True if unloaded."""
+        with self._lock:
+            entry = self._entries.get(spec)
+            if entry is None or entry.in_use:
+                return False
+            del self._entries[spec]
+        self._close_all([entry])
+        return True
+
+    def _close_all(self, entries: list[_Entry]) -> None:
+        for entry in entries:
+            with entry.load_lock:
+                if entry.engine is not None:
+                    print(f"[INFO] Unloading speech-to-text model {entry.spec}")
+                    entry.engine.close()
+                    entry.engine = None
+                    self.stats.evictions += 1
+
+    def warm_up(
+        self, spec: ModelSpec, background: bool = True
+    ) -> threading.Thread | None:
+        """
+        Load `spec` and run a short decode of silence so the first real
+        request does not pay for lazy initialization (CUDA context,
+        kernels, allocator pools).
+
+        With `background=True` this runs on a daemon thread, which is
+        returned; errors are reported but never raised.
+        """
+        if not background:
+            self._warm_up(spec)
+            return None
+        thread = threading.Thread(
+            target=self._warm_up_safely,
+            args=(spec,),
+            name=f"warm-up {spec}",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _warm_up(self, spec: ModelSpec) -> None:
+        started_at = time.perf_counter()
+        with self.use(spec) as engine:
+            engine.transcribe(np.zeros(int(WARM_UP_SECS * SAMPLE_RATE), np.float32))
+        print(f"[INFO] Warmed up {spec} in {time.perf_counter() - started_at:.1f}s")
+
+    def _warm_up_safely(self, spec: ModelSpec) -> None:
+        try:
+            self._warm_up(spec)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"[WARN] Warm-up of {spec} failed:", e)
+
+    def close(self) -> None:
+        """Unload every idle engine."""
+        with self._lock:
+            idle = [s for s, e in self._entries.items() if not e.in_use]
+            evicted = [self._entries.pop(spec) for spec in idle]
+        self._close_all(evicted)
+
+
+class RegisteredEngine(SpeechToText):
+    """
+    `SpeechToText` handle for a registry entry.
+
+    Each call loads the engine if it is not loaded (again, after an
+    eviction) and pins it for the duration of the call.
+    """
+
+    def __init__(self, registry: ModelRegistry, spec: ModelSpec):
+        self.registry = registry
+        self.spec = spec
+
+    @contextmanager
+    def loaded(self) -> Iterator[SpeechToText]:
+        """The registry's engine, loaded if needed and pinned for the block."""
+        with self.registry.use(self.spec) as engine:
+            yield engine
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        with self.registry.use(self.spec) as engine:
+            return engine.transcribe(audio_bytes)
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        with self.registry.use(self.spec) as engine:
+            return engine.transcribe_batch(audio_batch)
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        with self.registry.use(self.spec) as engine:
+            return engine.transcribe_words(audio_bytes)
+
+    def transcribe_features(self, features_batch: list[np.ndarray]) -> list[str]:
+        with self.registry.use(self.spec) as engine:
+            return engine.transcribe_features(features_batch)
+
+    def transcribe_features_words(
+        self, features: np.ndarray, duration_secs: float
+    ) -> list[Word]:
+        with self.registry.use(self.spec) as engine:
+            return engine.transcribe_features_words(features, duration_secs)
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        with self.registry.use(self.spec) as engine:
+            return engine.preprocess_audio(audio_bytes)
+
+    def close(self) -> None:
+        """Release the underlying engine if nobody else is using it."""
+        self.registry.unload(self.spec)
+
+
+# Shared by every consumer and command of the process
+registry = ModelRegistry()
@@ -0,0 +1,138 @@
+"""
+model_tiers.py
+
+Load-adaptive choice between several model sizes.
+
+A single pinned checkpoint has to be sized for the worst case: a model
+accurate enough for a quiet afternoon falls behind real time when a
+whole classroom speaks at once. `TierSelector` holds the engines of
+several sizes (e.g. tiny.en, small.en, medium.en, smallest first) and
+picks one for every batch the `TranscriptionScheduler` decodes:
+
+- The real-time factor (engine seconds per second of audio) of each tier
+  is measured on every batch it decodes and smoothed.
+- The backlog (seconds of audio queued, including the batch itself)
+  times a tier's real-time factor predicts how long that tier needs to
+  catch up.
+- The selector moves to a smaller tier while that prediction exceeds
+  the latency target, and back to a larger one only when the larger
+  tier would need at most `headroom` of the target, so it does not
+  flap between two sizes around the threshold.
+
+Tiers that have not decoded anything yet count as fast, so every tier
+gets measured on its first use.
+"""
+
+from dataclasses import dataclass
+
+from .speech_to_text import SpeechToText
+
+
+@dataclass(eq=False)
+class ModelTier:
+    """
+    One model size the scheduler can route segments to.
+
+    Attributes:
+        name (str): Label recorded with each segment, e.g. "small.en".
+        engine (SpeechToText): The engine decoding with this model.
+        real_time_factor (float): Smoothed engine seconds per second of
+            audio (0 until measured).
+        segments (int): Segments decoded with this tier.
+    """
+
+    name: str
+    engine: SpeechToText
+    real_time_factor: float = 0.0
+    segments: int = 0
+
+    def catch_up_secs(self, backlog_secs: float) -> float:
+        """Predicted engine time to decode `backlog_secs` of audio."""
+        return backlog_secs * self.real_time_factor
+
+
+class TierSelector:
+    """
+    Picks the largest model that keeps up with the current load.
+
+    Not thread-safe: meant to be used from the scheduler's event loop.
+
+    Attributes:
+        tiers (list[ModelTier]): Smallest (fastest) to largest.
+        latency_target_secs (float): Time to clear the backlog above
+            which the selector downgrades.
+        headroom (float): Fraction of the target the next larger tier
+            must fit in before the selector upgrades.
+        smoothing (float): Weight of the newest measurement in the
+            real-time factor moving average.
+        current (int): Index of the tier in use; starts at the largest.
+    """
+
+    def __init__(
+        self,
+        tiers: list[ModelTier],
+        latency_target_secs: float = 2.0,
+        headroom: float = 0.5,
+        smoothing: float = 0.2,
+    ):
+        if not tiers:
+            raise ValueError("TierSelector needs at least one tier")
+        self.tiers = tiers
+        self.latency_target_secs = latency_target_secs
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.current = len(tiers) - 1
+
+    @property
+    def tier(self) -> ModelTier:
+        """The tier in use."""
+        return self.tiers[self.current]
+
+    def select(self, backlog_secs: float) -> ModelTier:
+        """
+        Choose the tier for the next batch.
+
+        Parameters
+        ----------
+        backlog_secs : float
+            Seconds of audio waiting, including the batch being decoded.
+
+        Returns
+        -------
+        ModelTier
+            The tier to decode with.
+        """
+        target = self.latency_target_secs
+        while self.current > 0 and self.tier.catch_up_secs(backlog_secs) > target:
+            self.current -= 1
+        while (
+            self.current < len(self.tiers) - 1
+            and self.tiers[self.current + 1].catch_up_secs(backlog_secs)
+            <= target * self.headroom
+        ):
+            self.current += 1
+        return self.tier
+
+    def record(
+        self, tier: ModelTier, audio_secs: float, compute_secs: float, segments: int
+    ) -> None:
+        """Update a tier's real-time factor after it decoded a batch."""
+        tier.segments += segments
+        if audio_secs <= 0:
+            return
+        measured = compute_secs / audio_secs
+        if not tier.real_time_factor:
+            tier.real_time_factor = measured
+        else:
+            tier.real_time_factor += self.smoothing * (measured - tier.real_time_factor)
+
+    def close(self) -> None:
+        """Release every tier's engine."""
+        for tier in self.tiers:
+            tier.engine.close()
+
+    def __str__(self) -> str:
+        return ", ".join(
+            f"{tier.name} {tier.segments} segments (RTF {tier.real_time_factor:.2f})"
+            for tier in self.tiers
+        )
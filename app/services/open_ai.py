@@ -1,19 +1,71 @@
 import os
-from openai import OpenAI
+import asyncio
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 from dotenv import load_dotenv
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Iterator
 import json
+import time
 
+from .metrics import STAGE_SECONDS
+from .response_cache import ResponseCache
+from .topic_router import TopicRouter
 
-class AIUtilityClient:
+
+# -----------------------------------------------------------------
+# SHARED ASYNC CONNECTION POOL (one per process and endpoint)
+# -----------------------------------------------------------------
+_async_clients: Dict[tuple, AsyncOpenAI] = {}
+
+
+def get_async_openai_client(
+    api_key: str,
+    base_url: str,
+    timeout_secs: float = 30.0,
+    max_connections: int = 32,
+) -> AsyncOpenAI:
     """
-    Class wrapper for interacting with OpenAI API.
-    Supports topic-based feedback + custom-topic feedback via function calling.
+    Return the process-wide AsyncOpenAI client for an endpoint.
+
+    All sessions reuse the same HTTP connection pool instead of opening
+    a new client (and new TLS connections) per WebSocket connection.
     """
+    key = (api_key, base_url)
+    if key not in _async_clients:
+        _async_clients[key] = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout_secs,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            ),
+        )
+    return _async_clients[key]
 
-    def __init__(self, api_key: str, base_url: str, deployment_name: str = "gpt-4o-mini"):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+
+class BaseAIUtilityClient:
+    """
+    Prompts, tools and message building shared by the sync and async clients.
+    """
+
+    # Cache namespace of extract_keywords results (no system prompt there)
+    KEYWORD_CACHE_PROMPT = "tool:extract_keywords"
+    INVALID_TOPIC_ERROR = "Error: Invalid topic. Choose a preset topic or 'custom_topic'."
+
+    def __init__(
+        self,
+        deployment_name: str = "gpt-4o-mini",
+        topic_router: Optional[TopicRouter] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ):
         self.deployment_name = deployment_name
+        # Local classifier tried before the keyword-extraction tool call
+        self.topic_router = topic_router
+        # Feedback and extracted keywords for repeated answers
+        self.response_cache = response_cache
 
         # PRESET TOPICS
         self.prompts = {
@@ -68,6 +120,108 @@ class AIUtilityClient:
         """Executed when the model calls the extract_keywords function."""
         return {"keyword": keyword}
 
+    # -------------------------------------------------------------
+    # MESSAGE BUILDING
+    # -------------------------------------------------------------
+    @staticmethod
+    def _normalize_topic(topic: str) -> str:
+        return topic.lower().replace(" ", "_")
+
+    @staticmethod
+    def _feedback_messages(system_prompt: str, user_text: str) -> List[Dict[str, Any]]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_text}
+        ]
+
+    @staticmethod
+    def _keyword_messages(user_text: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "role": "user",
+                "content": f"Extract the single most important topic keyword from this text: \"{user_text}\""
+            }
+        ]
+
+    @staticmethod
+    def _parse_keyword(response: Any) -> Optional[str]:
+        """Return the keyword from an extract_keywords tool call, if any."""
+        msg = response.choices[0].message
+
+        # Model MUST trigger a function call
+        if not msg.tool_calls:
+            return None
+
+        tool_call = msg.tool_calls[0]
+        function_args = json.loads(tool_call.function.arguments)
+        return function_args["keyword"].lower()
+
+    @staticmethod
+    def _delta_text(chunk: Any) -> str:
+        """Text carried by one streamed completion chunk ("" if none)."""
+        if not chunk.choices:
+            return ""
+        return chunk.choices[0].delta.content or ""
+
+    @staticmethod
+    def _observe_first_token(started_at: float) -> None:
+        """Record the time to the first streamed token."""
+        STAGE_SECONDS.observe(
+            time.perf_counter() - started_at, stage="llm_first_token"
+        )
+
+    def _route_topic(self, user_text: str) -> Optional[str]:
+        """Topic from the local router, or None if absent or not confident."""
+        if self.topic_router is None:
+            return None
+        match = self.topic_router.route(user_text)
+        if match is None:
+            return None
+        print(f"[INFO] Topic routed locally = {match.label} (score {match.score:.2f})")
+        return match.label
+
+    def _cached(self, system_prompt: str, user_text: str) -> Optional[str]:
+        """Cached response for this prompt and text, if any."""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(self.deployment_name, system_prompt, user_text)
+
+    def _remember(
+        self, system_prompt: str, user_text: str, response: Optional[str]
+    ) -> None:
+        """Store a response in the cache (errors and empty text are not)."""
+        if self.response_cache is not None and response:
+            self.response_cache.put(
+                self.deployment_name, system_prompt, user_text, response
+            )
+
+    def _keyword_prompt(self, keyword: str) -> str:
+        """System prompt for a preset or free-form topic keyword."""
+        if keyword in self.prompts:
+            return self.prompts[keyword]
+        return (
+            f"You are an English Speaking Coach specializing in **{keyword.upper()}**. "
+            "Give detailed, domain-specific, friendly feedback. Use bullet points."
+        )
+
+
+class AIUtilityClient(BaseAIUtilityClient):
+    """
+    Class wrapper for interacting with OpenAI API.
+    Supports topic-based feedback + custom-topic feedback via function calling.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        deployment_name: str = "gpt-4o-mini",
+        topic_router: Optional[TopicRouter] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__(deployment_name, topic_router, response_cache)
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+
     # -------------------------------------------------------------
     # INTERNAL CHAT COMPLETION (RAW RESPONSE)
     # -------------------------------------------------------------
@@ -77,82 +231,116 @@ class AIUtilityClient:
         tools: Optional[list] = None
     ) -> Any:
         """Return the raw OpenAI response (not string)."""
-        return self.client.chat.completions.create(
-            model=self.deployment_name,
-            messages=messages,
-            tools=tools
-        )
+        with STAGE_SECONDS.time(stage="llm"):
+            return self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=messages,
+                tools=tools
+            )
 
     # -------------------------------------------------------------
-    # MAIN FEEDBACK FUNCTION
+    # SYSTEM PROMPT FOR A TOPIC
     # -------------------------------------------------------------
-    def generate_feedback(self, user_text: str, topic: str) -> str:
-        topic = topic.lower().replace(" ", "_")
+    def _system_prompt(
+        self, user_text: str, topic: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Return (system_prompt, error) for a topic."""
+        topic = self._normalize_topic(topic)
 
         # ---------------------------------------------------------
         # 1. PRESET TOPIC HANDLER
         # ---------------------------------------------------------
         if topic in self.prompts:
-            system_prompt = self.prompts[topic]
-
-            response = self._raw_completion([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text}
-            ])
-
-            return response.choices[0].message.content
+            return self.prompts[topic], None
 
         # ---------------------------------------------------------
         # 2. CUSTOM TOPIC USING FUNCTION CALLING
         # ---------------------------------------------------------
         if topic == "custom_topic":
-            print("[INFO] Extracting keyword via Function Calling...")
-
-            # Step 1: Ask AI to extract keyword
-            initial_response = self._raw_completion(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Extract the single most important topic keyword from this text: \"{user_text}\""
-                    }
-                ],
-                tools=self.tools
-            )
+            # Step 0: Classify locally, skipping the extra request when confident
+            routed_topic = self._route_topic(user_text)
+            if routed_topic is not None:
+                return self._keyword_prompt(routed_topic), None
 
-            msg = initial_response.choices[0].message
+            extracted_keyword = self._cached(self.KEYWORD_CACHE_PROMPT, user_text)
+            if extracted_keyword is None:
+                print("[INFO] Extracting keyword via Function Calling...")
 
-            # Model MUST trigger a function call
-            if not msg.tool_calls:
-                return "Error: Model did not call the extract_keywords tool."
+                # Step 1: Ask AI to extract keyword
+                initial_response = self._raw_completion(
+                    messages=self._keyword_messages(user_text),
+                    tools=self.tools
+                )
 
-            # Step 2: Parse function call
-            tool_call = msg.tool_calls[0]
-            function_args = json.loads(tool_call.function.arguments)
-            extracted_keyword = function_args["keyword"].lower()
+                # Step 2: Parse function call
+                extracted_keyword = self._parse_keyword(initial_response)
+                self._remember(self.KEYWORD_CACHE_PROMPT, user_text, extracted_keyword)
+            if extracted_keyword is None:
+                return None, "Error: Model did not call the extract_keywords tool."
 
             print(f"[INFO] Keyword extracted = {extracted_keyword}")
 
             # Step 3: Prepare system prompt from keyword
-            if extracted_keyword in self.prompts:
-                system_prompt = self.prompts[extracted_keyword]
-            else:
-                system_prompt = (
-                    f"You are an English Speaking Coach specializing in **{extracted_keyword.upper()}**. "
-                    "Give detailed, domain-specific, friendly feedback. Use bullet points."
-                )
-
-            # Step 4: Ask AI to give final feedback
-            final_response = self._raw_completion([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text}
-            ])
-
-            return final_response.choices[0].message.content
+            return self._keyword_prompt(extracted_keyword), None
 
         # ---------------------------------------------------------
         # ERROR: UNKNOWN TOPIC
         # ---------------------------------------------------------
-        return "Error: Invalid topic. Choose a preset topic or 'custom_topic'."
+        return None, self.INVALID_TOPIC_ERROR
+
+    # -------------------------------------------------------------
+    # MAIN FEEDBACK FUNCTION
+    # -------------------------------------------------------------
+    def generate_feedback(self, user_text: str, topic: str) -> str:
+        system_prompt, error = self._system_prompt(user_text, topic)
+        if error:
+            return error
+
+        cached = self._cached(system_prompt, user_text)
+        if cached is not None:
+            return cached
+
+        response = self._raw_completion(
+            self._feedback_messages(system_prompt, user_text)
+        )
+        feedback = response.choices[0].message.content
+        self._remember(system_prompt, user_text, feedback)
+        return feedback
+
+    # -------------------------------------------------------------
+    # STREAMING FEEDBACK
+    # -------------------------------------------------------------
+    def stream_feedback(self, user_text: str, topic: str) -> Iterator[str]:
+        """
+        Same as generate_feedback, but yields the feedback text in pieces
+        as the model produces them. Errors are yielded as a single piece.
+        """
+        system_prompt, error = self._system_prompt(user_text, topic)
+        if error:
+            yield error
+            return
+
+        cached = self._cached(system_prompt, user_text)
+        if cached is not None:
+            yield cached
+            return
+
+        started_at = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.deployment_name,
+            messages=self._feedback_messages(system_prompt, user_text),
+            stream=True,
+        )
+        pieces = []
+        for chunk in stream:
+            delta = self._delta_text(chunk)
+            if delta:
+                if not pieces:
+                    self._observe_first_token(started_at)
+                pieces.append(delta)
+                yield delta
+        STAGE_SECONDS.observe(time.perf_counter() - started_at, stage="llm")
+        self._remember(system_prompt, user_text, "".join(pieces))
 
     # -------------------------------------------------------------
     # FREE CHAT
@@ -162,6 +350,155 @@ class AIUtilityClient:
         return response.choices[0].message.content
 
 
+class AsyncAIUtilityClient(BaseAIUtilityClient):
+    """
+    Non-blocking variant of AIUtilityClient built on AsyncOpenAI.
+
+    Meant to be created once per process and shared by every consumer:
+    it reuses one HTTP connection pool, caps the number of in-flight
+    requests and applies a per-request timeout, so a slow LLM call never
+    blocks the event loop or starves other sessions.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        deployment_name: str = "gpt-4o-mini",
+        timeout_secs: float = 30.0,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        topic_router: Optional[TopicRouter] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__(deployment_name, topic_router, response_cache)
+        self.client = get_async_openai_client(
+            api_key, base_url, timeout_secs, max_connections
+        )
+        self.timeout_secs = timeout_secs
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    # -------------------------------------------------------------
+    # INTERNAL CHAT COMPLETION (RAW RESPONSE)
+    # -------------------------------------------------------------
+    async def _raw_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[list] = None
+    ) -> Any:
+        """Return the raw OpenAI response, waiting for a concurrency slot."""
+        async with self._semaphore:
+            with STAGE_SECONDS.time(stage="llm"):
+                return await self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=messages,
+                    tools=tools,
+                    timeout=self.timeout_secs,
+                )
+
+    # -------------------------------------------------------------
+    # SYSTEM PROMPT FOR A TOPIC
+    # -------------------------------------------------------------
+    async def _system_prompt(
+        self, user_text: str, topic: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Return (system_prompt, error) for a topic."""
+        topic = self._normalize_topic(topic)
+
+        if topic in self.prompts:
+            return self.prompts[topic], None
+
+        if topic == "custom_topic":
+            routed_topic = self._route_topic(user_text)
+            if routed_topic is not None:
+                return self._keyword_prompt(routed_topic), None
+
+            extracted_keyword = self._cached(self.KEYWORD_CACHE_PROMPT, user_text)
+            if extracted_keyword is None:
+                print("[INFO] Extracting keyword via Function Calling...")
+                initial_response = await self._raw_completion(
+                    messages=self._keyword_messages(user_text),
+                    tools=self.tools
+                )
+                extracted_keyword = self._parse_keyword(initial_response)
+                self._remember(self.KEYWORD_CACHE_PROMPT, user_text, extracted_keyword)
+            if extracted_keyword is None:
+                return None, "Error: Model did not call the extract_keywords tool."
+
+            print(f"[INFO] Keyword extracted = {extracted_keyword}")
+            return self._keyword_prompt(extracted_keyword), None
+
+        return None, self.INVALID_TOPIC_ERROR
+
+    # -------------------------------------------------------------
+    # MAIN FEEDBACK FUNCTION
+    # -------------------------------------------------------------
+    async def generate_feedback(self, user_text: str, topic: str) -> str:
+        system_prompt, error = await self._system_prompt(user_text, topic)
+        if error:
+            return error
+
+        cached = self._cached(system_prompt, user_text)
+        if cached is not None:
+            return cached
+
+        response = await self._raw_completion(
+            self._feedback_messages(system_prompt, user_text)
+        )
+        feedback = response.choices[0].message.content
+        self._remember(system_prompt, user_text, feedback)
+        return feedback
+
+    # -------------------------------------------------------------
+    # STREAMING FEEDBACK
+    # -------------------------------------------------------------
+    async def stream_feedback(
+        self, user_text: str, topic: str
+    ) -> AsyncIterator[str]:
+        """
+        Same as generate_feedback, but yields the feedback text in pieces
+        as the model produces them. Errors are yielded as a single piece.
+
+        The concurrency slot is held until the stream is exhausted.
+        """
+        system_prompt, error = await self._system_prompt(user_text, topic)
+        if error:
+            yield error
+            return
+
+        cached = self._cached(system_prompt, user_text)
+        if cached is not None:
+            yield cached
+            return
+
+        pieces = []
+        async with self._semaphore:
+            started_at = time.perf_counter()
+            stream = await self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=self._feedback_messages(system_prompt, user_text),
+                stream=True,
+                timeout=self.timeout_secs,
+            )
+            async for chunk in stream:
+                delta = self._delta_text(chunk)
+                if delta:
+                    if not pieces:
+                        self._observe_first_token(started_at)
+                    pieces.append(delta)
+                    yield delta
+            STAGE_SECONDS.observe(time.perf_counter() - started_at, stage="llm")
+        self._remember(system_prompt, user_text, "".join(pieces))
+
+    # -------------------------------------------------------------
+    # FREE CHAT
+    # -------------------------------------------------------------
+    async def custom_chat(self, prompt: str):
+        response = await self._raw_completion([{"role": "user", "content": prompt}])
+        return response.choices[0].message.content
+
+
 # -----------------------------------------------------------------
 # USAGE EXAMPLE
 # -----------------------------------------------------------------
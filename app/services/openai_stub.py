@@ -0,0 +1,167 @@
+"""
+openai_stub.py
+
+Minimal local stand-in for the OpenAI chat completions endpoint.
+
+Used by the pipeline benchmark (and usable in tests) so that feedback
+latency is measured against a predictable server instead of a live API:
+no key, no cost, no network variance. It answers `POST .../chat/completions`
+with a canned reply, streamed as server-sent events when `stream=True`,
+and with an `extract_keywords` tool call when tools are offered.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "Good answer! Your sentences are clear. Try to vary your vocabulary and "
+    "link ideas with words such as however, therefore and although."
+)
+
+
+class OpenAIStub:
+    """
+    Threaded HTTP server answering chat completion requests.
+
+    Usage:
+        with OpenAIStub(first_token_secs=0.3) as stub:
+            client = AsyncAIUtilityClient("test", stub.base_url)
+
+    Attributes:
+        first_token_secs (float): Delay before the first byte of a reply.
+        token_secs (float): Delay between streamed words.
+        requests (int): Number of completion requests served.
+    """
+
+    def __init__(
+        self,
+        first_token_secs: float = 0.2,
+        token_secs: float = 0.01,
+        reply: str = REPLY,
+    ):
+        self.first_token_secs = first_token_secs
+        self.token_secs = token_secs
+        self.reply = reply
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "OpenAIStub":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="openai-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OpenAIStub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler of OpenAIStub (available as `self.server.stub`)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:  # keep benchmark output clean
+        pass
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        stub = self.server.stub
+        stub.record_request()
+        time.sleep(stub.first_token_secs)
+        if body.get("stream"):
+            self._stream(body)
+        else:
+            self._complete(body)
+
+    def _complete(self, body: dict) -> None:
+        stub = self.server.stub
+        if body.get("tools"):
+            arguments = json.dumps({"keyword": "general"})
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_0",
+                        "type": "function",
+                        "function": {
+                            "name": "extract_keywords",
+                            "arguments": arguments,
+                        },
+                    }
+                ],
+            }
+            finish_reason = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": stub.reply}
+            finish_reason = "stop"
+        payload = _completion(body, "chat.completion")
+        payload["choices"] = [
+            {"index": 0, "message": message, "finish_reason": finish_reason}
+        ]
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        stub = self.server.stub
+        words = stub.reply.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(stub.token_secs)
+            chunk = _completion(body, "chat.completion.chunk")
+            delta = word if i == len(words) - 1 else word + " "
+            chunk["choices"] = [
+                {"index": 0, "delta": {"content": delta}, "finish_reason": None}
+            ]
+            self._event(json.dumps(chunk))
+        self._event("[DONE]")
+        self.close_connection = True
+
+    def _event(self, data: str) -> None:
+        self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def _completion(body: dict, obj: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": obj,
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+    }
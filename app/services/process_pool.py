@@ -0,0 +1,160 @@
+"""
+process_pool.py
+
+CPU-only implementation of the SpeechToText abstract class that spreads
+decoding over a pool of worker processes.
+
+Each worker process loads its own Whisper pipeline with a fixed number of
+intra-op threads, so several segments are decoded in parallel without
+contending for the GIL. Audio is handed to workers through
+`multiprocessing.shared_memory` blocks; only the block name, sample
+count and dtype are pickled.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional, cast
+
+import numpy as np
+
+from .speech_to_text import AudioInput, SpeechToText, Word
+
+# Engine loaded once per worker process by `_init_worker`.
+_worker_engine: Optional[SpeechToText] = None
+
+
+def _init_worker(
+    model_name: str,
+    num_threads: int,
+    loader: Optional[Callable[[str], SpeechToText]] = None,
+) -> None:
+    """Pin the thread count and load the pipeline inside a worker process."""
+    global _worker_engine  # pylint: disable=global-statement
+
+    # Must be set before torch is imported by the Whisper module.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+
+    if loader is not None:
+        _worker_engine = loader(model_name)
+        return
+
+    import torch  # pylint: disable=import-outside-toplevel
+
+    from .whisper import Whisper  # pylint: disable=import-outside-toplevel
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    _worker_engine = Whisper(model_name=model_name, device="cpu")
+
+
+def _transcribe_shared(
+    shm_name: str, num_samples: int, dtype: str, word_timestamps: bool = False
+) -> str | list[Word]:
+    """Transcribe audio samples stored in the named shared memory block."""
+    if _worker_engine is None:
+        raise RuntimeError("Worker process was not initialized")
+
+    shm = SharedMemory(name=shm_name, track=False)
+    try:
+        samples = np.ndarray((num_samples,), dtype=np.dtype(dtype), buffer=shm.buf)
+        try:
+            if word_timestamps:
+                return _worker_engine.transcribe_words(samples)
+            return _worker_engine.transcribe(samples)
+        finally:
+            # The array must not outlive the mapping it points into.
+            del samples
+    finally:
+        shm.close()
+
+
+class ProcessPoolWhisper(SpeechToText):
+    """
+    Whisper STT engine backed by a pool of CPU worker processes.
+
+    Attributes:
+        model_name (str): Whisper checkpoint loaded by every worker.
+        num_processes (int): Number of worker processes (model replicas).
+        threads_per_process (int): Intra-op threads used by each replica.
+
+    `loader`, a picklable module-level function of the model name, builds
+    the engine of each worker instead of the Whisper pipeline (tests).
+    """
+
+    thread_safe = True  # calls only submit work to the process pool
+
+    def __init__(
+        self,
+        model_name: str = "small.en",
+        num_processes: Optional[int] = None,
+        threads_per_process: Optional[int] = None,
+        loader: Optional[Callable[[str], SpeechToText]] = None,
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.model_name = model_name
+        self.threads_per_process = threads_per_process or 2
+        self.num_processes = num_processes or max(
+            1, cpu_count // self.threads_per_process
+        )
+
+        # "spawn" avoids forking a parent that may already hold torch threads.
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.num_processes,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_process, loader),
+        )
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        """Return raw PCM16 mono audio (already PCM16)."""
+        return audio_bytes
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        """Transcribe one segment on a worker process."""
+        return self.transcribe_batch([audio_bytes])[0]
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        """
+        Decode segments in parallel, one per available worker process.
+        """
+        return cast(list[str], self._run_shared(audio_batch, word_timestamps=False))
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        """Transcribe one segment with word timestamps on a worker process."""
+        results = self._run_shared([audio_bytes], word_timestamps=True)
+        return cast(list[Word], results[0])
+
+    def _run_shared(
+        self, audio_batch: list[AudioInput], word_timestamps: bool
+    ) -> list[str | list[Word]]:
+        """Copy each segment into shared memory and decode on the pool."""
+        blocks: list[SharedMemory] = []
+        try:
+            futures = []
+            for audio in audio_batch:
+                if not isinstance(audio, np.ndarray):
+                    audio = np.frombuffer(audio, dtype=np.int16)
+                shm = SharedMemory(create=True, size=max(1, audio.nbytes))
+                blocks.append(shm)
+                np.ndarray(audio.shape, dtype=audio.dtype, buffer=shm.buf)[:] = audio
+                futures.append(
+                    self.executor.submit(
+                        _transcribe_shared,
+                        shm.name,
+                        len(audio),
+                        audio.dtype.str,
+                        word_timestamps,
+                    )
+                )
+            return [future.result() for future in futures]
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def close(self) -> None:
+        """Shut down the worker processes and their models."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,273 @@
+"""
+response_cache.py
+
+Cache of LLM responses keyed by (model, system prompt, normalized text).
+
+Many students answer the same prompt with near-identical sentences. The
+cache answers repeats without an API call:
+
+- exact lookups use a hash of the model, the system prompt and the user
+  text after normalization (case, punctuation and whitespace folded);
+- optional near-duplicate lookups compare an embedding of the text with
+  the entries stored for the same model and system prompt, and accept the
+  closest one above `similarity_threshold`.
+
+Entries live in SQLite, in memory by default or in a file to survive
+restarts and be shared by several processes. Entries expire after
+`ttl_secs`, and the least recently used ones are evicted beyond
+`max_entries`. Lookups only read: expired entries are skipped and
+deleted by the next `put`, and the recency of hits is written in
+batches, so a hit costs one indexed SELECT and no commit.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+# Hits whose recency is kept in memory before one batched UPDATE
+_TOUCH_BATCH = 64
+
+Embedder = Callable[[str], np.ndarray]
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case text, drop punctuation and collapse whitespace."""
+    return " ".join(_NORMALIZE_RE.sub(" ", text.lower()).split())
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedding: character trigram counts hashed into a
+    fixed number of buckets, L2-normalized. Good at spotting sentences
+    that differ by a few words or spellings, not at paraphrases.
+    """
+
+    def __init__(self, dims: int = 512):
+        self.dims = dims
+
+    def __call__(self, text: str) -> np.ndarray:
+        padded = f"  {normalize_text(text)}  "
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i : i + 3].encode("utf-8")) % self.dims] += 1
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@dataclass
+class CacheStats:
+    """
+    Lookup counters of a ResponseCache.
+
+    Attributes:
+        hits (int): Exact-key hits.
+        near_hits (int): Hits through embedding similarity.
+        misses (int): Lookups that found nothing usable.
+        expired (int): Entries removed because their TTL passed.
+        evictions (int): Entries removed by the LRU size limit.
+    """
+
+    hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"hits={self.hits} near_hits={self.near_hits} misses={self.misses} "
+            f"hit_rate={self.hit_rate:.1%} expired={self.expired} "
+            f"evictions={self.evictions}"
+        )
+
+
+class ResponseCache:
+    """
+    SQLite-backed TTL + LRU cache of LLM responses.
+
+    Thread-safe; lookups are local SQLite reads (tens of microseconds)
+    and are cheap enough to run on the event loop.
+
+    Attributes:
+        max_entries (int): Size limit before least recently used entries
+            are evicted.
+        ttl_secs (float): Lifetime of an entry. 0 disables expiry.
+        similarity_threshold (float): Minimum cosine similarity for a
+            near-duplicate hit. 0 disables near-duplicate lookups.
+        stats (CacheStats): Lookup counters.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_entries: int = 4096,
+        ttl_secs: float = 7 * 24 * 3600,
+        similarity_threshold: float = 0.0,
+        embedder: Optional[Embedder] = None,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.similarity_threshold = similarity_threshold
+        if similarity_threshold > 0 and embedder is None:
+            embedder = HashingEmbedder()
+        self.embedder = embedder
+        self.stats = CacheStats()
+
+        self._touched: dict[str, float] = {}  # key -> last hit, not yet written
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding BLOB,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, model: str, system_prompt: str, user_text: str) -> Optional[str]:
+        """Return a cached response, or None on a miss."""
+        namespace = _digest(model, system_prompt)
+        key = _digest(namespace, normalize_text(user_text))
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                (key, self._oldest(now)),
+            ).fetchone()
+            if row is not None:
+                self._touch(key, now)
+                self.stats.hits += 1
+                return row[0]
+
+            if self.similarity_threshold > 0:
+                near = self._nearest(namespace, user_text, self._oldest(now))
+                if near is not None:
+                    self._touch(near[0], now)
+                    self.stats.near_hits += 1
+                    return near[1]
+
+            self.stats.misses += 1
+            return None
+
+    def put(
+        self, model: str, system_prompt: str, user_text: str, response: str
+    ) -> None:
+        """Store a response, evicting the least recently used entries."""
+        namespace = _digest(model, system_prompt)
+        key = _digest(namespace, normalize_text(user_text))
+        embedding = None
+        if self.similarity_threshold > 0:
+            embedding = self.embedder(user_text).astype(np.float32).tobytes()
+        now = time.time()
+
+        with self._lock:
+            self._touched.pop(key, None)
+            self._write_touches()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, response, embedding, now, now),
+            )
+            self._expire(now)
+            self._evict()
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._touched.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def _oldest(self, now: float) -> float:
+        """Creation time of the oldest entry still alive."""
+        return now - self.ttl_secs if self.ttl_secs > 0 else float("-inf")
+
+    def _touch(self, key: str, now: float) -> None:
+        """Record a hit; written with the next put or a full batch."""
+        self._touched[key] = now
+        if len(self._touched) >= _TOUCH_BATCH:
+            self._write_touches()
+            self._db.commit()
+
+    def _write_touches(self) -> None:
+        if self._touched:
+            self._db.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _expire(self, now: float) -> None:
+        if self.ttl_secs <= 0:
+            return
+        self.stats.expired += self._db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (self._oldest(now),)
+        ).rowcount
+
+    def _evict(self) -> None:
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.stats.evictions += excess
+
+    def _nearest(
+        self, namespace: str, user_text: str, oldest: float
+    ) -> Optional[tuple[str, str]]:
+        """(key, response) of the most similar live entry above the threshold."""
+        rows = self._db.execute(
+            "SELECT key, response, embedding FROM responses"
+            " WHERE namespace = ? AND embedding IS NOT NULL AND created_at >= ?",
+            (namespace, oldest),
+        ).fetchall()
+        if not rows:
+            return None
+
+        matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32)
+        matrix = matrix.reshape(len(rows), -1)
+        similarities = matrix @ self.embedder(user_text).astype(np.float32)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return rows[best][0], rows[best][1]
@@ -0,0 +1,106 @@
+"""
+ring_buffer.py
+
+Fixed-size audio ring buffer for per-session accumulation.
+
+The storage is allocated once and mirrored: every sample is written both
+at position `p` and `p + capacity`. Any window of up to `capacity`
+consecutive samples is therefore a single contiguous slice, so reading a
+window or keeping only the tail never reallocates or copies audio.
+"""
+
+import numpy as np
+
+PCM16_SCALE = 1.0 / 32768.0
+
+
+class AudioRingBuffer:
+    """
+    Preallocated mirrored ring buffer of mono audio samples.
+
+    PCM16 input (bytes or int16 arrays) is converted on append when the
+    buffer holds float32 samples, so the conversion cost is paid once per
+    incoming chunk instead of once per transcription of the whole buffer.
+
+    Attributes:
+        capacity (int): Maximum number of samples held. Appending beyond it
+            drops the oldest samples.
+        dtype (np.dtype): Sample type, `np.int16` or `np.float32`.
+    """
+
+    def __init__(self, capacity: int, dtype: type = np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * capacity, dtype=self.dtype)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, samples: bytes | np.ndarray) -> int:
+        """
+        Append PCM16 bytes or a sample array, dropping the oldest samples
+        if the buffer overflows. Returns the number of samples received.
+        """
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        received = len(samples)
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity :]
+
+        num_samples = len(samples)
+        write_pos = (self._start + self._size) % self.capacity
+        first = min(num_samples, self.capacity - write_pos)
+        self._write(write_pos, samples[:first])
+        self._write(0, samples[first:])
+
+        overflow = self._size + num_samples - self.capacity
+        if overflow > 0:
+            self.consume(overflow)
+        self._size += num_samples
+        return received
+
+    def _write(self, pos: int, samples: np.ndarray) -> None:
+        """Copy samples to `pos` and to its mirror at `pos + capacity`."""
+        if not len(samples):
+            return
+        end = pos + len(samples)
+        self._convert_into(self._data[pos:end], samples)
+        self._convert_into(
+            self._data[pos + self.capacity : end + self.capacity], samples
+        )
+
+    def _convert_into(self, out: np.ndarray, samples: np.ndarray) -> None:
+        if self.dtype == np.float32 and samples.dtype == np.int16:
+            np.multiply(samples, PCM16_SCALE, out=out, casting="same_kind")
+        else:
+            out[:] = samples
+
+    def window(self, num_samples: int | None = None) -> np.ndarray:
+        """
+        Return a read-only view of the oldest `num_samples` samples (all
+        samples by default). The view is only valid until the next append.
+        """
+        if num_samples is None or num_samples > self._size:
+            num_samples = self._size
+        view = self._data[self._start : self._start + num_samples]
+        view.flags.writeable = False
+        return view
+
+    def consume(self, num_samples: int) -> None:
+        """Drop the oldest `num_samples` samples."""
+        num_samples = min(num_samples, self._size)
+        self._start = (self._start + num_samples) % self.capacity
+        self._size -= num_samples
+
+    def retain_tail(self, num_samples: int) -> None:
+        """Keep only the newest `num_samples` samples."""
+        self.consume(self._size - max(0, num_samples))
+
+    def clear(self) -> None:
+        """Drop every sample."""
+        self._start = 0
+        self._size = 0
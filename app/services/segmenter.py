@@ -0,0 +1,147 @@
+"""
+segmenter.py
+
+Endpoint-driven utterance segmentation.
+
+Instead of cutting audio every N seconds, the segmenter follows per-frame
+VAD state: an utterance opens on the first voiced frame (with a short
+pre-roll of padding), stays open through pauses shorter than the
+hangover, and closes once the speaker has been silent for the hangover
+period or the utterance reaches its maximum duration. Utterances with
+too little voiced audio are discarded as noise.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from .metrics import STAGE_SECONDS
+from .ring_buffer import AudioRingBuffer
+from .speech_to_text import AudioInput
+from .vad import SpeechDetector, as_pcm16
+
+
+class UtteranceSegmenter:
+    """
+    Per-session state machine turning a PCM16 stream into utterances.
+
+    Attributes:
+        padding_ms (int): Silence kept before the first and after the last
+            voiced frame of an utterance.
+        hangover_ms (int): Silence that ends an utterance.
+        min_speech_secs (float): Minimum voiced audio for an utterance to
+            be emitted.
+        max_utterance_secs (float): Utterances are cut at this length even
+            without a pause.
+    """
+
+    def __init__(
+        self,
+        detector: SpeechDetector,
+        padding_ms: int = 300,
+        hangover_ms: int = 600,
+        min_speech_secs: float = 0.3,
+        max_utterance_secs: float = 15.0,
+    ):
+        self.detector = detector
+        self.padding_ms = padding_ms
+        self.hangover_ms = hangover_ms
+        self.min_speech_secs = min_speech_secs
+        self.max_utterance_secs = max_utterance_secs
+
+        frame_length = detector.frame_length
+        frame_ms = 1000 * frame_length / detector.sample_rate
+        self._padding_frames = max(1, round(padding_ms / frame_ms))
+        self._hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self._min_voiced_frames = max(1, round(1000 * min_speech_secs / frame_ms))
+        self._max_samples = int(max_utterance_secs * detector.sample_rate)
+
+        self._remainder = np.empty(0, dtype=np.int16)
+        self._pre_roll: deque[np.ndarray] = deque(maxlen=self._padding_frames)
+        self._utterance = AudioRingBuffer(
+            capacity=self._max_samples + self._padding_frames * frame_length,
+            dtype=np.float32,
+        )
+        self._triggered = False
+        self._voiced_frames = 0
+        self._silence_run = 0
+
+    @property
+    def in_speech(self) -> bool:
+        """True while an utterance is open."""
+        return self._triggered
+
+    def current(self) -> np.ndarray:
+        """
+        View of the utterance in progress (empty when idle). Only valid
+        until the next `feed()`.
+        """
+        return self._utterance.window()
+
+    def feed(self, audio: AudioInput) -> list[np.ndarray]:
+        """
+        Push a chunk of audio and return the utterances it completed, as
+        float32 arrays owned by the caller.
+        """
+        samples = as_pcm16(audio)
+        if len(self._remainder):
+            samples = np.concatenate([self._remainder, samples])
+
+        with STAGE_SECONDS.time(stage="vad"):
+            frames = self.detector.frames(samples)
+            flags = self.detector.frame_flags(samples)
+        self._remainder = samples[len(frames) * self.detector.frame_length :].copy()
+
+        utterances = []
+        with STAGE_SECONDS.time(stage="buffer"):
+            for frame, voiced in zip(frames, flags):
+                utterance = self._push_frame(frame, bool(voiced))
+                if utterance is not None:
+                    utterances.append(utterance)
+        return utterances
+
+    def flush(self) -> list[np.ndarray]:
+        """Close the open utterance, if any, e.g. when the stream ends."""
+        if not self._triggered:
+            return []
+        utterance = self._close()
+        return [utterance] if utterance is not None else []
+
+    def _push_frame(self, frame: np.ndarray, voiced: bool) -> np.ndarray | None:
+        if not self._triggered:
+            self._pre_roll.append(frame)
+            if voiced:
+                self._triggered = True
+                for padded in self._pre_roll:
+                    self._utterance.append(padded)
+                self._pre_roll.clear()
+                self._voiced_frames = 1
+                self._silence_run = 0
+            return None
+
+        self._utterance.append(frame)
+        if voiced:
+            self._voiced_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if (
+            self._silence_run >= self._hangover_frames
+            or len(self._utterance) >= self._max_samples
+        ):
+            return self._close()
+        return None
+
+    def _close(self) -> np.ndarray | None:
+        """Emit the open utterance (trailing silence trimmed to the padding)."""
+        excess = max(0, self._silence_run - self._padding_frames)
+        keep = len(self._utterance) - excess * self.detector.frame_length
+        utterance = self._utterance.window(keep).copy()
+        long_enough = self._voiced_frames >= self._min_voiced_frames
+
+        self._utterance.clear()
+        self._triggered = False
+        self._voiced_frames = 0
+        self._silence_run = 0
+        return utterance if long_enough else None
@@ -0,0 +1,101 @@
+"""
+session_protocol.py
+
+JSON control messages exchanged on the /ws/audio/ WebSocket.
+
+Audio travels as binary messages; everything else is a JSON text message
+with a ``type`` field. A session runs:
+
+    client                                server
+    {"type": "start", "topic": ...}  ->
+                                     <-   {"type": "ack", "request": "start", ...}
+    <binary audio> ...               ->
+                                     <-   {"type": "transcript", ...} ...
+    {"type": "end"}                  ->
+                                     <-   {"type": "ack", "request": "end"}
+                                     <-   {"type": "final_transcript", "text": ...}
+                                     <-   {"type": "feedback_delta", "text": ...} ...
+                                     <-   {"type": "feedback_done", "text": ...}
+                                     <-   close (1000)
+
+The server flushes the last utterance and generates feedback only after
+``end``, while the socket is still open. A socket closed without ``end``
+is treated as an abandoned session: no inference or LLM call is made for
+it. The ``feedback`` field of the start ack says whether feedback events
+will follow (the client asked for them and the server has an LLM key).
+
+Final transcripts of whole utterances carry ``utterance``, the 0-based
+number of the last utterance (pause-delimited segment) they cover. Some
+numbers are missing when an utterance decodes to no text or is dropped
+under overload, and one transcript covers several when they are merged.
+"""
+
+import json
+from typing import Any
+
+# Client -> server
+START = "start"
+END = "end"
+CLIENT_MESSAGES = (START, END)
+
+# Server -> client
+ACK = "ack"
+TRANSCRIPT = "transcript"
+FINAL_TRANSCRIPT = "final_transcript"
+FEEDBACK_DELTA = "feedback_delta"
+FEEDBACK_DONE = "feedback_done"
+ERROR = "error"
+
+CUSTOM_TOPIC = "custom_topic"
+
+# Topic identifiers used by the topic selection page -> feedback prompt keys
+TOPIC_KEYS = {
+    "daily": "daily_conversation",
+    "travel": "travel",
+    "job": "job_interview",
+    "technology": "technology",
+    "free": "free_talk",
+}
+
+
+class ProtocolError(ValueError):
+    """Raised for a malformed or unknown control message."""
+
+
+def parse_control(text_data: str) -> dict[str, Any]:
+    """
+    Decode a client control message.
+
+    Raises
+    ------
+    ProtocolError
+        If the message is not a JSON object with a known ``type``.
+    """
+    try:
+        message = json.loads(text_data)
+    except json.JSONDecodeError as e:
+        raise ProtocolError(f"Invalid JSON: {e.msg}") from e
+
+    if not isinstance(message, dict):
+        raise ProtocolError("Control message must be a JSON object")
+    if message.get("type") not in CLIENT_MESSAGES:
+        raise ProtocolError(f"Unknown message type: {message.get('type')!r}")
+    return message
+
+
+def resolve_topic(topic: Any) -> str:
+    """
+    Map a topic sent by the client to a feedback prompt key.
+
+    Page identifiers ("job") and prompt keys ("job_interview") are both
+    accepted. Anything else falls back to ``custom_topic``, which lets the
+    model infer the topic from the transcript.
+    """
+    if not isinstance(topic, str):
+        return CUSTOM_TOPIC
+    key = topic.strip().lower().replace(" ", "_")
+    if key in TOPIC_KEYS:
+        return TOPIC_KEYS[key]
+    if key in TOPIC_KEYS.values():
+        return key
+    return CUSTOM_TOPIC
@@ -9,9 +9,52 @@ Subclasses must implement:
     - preprocess_audio():  prepare raw audio for decoding
     - transcribe():        convert audio into text
     - close():             release resources when finished
+
+Subclasses may override:
+    - transcribe_batch():  convert several segments in one model call
+    - transcribe_words():  convert audio into timestamped words
+    - transcribe_features(), transcribe_features_words():
+                           the same from precomputed log-mel features
+    - loaded():            the engine ready to decode, for lazy handles
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, TypeAlias
+
+import numpy as np
+
+# PCM16 mono bytes, an int16 sample array, or float32 samples in [-1, 1].
+AudioInput: TypeAlias = bytes | np.ndarray
+
+
+def to_float32(audio: AudioInput) -> np.ndarray:
+    """
+    Convert audio to float32 samples in [-1, 1].
+
+    Float32 arrays are returned unchanged (no copy), so callers that keep
+    audio in a float32 buffer skip the conversion entirely.
+    """
+    if isinstance(audio, np.ndarray) and audio.dtype == np.float32:
+        return audio
+    return np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+@dataclass(frozen=True)
+class Word:
+    """
+    A recognized word with its position in the decoded audio.
+
+    Attributes:
+        text (str): The word as emitted by the model (may include punctuation).
+        start (float): Start time in seconds from the beginning of the segment.
+        end (float): End time in seconds from the beginning of the segment.
+    """
+
+    text: str
+    start: float
+    end: float
 
 
 class SpeechToText(ABC):
@@ -26,18 +69,25 @@ class SpeechToText(ABC):
         - preprocess_audio():  normalize/convert audio formats
         - transcribe():        produce text from prepared audio
         - close():             release model or hardware resources
+
+    Attributes:
+        thread_safe (bool): Whether several threads may call the engine
+            at once. Schedulers serialize the calls to engines that do
+            not allow it (the default).
     """
 
+    thread_safe = False
+
     @abstractmethod
-    def transcribe(self, audio_bytes: bytes) -> str:
+    def transcribe(self, audio_bytes: AudioInput) -> str:
         """
         Convert audio data into text.
 
         Parameters
         ----------
-        audio_bytes : bytes
-            The raw or preprocessed audio data that will be transcribed.
-            Expected format depends on the implementation (e.g., PCM16 mono).
+        audio_bytes : bytes or np.ndarray
+            The raw or preprocessed audio data that will be transcribed:
+            PCM16 mono bytes / int16 samples, or float32 samples in [-1, 1].
 
         Returns
         -------
@@ -45,6 +95,102 @@ class SpeechToText(ABC):
             The recognized text output after transcription.
         """
 
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        """
+        Convert several independent audio segments into text.
+
+        The default implementation transcribes segments one by one.
+        Engines that can run a batched forward pass should override it.
+
+        Parameters
+        ----------
+        audio_batch : list[bytes or np.ndarray]
+            Audio segments in the same format accepted by `transcribe()`.
+
+        Returns
+        -------
+        list[str]
+            One recognized text per segment, in input order.
+        """
+        return [self.transcribe(audio_bytes) for audio_bytes in audio_batch]
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        """
+        Convert audio data into words with timestamps.
+
+        Used by streaming transcription to decide which audio has already
+        been committed. Engines that cannot produce word timings keep this
+        default and do not support streaming mode.
+
+        Parameters
+        ----------
+        audio_bytes : bytes or np.ndarray
+            Audio in the same format accepted by `transcribe()`.
+
+        Returns
+        -------
+        list[Word]
+            Recognized words in order, timed relative to the segment start.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support word timestamps"
+        )
+
+    def transcribe_features(self, features_batch: list[np.ndarray]) -> list[str]:
+        """
+        Convert precomputed log-mel features (see features.py) into text.
+
+        Lets callers that keep features per session skip the front end.
+        Engines that only accept audio keep this default; callers then
+        fall back to `transcribe_batch()`.
+
+        Parameters
+        ----------
+        features_batch : list[np.ndarray]
+            Model inputs of shape (mels, frames), one per segment.
+
+        Returns
+        -------
+        list[str]
+            One recognized text per segment, in input order.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not accept precomputed features"
+        )
+
+    def transcribe_features_words(
+        self, features: np.ndarray, duration_secs: float
+    ) -> list[Word]:
+        """
+        Convert precomputed log-mel features into words with timestamps.
+
+        Parameters
+        ----------
+        features : np.ndarray
+            Model input of shape (mels, frames).
+        duration_secs : float
+            Audio the features were computed from; bounds the end of the
+            last word.
+
+        Returns
+        -------
+        list[Word]
+            Recognized words in order, timed relative to the segment start.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not accept precomputed features"
+        )
+
+    @contextmanager
+    def loaded(self) -> Iterator["SpeechToText"]:
+        """
+        The engine, ready to decode, for the duration of the block.
+
+        Engines that load their model lazily load it here, so callers can
+        time the decode alone. The default yields the engine itself.
+        """
+        yield self
+
     @abstractmethod
     def preprocess_audio(self, audio_bytes: bytes) -> bytes:
         """
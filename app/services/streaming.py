@@ -0,0 +1,149 @@
+"""
+streaming.py
+
+Incremental transcription with partial hypotheses and local agreement.
+
+Instead of waiting for the end of an utterance, the streamer re-decodes
+the uncommitted part of the utterance in progress every `stride_secs`.
+Words on which two consecutive decodes agree (their longest common
+prefix) are committed and never decoded again: the window start moves
+past the end of the last committed word. The rest of the latest
+hypothesis is exposed as a partial result that may still change.
+
+The audio itself is owned by the caller (see `UtteranceSegmenter`); the
+streamer only tracks offsets into it.
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from .speech_to_text import Word
+
+SAMPLE_RATE = 16000
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+@dataclass
+class StreamUpdate:
+    """
+    Result of feeding one decode into the streamer.
+
+    Attributes:
+        committed (str): Text committed by this update (empty if none).
+        partial (str): Current unstable tail of the hypothesis.
+    """
+
+    committed: str
+    partial: str
+
+
+def _normalize(word: str) -> str:
+    """Lower-case a word and strip punctuation for comparison."""
+    return _NORMALIZE_RE.sub("", word.lower())
+
+
+class LocalAgreementStreamer:
+    """
+    Per-session state for streaming transcription of one utterance at a time.
+
+    Usage:
+        utterance = segmenter.current()
+        if streamer.ready(len(utterance)):
+            words = engine.transcribe_words(streamer.window(utterance))
+            update = streamer.update(words)
+        ...
+        update = streamer.finish(engine.transcribe_words(streamer.window(final)))
+
+    Attributes:
+        stride_secs (float): New audio required before the next decode.
+        max_window_secs (float): Window length after which the current
+            hypothesis is committed even without agreement.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        stride_secs: float = 1.0,
+        max_window_secs: float = 15.0,
+    ):
+        self.sample_rate = sample_rate
+        self.stride_secs = stride_secs
+        self.max_window_secs = max_window_secs
+
+        self._committed_samples = 0
+        self._decoded_samples = 0
+        self._window_samples = 0
+        self._hypothesis: list[Word] = []
+
+    @property
+    def window_secs(self) -> float:
+        """Duration of the last uncommitted window handed out."""
+        return self._window_samples / self.sample_rate
+
+    def ready(self, utterance_samples: int) -> bool:
+        """True once the utterance grew by a stride since the last decode."""
+        new_samples = utterance_samples - self._decoded_samples
+        return new_samples >= self.stride_secs * self.sample_rate
+
+    def window(self, utterance: np.ndarray) -> np.ndarray:
+        """
+        Return the uncommitted tail of `utterance` to decode (a view) and
+        reset the stride.
+        """
+        self._decoded_samples = len(utterance)
+        tail = utterance[self._committed_samples :]
+        self._window_samples = len(tail)
+        return tail
+
+    def update(self, words: list[Word]) -> StreamUpdate:
+        """
+        Feed the words decoded from the last `window()`.
+
+        Commits the prefix shared with the previous hypothesis and moves the
+        window start past the audio it covers.
+        """
+        agreed = 0
+        for previous, current in zip(self._hypothesis, words):
+            if _normalize(previous.text) != _normalize(current.text):
+                break
+            agreed += 1
+
+        if agreed == 0 and self.window_secs >= self.max_window_secs and words:
+            # No agreement for too long: commit all but the last word so the
+            # window cannot grow without bound.
+            agreed = max(1, len(words) - 1)
+
+        committed = words[:agreed]
+        remaining = words[agreed:]
+        if committed:
+            self._trim(committed[-1].end)
+            remaining = [
+                Word(w.text, w.start - committed[-1].end, w.end - committed[-1].end)
+                for w in remaining
+            ]
+        self._hypothesis = remaining
+        return StreamUpdate(
+            committed=" ".join(w.text for w in committed),
+            partial=" ".join(w.text for w in remaining),
+        )
+
+    def finish(self, words: list[Word]) -> StreamUpdate:
+        """
+        Commit every word of the final decode of an utterance and reset.
+        """
+        self.reset()
+        return StreamUpdate(committed=" ".join(w.text for w in words), partial="")
+
+    def reset(self) -> None:
+        """Forget the current utterance."""
+        self._committed_samples = 0
+        self._decoded_samples = 0
+        self._window_samples = 0
+        self._hypothesis = []
+
+    def _trim(self, end_secs: float) -> None:
+        """Move the window start `end_secs` past its current position."""
+        self._committed_samples += int(end_secs * self.sample_rate)
@@ -0,0 +1,126 @@
+"""
+test_admission.py
+
+Unit tests for session admission control and the pending-audio backlog.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.admission import (
+    COALESCE,
+    DROP,
+    REJECT,
+    AdmissionController,
+    PendingAudio,
+)
+
+
+def audio(secs: float, value: int = 1) -> np.ndarray:
+    return np.full(int(16000 * secs), value, np.int16)
+
+
+class TestAdmissionController(SimpleTestCase):
+    """Session limit and saturation policies."""
+
+    def test_session_limit(self) -> None:
+        controller = AdmissionController(max_sessions=2)
+        self.assertTrue(controller.try_admit())
+        self.assertTrue(controller.try_admit())
+        self.assertFalse(controller.try_admit())
+
+        controller.release()
+        self.assertTrue(controller.try_admit())
+        self.assertEqual(controller.stats.admitted, 3)
+        self.assertEqual(controller.stats.rejected, 1)
+
+    def test_reject_policy_refuses_while_saturated(self) -> None:
+        controller = AdmissionController(max_queue_depth=4, policy=REJECT)
+        self.assertTrue(controller.try_admit(queue_depth=3))
+        self.assertFalse(controller.try_admit(queue_depth=4))
+        # Other policies keep admitting and shed work instead
+        self.assertTrue(AdmissionController(4, policy=DROP).try_admit(queue_depth=9))
+
+    def test_unknown_policy(self) -> None:
+        with self.assertRaises(ValueError):
+            AdmissionController(policy="shed")
+
+    def test_saturation_decisions(self) -> None:
+        controller = AdmissionController(max_queue_depth=2, policy=COALESCE)
+        self.assertFalse(controller.skip_partial(1))
+        self.assertFalse(controller.coalesce(1))
+        self.assertTrue(controller.skip_partial(2))
+        self.assertTrue(controller.coalesce(2))
+        self.assertFalse(AdmissionController(0).skip_partial(100))
+        self.assertFalse(AdmissionController(2, policy=DROP).coalesce(5))
+        self.assertFalse(controller.shed(5))
+        self.assertTrue(AdmissionController(max_queue_depth=2, policy=DROP).shed(2))
+        self.assertEqual(controller.stats.skipped_partials, 1)
+
+    def test_drop_policy_keeps_newest_while_saturated(self) -> None:
+        controller = AdmissionController(max_queue_depth=2, policy=DROP)
+        backlog = controller.backlog()
+        for value in range(1, 4):
+            backlog.push(audio(1, value))
+
+        self.assertEqual(controller.next_utterance(backlog, queue_depth=1)[0], 1)
+        self.assertEqual(controller.next_utterance(backlog, queue_depth=2)[0], 3)
+        self.assertIsNone(controller.next_utterance(backlog, queue_depth=2))
+        self.assertEqual(controller.stats.dropped, 1)
+        self.assertAlmostEqual(controller.stats.dropped_secs, 1.0)
+
+    def test_coalesce_policy_merges_while_saturated(self) -> None:
+        controller = AdmissionController(max_queue_depth=2, policy=COALESCE)
+        backlog = controller.backlog()
+        backlog.push(audio(1, 1))
+        backlog.push(audio(1, 2))
+
+        merged = controller.next_utterance(backlog, queue_depth=2)
+        self.assertEqual(len(merged), 2 * 16000 + 1600)
+        self.assertEqual(controller.stats.dropped, 0)
+
+
+class TestPendingAudio(SimpleTestCase):
+    """Bounded backlog of utterances."""
+
+    def test_fifo(self) -> None:
+        backlog = PendingAudio()
+        backlog.push(audio(1, 1))
+        backlog.push(audio(2, 2))
+        self.assertAlmostEqual(backlog.pending_secs, 3.0)
+        self.assertEqual(backlog.pop()[0], 1)
+        self.assertEqual(backlog.pop()[0], 2)
+        self.assertIsNone(backlog.pop())
+        self.assertEqual(backlog.pending_secs, 0)
+
+    def test_budget_drops_oldest(self) -> None:
+        backlog = PendingAudio(budget_secs=5)
+        for value in range(1, 5):
+            backlog.push(audio(2, value))
+
+        self.assertEqual(len(backlog), 2)
+        self.assertEqual(backlog.pop()[0], 3)
+        self.assertEqual(backlog.last_popped, 2)
+        self.assertEqual(backlog.stats.dropped, 2)
+        self.assertAlmostEqual(backlog.stats.dropped_secs, 4.0)
+
+    def test_keeps_single_long_utterance(self) -> None:
+        backlog = PendingAudio(budget_secs=1)
+        backlog.push(audio(3))
+        self.assertEqual(len(backlog.pop()), 48000)
+
+    def test_coalesce_within_window(self) -> None:
+        backlog = PendingAudio()
+        for value, secs in [(1, 10), (2, 10), (3, 15)]:
+            backlog.push(audio(secs, value))
+
+        merged = backlog.pop(coalesce=True)
+        # Two utterances and a 0.1 s gap; the third would exceed 30 s
+        self.assertEqual(len(merged), 16000 * 20 + 1600)
+        self.assertEqual((merged[0], merged[160000], merged[-1]), (1, 0, 2))
+        self.assertEqual(backlog.stats.coalesced, 1)
+        self.assertAlmostEqual(backlog.pending_secs, 15.0)
+        self.assertEqual(backlog.last_popped, 1)
+        self.assertEqual(backlog.pop(coalesce=True)[0], 3)
+        self.assertEqual(backlog.last_popped, 2)
@@ -0,0 +1,180 @@
+"""
+test_batch_transcription.py
+
+Unit tests for offline transcription: memory-mapped WAV reading,
+batched decoding, resumable JSONL output and the management command.
+"""
+
+import io
+import json
+import os
+import struct
+import tempfile
+import wave
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.batch_transcription import (
+    completed_paths,
+    read_wav,
+    recording_key,
+    transcribe_file,
+)
+from app.services.speech_to_text import AudioInput, SpeechToText
+
+SAMPLE_RATE = 16000
+RECORDED_WAV = os.path.join(os.path.dirname(__file__), "recorded.wav")
+
+
+def speech(secs: float) -> np.ndarray:
+    """Voice-band tone that WebRTC VAD classifies as speech."""
+    t = np.arange(int(SAMPLE_RATE * secs)) / SAMPLE_RATE
+    wave_ = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (8000 * wave_ / 1.5).astype(np.int16)
+
+
+def write_wav(path: str, samples: np.ndarray, rate: int = SAMPLE_RATE) -> None:
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(samples.tobytes())
+
+
+class BatchEngine(SpeechToText):
+    """Records batch sizes and labels each utterance."""
+
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        return self.transcribe_batch([audio_bytes])[0]
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        self.batches.append(len(audio_batch))
+        return [f"{len(audio) / SAMPLE_RATE:.0f}s" for audio in audio_batch]
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class TestBatchTranscription(SimpleTestCase):
+    """Reading, segmenting and batching recordings."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_read_wav_is_memory_mapped(self) -> None:
+        samples = read_wav(RECORDED_WAV)
+
+        with wave.open(RECORDED_WAV) as w:
+            expected = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        self.assertIsInstance(samples, np.memmap)
+        np.testing.assert_array_equal(samples, expected)
+
+    def test_read_wav_skips_extra_chunks(self) -> None:
+        """Chunks such as LIST before the data chunk are skipped."""
+        samples = np.arange(100, dtype=np.int16)
+        fmt = struct.pack("<HHIIHH", 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+        body = (
+            b"WAVE"
+            + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+            + b"data" + struct.pack("<I", samples.nbytes) + samples.tobytes()
+        )  # fmt: skip
+        with open(self.path("list.wav"), "wb") as f:
+            f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+        np.testing.assert_array_equal(read_wav(self.path("list.wav")), samples)
+
+    def test_read_wav_rejects_other_formats(self) -> None:
+        write_wav(self.path("44k.wav"), speech(0.1), rate=44100)
+
+        with self.assertRaises(ValueError):
+            read_wav(self.path("44k.wav"))
+
+    def test_transcribe_file_batches_utterances(self) -> None:
+        silence = np.zeros(SAMPLE_RATE, dtype=np.int16)
+        write_wav(
+            self.path("session.wav"),
+            np.concatenate([speech(1), silence, speech(2), silence, speech(1)]),
+        )
+        engine = BatchEngine()
+
+        record = transcribe_file(engine, self.path("session.wav"), batch_size=2)
+
+        self.assertEqual(engine.batches, [2, 1])
+        self.assertEqual(len(record["segments"]), 3)
+        self.assertAlmostEqual(record["audio_secs"], 6.0)
+        self.assertGreater(record["rtf"], 0)
+
+    def test_completed_paths_ignores_truncated_line(self) -> None:
+        with open(self.path("out.jsonl"), "w", encoding="utf-8") as f:
+            f.write('{"path": "a.wav", "text": ""}\n{"path": "b.w')
+
+        self.assertEqual(completed_paths(self.path("out.jsonl")), {"a.wav"})
+
+    def test_recording_key(self) -> None:
+        """Recordings are named relative to the resolved input directory."""
+        path = os.path.join(self.tmp.name, "sub", "a.wav")
+        self.assertEqual(recording_key(path, self.path("sub/..")), "sub/a.wav")
+
+    def test_command_resumes(self) -> None:
+        """A second run only transcribes files missing from the output."""
+        recordings = self.path("recordings")
+        os.mkdir(recordings)
+        for name in ["a.wav", "b.wav"]:
+            write_wav(os.path.join(recordings, name), speech(1))
+        output = self.path("out.jsonl")
+        engine = BatchEngine()
+
+        with mock.patch(
+            "app.management.commands.transcribe_recordings.registry.engine",
+            return_value=engine,
+        ):
+            call_command(
+                "transcribe_recordings", recordings, output=output, stdout=io.StringIO()
+            )
+            os.remove(os.path.join(recordings, "a.wav"))
+            write_wav(os.path.join(recordings, "c.wav"), speech(1))
+            call_command(
+                "transcribe_recordings", recordings, output=output, stdout=io.StringIO()
+            )
+
+        with open(output, encoding="utf-8") as f:
+            paths = [json.loads(line)["path"] for line in f]
+        self.assertEqual(sorted(paths), ["a.wav", "b.wav", "c.wav"])
+
+    def test_command_resumes_with_directory_spelled_differently(self) -> None:
+        """Files are matched relative to the input directory, not as typed."""
+        recordings = self.path("recordings")
+        os.makedirs(os.path.join(recordings, "day1"))
+        write_wav(os.path.join(recordings, "day1", "a.wav"), speech(1))
+        output = self.path("out.jsonl")
+        engine = BatchEngine()
+
+        with mock.patch(
+            "app.management.commands.transcribe_recordings.registry.engine",
+            return_value=engine,
+        ):
+            for directory in [recordings, os.path.join(recordings, "day1", "..")]:
+                call_command(
+                    "transcribe_recordings",
+                    directory,
+                    output=output,
+                    stdout=io.StringIO(),
+                )
+
+        self.assertEqual(len(engine.batches), 1)
+        self.assertEqual(completed_paths(output), {"day1/a.wav"})
@@ -0,0 +1,168 @@
+"""
+test_benchmark_pipeline.py
+
+Unit tests for the OpenAI stub and the pipeline benchmark command.
+"""
+
+import asyncio
+import io
+import json
+import os
+import tempfile
+import wave
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app import consumers
+from app.management.commands.benchmark_pipeline import (
+    compare,
+    session_timings,
+    summarize,
+)
+from app.services.model_registry import ModelRegistry
+from app.services.model_tiers import ModelTier, TierSelector
+from app.services.open_ai import AsyncAIUtilityClient
+from app.services.openai_stub import REPLY, OpenAIStub
+from app.services.speech_to_text import AudioInput, SpeechToText
+
+SAMPLE_RATE = 16000
+
+
+def speech(secs: float) -> np.ndarray:
+    """Voice-band tone that WebRTC VAD classifies as speech."""
+    t = np.arange(int(SAMPLE_RATE * secs)) / SAMPLE_RATE
+    wave_ = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (8000 * wave_ / 1.5).astype(np.int16)
+
+
+class LengthEngine(SpeechToText):
+    """Transcribes each utterance as its duration."""
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        return self.transcribe_batch([audio_bytes])[0]
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        return [f"{len(audio) / SAMPLE_RATE:.0f}s" for audio in audio_batch]
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class UnusedEngine(LengthEngine):
+    """Fails if the benchmark decodes with it."""
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        raise AssertionError("decoded with a tier instead of the benchmarked engine")
+
+
+def write_wav(path: str, samples: np.ndarray) -> None:
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+
+
+class TestOpenAIStub(SimpleTestCase):
+    """The stub speaks enough of the chat completions API for the client."""
+
+    def test_custom_topic_and_streaming(self) -> None:
+        async def run(base_url: str) -> tuple[str, str]:
+            client = AsyncAIUtilityClient("test", base_url)
+            reply = await client.custom_chat("Hello")
+            deltas = client.stream_feedback("I like pasta", "custom_topic")
+            streamed = "".join([delta async for delta in deltas])
+            return reply, streamed
+
+        with OpenAIStub(first_token_secs=0, token_secs=0) as stub:
+            reply, streamed = asyncio.run(run(stub.base_url))
+            self.assertEqual(stub.requests, 3)  # reply, tool call, stream
+        self.assertEqual(reply, REPLY)
+        self.assertEqual(streamed, REPLY)
+
+
+class TestBenchmarkPipeline(SimpleTestCase):
+    """Report shape and comparison of the benchmark command."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_summarize(self) -> None:
+        self.assertIsNone(summarize([]))
+        summary = summarize([float(ms) for ms in range(1, 101)])
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 50.5)
+        self.assertEqual(summary["max"], 100.0)
+
+    def test_command_writes_report(self) -> None:
+        """Two clients replay two utterances each, as fast as possible."""
+        audio = os.path.join(self.tmp.name, "audio.wav")
+        silence = np.zeros(SAMPLE_RATE, np.int16)
+        write_wav(audio, np.concatenate([speech(1), silence] * 2))
+        output = os.path.join(self.tmp.name, "report.json")
+        tiers = TierSelector([ModelTier("tiny.en", UnusedEngine())])
+
+        with (
+            mock.patch(
+                "app.management.commands.benchmark_pipeline.registry",
+                ModelRegistry(loader=lambda spec: LengthEngine()),
+            ),
+            mock.patch.object(consumers.scheduler, "tiers", tiers),
+        ):
+            call_command(
+                "benchmark_pipeline",
+                audio=audio,
+                clients=2,
+                pace=0,
+                stub_first_token_ms=0,
+                stub_token_ms=0,
+                output=output,
+                stdout=io.StringIO(),
+            )
+            self.assertIs(consumers.scheduler.tiers, tiers)
+
+        with open(output, encoding="utf-8") as f:
+            report = json.load(f)
+        results = report["results"]
+        self.assertEqual(report["config"]["clients"], 2)
+        self.assertEqual(results["latency_ms"]["utterance"]["count"], 4)
+        for name in ["final_transcript", "feedback_first_token", "feedback_done"]:
+            self.assertEqual(results["latency_ms"][name]["count"], 2)
+        self.assertEqual(results["throughput"]["segments"], 4)
+        self.assertEqual(results["throughput"]["audio_secs"], 8.0)
+        self.assertGreater(results["memory_mb"]["peak_rss"], 0)
+
+        lines = compare(report, report)
+        self.assertIn("latency_ms.feedback_done p50: ", "\n".join(lines))
+        self.assertTrue(all(line.endswith("(+0%)") for line in lines))
+
+    def test_empty_audio_is_rejected(self) -> None:
+        audio = os.path.join(self.tmp.name, "empty.wav")
+        write_wav(audio, np.zeros(0, np.int16))
+        with self.assertRaisesMessage(CommandError, "No audio"):
+            call_command("benchmark_pipeline", audio=audio, stdout=io.StringIO())
+
+    def test_utterance_latency_follows_the_named_utterance(self) -> None:
+        """An utterance without transcript does not shift the later ones."""
+        sent_at = [0.0, 1.0, 2.0, 3.0]
+        emissions = [1, 2, 3]  # chunk that completed each utterance
+        events = [
+            (0.5, {"type": "ack", "request": "start"}),
+            # utterance 0 decoded to nothing (or was dropped)
+            (2.25, {"type": "transcript", "text": "b", "final": True, "utterance": 1}),
+            (3.5, {"type": "transcript", "text": "c", "final": True, "utterance": 2}),
+            # flushed by "end", no emission to time it from
+            (4.0, {"type": "transcript", "text": "d", "final": True, "utterance": 3}),
+        ]
+
+        timings = session_timings(events, sent_at, 3.5, emissions)
+
+        self.assertEqual(timings["utterance_ms"], [250.0, 500.0])
@@ -0,0 +1,71 @@
+"""
+test_codecs.py
+
+Unit tests for WebSocket audio format negotiation and decoding.
+"""
+
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services import codecs
+
+
+class TestNegotiation(SimpleTestCase):
+    """Subprotocol selection."""
+
+    def test_no_subprotocol_means_pcm16(self) -> None:
+        """Clients that offer nothing get a raw PCM16 decoder."""
+        self.assertIsNone(codecs.negotiate([]))
+        self.assertIsInstance(codecs.create_decoder(None), codecs.Pcm16Decoder)
+
+    def test_first_supported_offer_wins(self) -> None:
+        """The client's preference order is respected."""
+        with mock.patch.object(codecs, "opus_available", return_value=True):
+            chosen = codecs.negotiate([codecs.OPUS, codecs.PCM16])
+
+        self.assertEqual(chosen, codecs.OPUS)
+
+    def test_falls_back_without_opus(self) -> None:
+        """Opus is skipped when the server cannot decode it."""
+        with mock.patch.object(codecs, "opus_available", return_value=False):
+            self.assertEqual(
+                codecs.negotiate([codecs.OPUS, codecs.PCM16]), codecs.PCM16
+            )
+            self.assertIsNone(codecs.negotiate([codecs.OPUS]))
+
+    def test_pcm16_is_passed_through(self) -> None:
+        payload = np.arange(160, dtype=np.int16).tobytes()
+
+        self.assertEqual(codecs.Pcm16Decoder().decode(payload), payload)
+
+    def test_pcm16_rejects_partial_sample(self) -> None:
+        """A message cut inside a sample is rejected, not misaligned."""
+        with self.assertRaises(ValueError):
+            codecs.Pcm16Decoder().decode(b"\x00\x01\x02")
+
+
+@unittest.skipUnless(codecs.opus_available(), "opuslib/libopus not installed")
+class TestOpusDecoder(SimpleTestCase):
+    """Round trip through a real Opus encoder."""
+
+    def test_decodes_one_packet_to_pcm16(self) -> None:
+        import opuslib
+
+        frame_samples = codecs.SAMPLE_RATE * 20 // 1000
+        t = np.arange(frame_samples) / codecs.SAMPLE_RATE
+        tone = (0.3 * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+        encoder = opuslib.Encoder(codecs.SAMPLE_RATE, 1, opuslib.APPLICATION_VOIP)
+        packet = encoder.encode(tone.tobytes(), frame_samples)
+
+        pcm = codecs.OpusDecoder().decode(packet)
+
+        self.assertEqual(len(pcm), frame_samples * 2)
+
+    def test_corrupt_packet_raises_value_error(self) -> None:
+        """libopus errors surface as ValueError, which the consumer handles."""
+        with self.assertRaises(ValueError):
+            codecs.OpusDecoder().decode(b"\xff" * 3)
@@ -0,0 +1,40 @@
+"""
+test_decoding_parity.py
+
+Unit tests for the comparison of two decoding modes.
+"""
+
+from django.test import SimpleTestCase
+
+from app.services.decoding_parity import compare_decoding, word_errors
+
+
+class TestDecodingParity(SimpleTestCase):
+    """Word errors and parity reports."""
+
+    def test_word_errors(self) -> None:
+        self.assertEqual(word_errors("I like trains.", "i like TRAINS"), 0)
+        self.assertEqual(word_errors("I like trains", "I liked trains"), 1)
+        self.assertEqual(word_errors("I like trains", "I trains a lot"), 3)
+        self.assertEqual(word_errors("", "hello"), 1)
+
+    def test_identical_modes(self) -> None:
+        report = compare_decoding(str, str, ["one two", "three"])
+        self.assertEqual((report.segments, report.identical), (2, 2))
+        self.assertEqual(report.word_error_rate, 0.0)
+        self.assertEqual(report.mismatches, [])
+        self.assertIn("2/2 identical", str(report))
+
+    def test_mismatches_are_reported(self) -> None:
+        report = compare_decoding(
+            lambda segment: segment,
+            lambda segment: segment.replace("two", "too"),
+            ["one two three four", "five"],
+        )
+        self.assertEqual(report.identical, 1)
+        self.assertEqual(report.word_errors, 1)
+        self.assertAlmostEqual(report.word_error_rate, 0.2)
+        self.assertEqual(
+            report.mismatches, [(0, "one two three four", "one too three four")]
+        )
+        self.assertGreater(report.reference_secs, 0)
@@ -0,0 +1,18 @@
+"""
+test_engines.py
+
+Unit tests for the settings-driven SpeechToText factory.
+"""
+
+from django.test import SimpleTestCase
+
+from app.services.engines import create_speech_to_text
+
+
+class TestCreateSpeechToText(SimpleTestCase):
+    """Engine selection by configuration."""
+
+    def test_unknown_engine_raises(self) -> None:
+        """An unknown ENGINE value is rejected before any model is loaded."""
+        with self.assertRaises(ValueError):
+            create_speech_to_text({"ENGINE": "does_not_exist"})
@@ -0,0 +1,95 @@
+"""
+test_fast_whisper.py
+
+Unit tests for the FasterWhisper engine with a stub `WhisperModel`, so
+neither faster_whisper nor a model is needed.
+"""
+
+import importlib
+import sys
+import types
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.speech_to_text import Word
+
+
+class StubWhisperModel:
+    """Returns two segments per call, as faster_whisper does (lazily)."""
+
+    def __init__(self, model_name: str, **kwargs) -> None:
+        self.model_name = model_name
+        self.kwargs = kwargs
+        self.calls: list[tuple[np.ndarray, dict]] = []
+
+    def transcribe(self, audio: np.ndarray, **kwargs):
+        self.calls.append((audio, kwargs))
+        words = kwargs.get("word_timestamps", False)
+        segments = (
+            SimpleNamespace(
+                text=f" part {i} of {len(audio)}.",
+                words=(
+                    [SimpleNamespace(word=f" w{i}", start=i, end=i + 0.5)]
+                    if words
+                    else None
+                ),
+            )
+            for i in range(2)
+        )
+        return segments, SimpleNamespace(language="en")
+
+
+class TestFasterWhisper(SimpleTestCase):
+    """Return shapes and decoding options of the CTranslate2 engine."""
+
+    def setUp(self) -> None:
+        stub = types.ModuleType("faster_whisper")
+        stub.WhisperModel = StubWhisperModel
+        patcher = mock.patch.dict(sys.modules, {"faster_whisper": stub})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sys.modules.pop("app.services.fast_whisper", None)
+        module = importlib.import_module("app.services.fast_whisper")
+        self.engine = module.FasterWhisper("tiny.en", cpu_threads=2, beam_size=3)
+
+    def test_loads_quantized_model(self) -> None:
+        model = self.engine.model
+        self.assertEqual(model.model_name, "tiny.en")
+        self.assertEqual(
+            model.kwargs, {"device": "cpu", "compute_type": "int8", "cpu_threads": 2}
+        )
+
+    def test_transcribe_joins_segments(self) -> None:
+        audio = np.array([16384, -16384], np.int16)
+        text = self.engine.transcribe(audio.tobytes())
+
+        self.assertEqual(text, "part 0 of 2. part 1 of 2.")
+        samples, options = self.engine.model.calls[0]
+        np.testing.assert_array_equal(samples, [0.5, -0.5])
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertEqual(options["language"], "en")
+        self.assertEqual(options["beam_size"], 3)
+        self.assertFalse(options["condition_on_previous_text"])
+
+    def test_transcribe_batch_one_text_per_segment(self) -> None:
+        texts = self.engine.transcribe_batch(
+            [np.zeros(3, np.int16), np.zeros(5, np.float32)]
+        )
+        self.assertEqual(
+            texts, ["part 0 of 3. part 1 of 3.", "part 0 of 5. part 1 of 5."]
+        )
+
+    def test_transcribe_words(self) -> None:
+        words = self.engine.transcribe_words(np.zeros(4, np.float32))
+
+        self.assertEqual(words, [Word("w0", 0, 0.5), Word("w1", 1, 1.5)])
+        self.assertTrue(self.engine.model.calls[0][1]["word_timestamps"])
+
+    def test_multilingual_model_detects_language(self) -> None:
+        engine = type(self.engine)("small")
+        engine.transcribe(np.zeros(1, np.float32))
+        self.assertIsNone(engine.model.calls[0][1]["language"])
@@ -0,0 +1,92 @@
+"""
+test_features.py
+
+Unit tests for the Whisper log-mel features and their incremental cache,
+checked against a direct framing of the whole padded 30 s window.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.features import (
+    HOP_LENGTH,
+    N_FRAMES,
+    IncrementalLogMel,
+    log_mel_spectrogram,
+    mel_filters,
+    n_mels_for,
+)
+
+
+def reference_features(audio: np.ndarray, n_mels: int = 80) -> np.ndarray:
+    """Whisper's recipe: pad to 30 s, centered STFT, drop the last frame."""
+    padded = np.zeros(N_FRAMES * HOP_LENGTH)
+    padded[: len(audio)] = audio
+    padded = np.pad(padded, 200, mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, 400)[::HOP_LENGTH]
+    power = np.abs(np.fft.rfft(frames * np.hanning(401)[:-1], axis=1)) ** 2
+    log_mel = np.log10(np.maximum(power @ mel_filters(n_mels), 1e-10)).T[:, :-1]
+    log_mel = np.maximum(log_mel, log_mel.max() - 8.0)
+    return (log_mel + 4.0) / 4.0
+
+
+def noise(secs: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal(int(16000 * secs))).astype(np.float32)
+
+
+class TestLogMel(SimpleTestCase):
+    """Whole-segment features."""
+
+    def test_mel_filters(self) -> None:
+        filters = mel_filters(80)
+        self.assertEqual(filters.shape, (201, 80))
+        self.assertTrue((filters >= 0).all())
+        self.assertEqual(mel_filters(128).shape, (201, 128))
+
+    def test_matches_reference(self) -> None:
+        audio = noise(2.345)
+        features = log_mel_spectrogram(audio)
+        self.assertEqual(features.shape, (80, N_FRAMES))
+        self.assertEqual(features.dtype, np.float32)
+        np.testing.assert_allclose(features, reference_features(audio), atol=1e-5)
+
+    def test_n_mels_for(self) -> None:
+        self.assertEqual(n_mels_for("medium.en"), 80)
+        self.assertEqual(n_mels_for("openai/whisper-large-v3"), 128)
+
+
+class TestIncrementalLogMel(SimpleTestCase):
+    """Frames cached across re-decodes of a growing utterance."""
+
+    def test_growing_utterance_matches_batch(self) -> None:
+        audio = noise(3.0)
+        mel = IncrementalLogMel()
+        for end in range(1000, len(audio) + 1, 4000):
+            features = mel.window(audio[:end])
+            np.testing.assert_allclose(
+                features, reference_features(audio[:end]), atol=1e-5
+            )
+        # Each frame is computed once, plus a few provisional tail frames
+        self.assertLess(mel.stats.computed, 300 + 5 * 12)
+        self.assertGreater(mel.stats.reused, mel.stats.computed)
+
+    def test_window_after_committed_audio(self) -> None:
+        audio = noise(3.0)
+        mel = IncrementalLogMel()
+        mel.update(audio[:24000])
+        features = mel.window(audio, start=16000)
+        expected = reference_features(audio[16000:])
+        # Only the first frames differ: real audio instead of reflection
+        np.testing.assert_allclose(features[:, 2:], expected[:, 2:], atol=1e-5)
+
+    def test_new_utterance_resets_cache(self) -> None:
+        mel = IncrementalLogMel()
+        mel.window(noise(1.0, seed=1))
+        other = noise(1.5, seed=2)
+        np.testing.assert_allclose(
+            mel.window(other), reference_features(other), atol=1e-5
+        )
+        mel.reset()
+        self.assertEqual(mel.cached_frames, 0)
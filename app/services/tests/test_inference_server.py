@@ -0,0 +1,248 @@
+"""
+test_inference_server.py
+
+Unit tests for the Unix socket inference server and its
+RemoteSpeechToText client, with an in-memory engine.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.engines import create_speech_to_text
+from app.services.inference_server import (
+    FRAME_HEADER,
+    MAX_PAYLOAD_BYTES,
+    InferenceServer,
+    InferenceServerError,
+    RemoteSpeechToText,
+    decode_segments,
+    encode_segments,
+)
+from app.services.model_registry import ModelRegistry, ModelSpec
+from app.services.speech_to_text import AudioInput, SpeechToText, Word
+
+SPEC = ModelSpec("fake", "tiny.en", "cpu", "int8")
+TIER_SPECS = [
+    ModelSpec("fake", model, "cpu", "int8") for model in ("base.en", "small.en")
+]
+
+
+class DescribingEngine(SpeechToText):
+    """Describes each segment instead of recognizing it."""
+
+    def __init__(self, name: str = "tiny.en") -> None:
+        self.name = name
+        self.batches: list[int] = []
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        return self.transcribe_batch([audio_bytes])[0]
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        self.batches.append(len(audio_batch))
+        return [f"{self.name} {audio.dtype} {len(audio)}" for audio in audio_batch]
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        if not len(audio_bytes):
+            raise ValueError("empty segment")
+        return [Word("hello", 0.0, 0.5), Word("world", 0.5, 1.0)]
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class ServerThread:
+    """Runs an InferenceServer on its own event loop thread."""
+
+    def __init__(self, server: InferenceServer) -> None:
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, args=(started,), name="inference-server"
+        )
+        self.thread.start()
+        started.wait(5)
+
+    def _run(self, started: threading.Event) -> None:
+        self.loop.run_until_complete(self.server.start())
+        started.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+
+    def stop(self) -> None:
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(5)
+
+
+class TestInferenceServer(SimpleTestCase):
+    """Requests forwarded over the socket and batched on the server."""
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "stt.sock")
+        self.engines: dict[str, DescribingEngine] = {}
+
+        def load(spec: ModelSpec) -> DescribingEngine:
+            return self.engines.setdefault(spec.model, DescribingEngine(spec.model))
+
+        self.server = InferenceServer(
+            self.path,
+            registry=ModelRegistry(loader=load),
+            default_spec=SPEC,
+            max_batch_size=8,
+            max_wait_secs=0.05,
+            specs=TIER_SPECS,
+        )
+        self.server_thread = ServerThread(self.server)
+        self.addCleanup(self.server_thread.stop)
+        self.client = RemoteSpeechToText(self.path, timeout_secs=5)
+        self.addCleanup(self.client.close)
+
+    def test_segments_round_trip(self) -> None:
+        shapes, buffers = encode_segments(
+            [b"\x01\x00\x02\x00", np.ones(3, np.float32), np.ones(2, np.float64)]
+        )
+        self.assertEqual(shapes, [["int16", 2], ["float32", 3], ["float32", 2]])
+        segments = decode_segments(shapes, b"".join(bytes(b) for b in buffers))
+        np.testing.assert_array_equal(segments[0], [1, 2])
+        np.testing.assert_array_equal(segments[1], np.ones(3))
+        with self.assertRaises(ValueError):
+            decode_segments(shapes, b"")
+
+    def test_transcribe_keeps_dtype_and_order(self) -> None:
+        texts = self.client.transcribe_batch(
+            [np.zeros(1600, np.float32), b"\x00\x00" * 800]
+        )
+        self.assertEqual(texts, ["tiny.en float32 1600", "tiny.en int16 800"])
+        self.assertEqual(
+            self.client.transcribe(np.zeros(10, np.int16)), "tiny.en int16 10"
+        )
+
+    def test_words(self) -> None:
+        words = self.client.transcribe_words(np.zeros(16000, np.float32))
+        self.assertEqual([w.text for w in words], ["hello", "world"])
+        self.assertEqual(words[1], Word("world", 0.5, 1.0))
+
+    def test_clients_share_batches(self) -> None:
+        """Segments from separate workers are decoded in one engine call."""
+        clients = [RemoteSpeechToText(self.path) for _ in range(4)]
+        with ThreadPoolExecutor(len(clients)) as pool:
+            texts = list(
+                pool.map(lambda c: c.transcribe(np.zeros(100, np.float32)), clients)
+            )
+        for client in clients:
+            client.close()
+        self.assertEqual(texts, ["tiny.en float32 100"] * 4)
+        self.assertLess(len(self.engines["tiny.en"].batches), 4)
+
+    def test_requested_model(self) -> None:
+        client = RemoteSpeechToText(
+            self.path, model={"ENGINE": "fake", "MODEL": "base.en", "DEVICE": "cpu"}
+        )
+        self.addCleanup(client.close)
+        self.assertEqual(
+            client.transcribe(np.zeros(5, np.float32)), "base.en float32 5"
+        )
+        self.assertIn("fake:base.en@cpu/int8", client.ping()["models"])
+
+    def test_unconfigured_model_is_refused(self) -> None:
+        """Clients cannot make the server load (or schedule) other models."""
+        client = RemoteSpeechToText(
+            self.path,
+            model={"ENGINE": "fake", "MODEL": "large-v3", "NUM_PROCESSES": 64},
+        )
+        self.addCleanup(client.close)
+        with self.assertRaisesRegex(InferenceServerError, "Model not served"):
+            client.transcribe(np.zeros(5, np.float32))
+        self.assertEqual(self.engines, {})
+        self.assertEqual(self.server._schedulers, {})
+
+    def test_oversized_frame_is_refused(self) -> None:
+        """The payload length is checked before anything is allocated."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(self.path)
+            header = json.dumps({"id": 1, "op": "transcribe"}).encode("utf-8")
+            sock.sendall(FRAME_HEADER.pack(len(header), MAX_PAYLOAD_BYTES + 1))
+            sock.sendall(header)
+            header_len, _ = FRAME_HEADER.unpack(sock.recv(FRAME_HEADER.size))
+            response = json.loads(sock.recv(header_len))
+            self.assertEqual(sock.recv(1), b"")  # closed by the server
+        self.assertIsNone(response["id"])
+        self.assertIn("payload too large", response["error"])
+
+    def test_engine_errors_are_raised(self) -> None:
+        with self.assertRaisesRegex(InferenceServerError, "empty segment"):
+            self.client.transcribe_words(np.zeros(0, np.float32))
+        # The connection is still usable
+        self.assertEqual(
+            self.client.transcribe(np.zeros(1, np.float32)), "tiny.en float32 1"
+        )
+
+    def test_reconnects_after_restart(self) -> None:
+        self.client.transcribe(np.zeros(1, np.float32))
+        self.server_thread.stop()
+        with self.assertRaises(InferenceServerError):
+            self.client.transcribe(np.zeros(1, np.float32))
+
+        server = InferenceServer(
+            self.path,
+            registry=ModelRegistry(loader=lambda spec: DescribingEngine("restarted")),
+            default_spec=SPEC,
+        )
+        self.server_thread = ServerThread(server)
+        self.addCleanup(self.server_thread.stop)
+        self.assertEqual(
+            self.client.transcribe(np.zeros(1, np.float32)), "restarted float32 1"
+        )
+
+    def test_timeout_is_not_retried(self) -> None:
+        """A server that accepts but never replies gets the request once."""
+        path = os.path.join(self.tmp.name, "silent.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(listener.close)
+        listener.bind(path)
+        listener.listen(4)
+        client = RemoteSpeechToText(path, timeout_secs=0.2)
+        self.addCleanup(client.close)
+
+        with self.assertRaisesRegex(InferenceServerError, "No reply"):
+            client.transcribe(np.zeros(1, np.float32))
+
+        listener.settimeout(0.1)
+        listener.accept()[0].close()
+        with self.assertRaises(TimeoutError):
+            listener.accept()
+
+    def test_factory_builds_remote_engine(self) -> None:
+        engine = create_speech_to_text(
+            {
+                "ENGINE": "remote",
+                "SOCKET_PATH": self.path,
+                "SERVER_ENGINE": "fake",
+                "MODEL": "small.en",
+                "DEVICE": "cpu",
+            }
+        )
+        self.assertIsInstance(engine, RemoteSpeechToText)
+        self.assertEqual(engine.model["ENGINE"], "fake")
+        self.assertNotIn("SOCKET_PATH", engine.model)
+        self.assertEqual(
+            engine.transcribe(np.zeros(2, np.float32)), "small.en float32 2"
+        )
+        engine.close()
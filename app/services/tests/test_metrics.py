@@ -0,0 +1,107 @@
+"""
+test_metrics.py
+
+Unit tests for the Prometheus-style metrics: histogram buckets, labels,
+gauges and the per-batch scheduler metrics.
+"""
+
+import asyncio
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.metrics import (
+    AUDIO_SECONDS,
+    REAL_TIME_FACTOR,
+    STAGE_SECONDS,
+    MetricsRegistry,
+)
+from app.services.speech_to_text import SpeechToText
+from app.services.transcription_scheduler import TranscriptionScheduler
+
+
+class SilentEngine(SpeechToText):
+    """Returns an empty transcription immediately."""
+
+    def transcribe(self, audio_bytes) -> str:
+        return ""
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class TestMetrics(SimpleTestCase):
+    """Text exposition of each metric type."""
+
+    def setUp(self) -> None:
+        self.metrics = MetricsRegistry()
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = self.metrics.histogram(
+            "latency_seconds", "Latency.", labelnames=("stage",), buckets=(0.1, 1)
+        )
+        for value in [0.05, 0.5, 0.5, 3]:
+            histogram.observe(value, stage="vad")
+
+        lines = self.metrics.render().splitlines()
+        self.assertEqual(lines[0], "# HELP latency_seconds Latency.")
+        self.assertEqual(lines[1], "# TYPE latency_seconds histogram")
+        self.assertEqual(
+            lines[2:],
+            [
+                'latency_seconds_bucket{stage="vad",le="0.1"} 1',
+                'latency_seconds_bucket{stage="vad",le="1"} 3',
+                'latency_seconds_bucket{stage="vad",le="+Inf"} 4',
+                'latency_seconds_sum{stage="vad"} 4.05',
+                'latency_seconds_count{stage="vad"} 4',
+            ],
+        )
+
+    def test_histogram_time(self) -> None:
+        histogram = self.metrics.histogram("span_seconds", "Span.")
+        with self.assertRaises(RuntimeError):
+            with histogram.time():
+                raise RuntimeError
+        self.assertEqual(histogram.count(), 1)
+
+    def test_labels_must_match(self) -> None:
+        histogram = self.metrics.histogram("x_seconds", "X.", labelnames=("stage",))
+        with self.assertRaises(ValueError):
+            histogram.observe(1.0)
+        with self.assertRaises(ValueError):
+            self.metrics.gauge("x_seconds", "Duplicate.")
+
+    def test_label_values_are_escaped(self) -> None:
+        counter = self.metrics.counter("events_total", "Events.", labelnames=("name",))
+        counter.inc(name='say "hi"\n')
+        self.assertIn('events_total{name="say \\"hi\\"\\n"} 1', self.metrics.render())
+
+    def test_gauges(self) -> None:
+        sessions = self.metrics.gauge("sessions", "Sessions.")
+        sessions.inc()
+        sessions.inc()
+        sessions.dec()
+        depth = self.metrics.gauge("depth", "Depth.")
+        depth.set_function(lambda: 7)
+        rendered = self.metrics.render()
+        self.assertIn("\nsessions 1\n", rendered)
+        self.assertIn("\ndepth 7\n", rendered)
+
+    def test_scheduler_records_decode_metrics(self) -> None:
+        """A decoded batch updates the queue, decode and RTF metrics."""
+        scheduler = TranscriptionScheduler(SilentEngine())
+        decodes = STAGE_SECONDS.count(stage="decode")
+        queued = STAGE_SECONDS.count(stage="queue")
+        batches = REAL_TIME_FACTOR.count()
+        audio_secs = AUDIO_SECONDS.value()
+
+        asyncio.run(scheduler.transcribe(np.zeros(8000, np.float32)))
+
+        self.assertEqual(STAGE_SECONDS.count(stage="decode"), decodes + 1)
+        self.assertEqual(STAGE_SECONDS.count(stage="queue"), queued + 1)
+        self.assertEqual(REAL_TIME_FACTOR.count(), batches + 1)
+        self.assertAlmostEqual(AUDIO_SECONDS.value(), audio_secs + 0.5)
@@ -0,0 +1,79 @@
+"""
+test_microphone.py
+
+Unit tests for local microphone transcription, without an audio device.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.microphone import Microphone, transcribe_microphone
+from app.services.speech_to_text import AudioInput, SpeechToText
+
+SAMPLE_RATE = 16000
+
+
+class FakeMicrophone(Microphone):
+    """Replays prepared chunks, then stops like Ctrl+C."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        super().__init__(SAMPLE_RATE)
+        self._chunks = list(chunks)
+        self.opened = False
+        self.closed = False
+
+    def open(self) -> "FakeMicrophone":
+        self.opened = True
+        return self
+
+    def read_chunk(self) -> bytes:
+        if not self._chunks:
+            raise KeyboardInterrupt
+        return self._chunks.pop(0)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class CountingEngine(SpeechToText):
+    """Returns the utterance index instead of real text."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        self.calls += 1
+        return f"utterance {self.calls}"
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class TestTranscribeMicrophone(SimpleTestCase):
+    """The capture loop runs against any Microphone-like source."""
+
+    def test_transcribes_each_utterance(self) -> None:
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        wave = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+        speech = (8000 * wave / 1.5).astype(np.int16).tobytes()
+        silence = np.zeros(SAMPLE_RATE, dtype=np.int16).tobytes()
+        # The second utterance is still open when capture stops
+        microphone = FakeMicrophone([speech, silence, speech])
+        engine = CountingEngine()
+
+        transcript = transcribe_microphone(engine, microphone)
+
+        self.assertEqual(transcript, "utterance 1 utterance 2")
+        self.assertTrue(microphone.opened)
+        self.assertTrue(microphone.closed)
+
+    def test_microphone_is_lazy(self) -> None:
+        """Creating a Microphone opens no device."""
+        microphone = Microphone()
+
+        self.assertIsNone(microphone._stream)
+        microphone.close()  # closing an unopened microphone is a no-op
@@ -0,0 +1,162 @@
+"""
+test_model_registry.py
+
+Unit tests for the lazily loaded, shared model registry.
+"""
+
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from app.services.model_registry import ModelRegistry, ModelSpec, estimate_model_bytes
+from app.services.speech_to_text import AudioInput, SpeechToText
+
+
+class FakeEngine(SpeechToText):
+    """Engine that records its lifecycle."""
+
+    def __init__(self, spec: ModelSpec) -> None:
+        self.spec = spec
+        self.closed = False
+        self.calls = 0
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        self.calls += 1
+        return self.spec.model
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def spec(model: str, device: str = "cpu") -> ModelSpec:
+    return ModelSpec("faster_whisper", model, device, "int8")
+
+
+class TestModelRegistry(SimpleTestCase):
+    """Lazy loading, deduplication, warm-up and eviction."""
+
+    def setUp(self) -> None:
+        self.loaded: list[FakeEngine] = []
+
+    def load(self, model_spec: ModelSpec) -> FakeEngine:
+        time.sleep(0.01)  # widen the window for concurrent loads
+        engine = FakeEngine(model_spec)
+        self.loaded.append(engine)
+        return engine
+
+    def test_loads_lazily_and_once(self) -> None:
+        """Handles load nothing until used; concurrent uses share one load."""
+        registry = ModelRegistry(loader=self.load)
+        handles = [registry.engine(spec("small")) for _ in range(4)]
+        self.assertEqual(self.loaded, [])
+
+        threads = [
+            threading.Thread(target=handle.transcribe, args=(b"",))
+            for handle in handles
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.loaded), 1)
+        self.assertEqual(self.loaded[0].calls, 4)
+
+    def test_spec_identity(self) -> None:
+        """Options are not part of the identity; device and precision are."""
+        self.assertEqual(
+            ModelSpec(
+                "process_pool", "small", "cpu", "float32", options={"NUM_PROCESSES": 2}
+            ),
+            ModelSpec(
+                "process_pool", "small", "cpu", "float32", options={"NUM_PROCESSES": 4}
+            ),
+        )
+        self.assertNotEqual(spec("small"), spec("small", device="cuda"))
+
+    def test_from_config_round_trip(self) -> None:
+        config = {"ENGINE": "faster_whisper", "MODEL": "base.en", "DEVICE": "cpu"}
+
+        model_spec = ModelSpec.from_config(config)
+
+        self.assertEqual(model_spec.compute_type, "int8")
+        self.assertEqual(ModelSpec.from_config(model_spec.to_config()), model_spec)
+
+    def test_lru_eviction_under_budget(self) -> None:
+        """The least recently used idle model is unloaded first."""
+        registry = ModelRegistry(
+            memory_budget_bytes=2, loader=self.load, estimator=lambda s: 1
+        )
+        small, base, tiny = (
+            registry.engine(spec(m)) for m in ["small", "base", "tiny"]
+        )
+
+        small.transcribe(b"")
+        base.transcribe(b"")
+        small.transcribe(b"")  # base is now least recently used
+        tiny.transcribe(b"")
+
+        self.assertEqual(registry.loaded(), [spec("small"), spec("tiny")])
+        self.assertTrue(self.loaded[1].closed)
+        self.assertEqual(registry.stats.evictions, 1)
+
+    def test_in_use_model_is_not_evicted(self) -> None:
+        registry = ModelRegistry(
+            memory_budget_bytes=1, loader=self.load, estimator=lambda s: 1
+        )
+        with registry.use(spec("small")) as engine:
+            registry.engine(spec("base")).transcribe(b"")
+
+            # base is the only idle model once its call returns
+            self.assertFalse(engine.closed)
+            self.assertEqual(registry.loaded(), [spec("small")])
+
+    def test_unload_idle(self) -> None:
+        registry = ModelRegistry(loader=self.load)
+        registry.engine(spec("small")).transcribe(b"")
+
+        self.assertEqual(registry.unload_idle(idle_secs=3600), [])
+        self.assertEqual(registry.unload_idle(idle_secs=0), [spec("small")])
+        self.assertEqual(registry.loaded(), [])
+
+    def test_warm_up_in_background(self) -> None:
+        """Warm-up loads the model and decodes once off the calling thread."""
+        registry = ModelRegistry(loader=self.load)
+
+        registry.warm_up(spec("small")).join()
+
+        self.assertEqual(registry.loaded(), [spec("small")])
+        self.assertEqual(self.loaded[0].calls, 1)
+
+    def test_estimate_model_bytes(self) -> None:
+        self.assertLess(
+            estimate_model_bytes(spec("small.en")),
+            estimate_model_bytes(ModelSpec("whisper", "small.en", "cuda", "float32")),
+        )
+        remote = ModelSpec.from_config(
+            {"ENGINE": "remote", "MODEL": "large-v3", "SOCKET_PATH": "/tmp/stt.sock"}
+        )
+        self.assertEqual(remote.options, {"SOCKET_PATH": "/tmp/stt.sock"})
+        self.assertEqual(estimate_model_bytes(remote), 0)
+        assisted = ModelSpec.from_config(
+            {"ENGINE": "whisper", "MODEL": "medium.en", "ASSISTANT_MODEL": "tiny.en"}
+        )
+        plain = ModelSpec.from_config({"MODEL": "medium.en"})
+        self.assertNotEqual(assisted, plain)
+        self.assertEqual(assisted.to_config()["ASSISTANT_MODEL"], "tiny.en")
+        self.assertGreater(estimate_model_bytes(assisted), estimate_model_bytes(plain))
+
+    def test_assistant_dropped_when_not_smaller(self) -> None:
+        """A tier no larger than the assistant model decodes plainly."""
+        config = {"ENGINE": "whisper", "ASSISTANT_MODEL": "tiny.en"}
+        tiny = ModelSpec.from_config(dict(config, MODEL="tiny.en"))
+        small = ModelSpec.from_config(dict(config, MODEL="small.en"))
+
+        self.assertEqual(tiny, ModelSpec.from_config({"MODEL": "tiny.en"}))
+        self.assertEqual(tiny.assistant, "")
+        self.assertEqual(small.assistant, "tiny.en")
+        self.assertEqual(str(small), "whisper:small.en@cuda/float32+tiny.en")
@@ -0,0 +1,55 @@
+"""
+test_model_tiers.py
+
+Unit tests for the load-adaptive model tier selector.
+"""
+
+from django.test import SimpleTestCase
+
+from app.services.model_tiers import ModelTier, TierSelector
+
+
+def selector(*rtfs: float, target: float = 2.0) -> TierSelector:
+    tiers = [ModelTier(f"tier{i}", None, rtf) for i, rtf in enumerate(rtfs)]
+    return TierSelector(tiers, latency_target_secs=target)
+
+
+class TestTierSelector(SimpleTestCase):
+    """Downgrades under load, upgrades with headroom."""
+
+    def test_starts_with_largest(self) -> None:
+        self.assertEqual(selector(0.05, 0.2, 0.5).select(1.0).name, "tier2")
+
+    def test_downgrades_until_within_target(self) -> None:
+        tiers = selector(0.05, 0.2, 0.5)
+        # 8 s queued: 4 s on tier2, 1.6 s on tier1
+        self.assertEqual(tiers.select(8.0).name, "tier1")
+        # 30 s queued: only tier0 keeps up (and is used even if it did not)
+        self.assertEqual(tiers.select(30.0).name, "tier0")
+        self.assertEqual(tiers.select(100.0).name, "tier0")
+
+    def test_upgrades_with_headroom(self) -> None:
+        tiers = selector(0.05, 0.2, 0.5)
+        tiers.select(30.0)
+        # tier1 needs 1.2 s of the 2 s target, more than the 50 % headroom
+        self.assertEqual(tiers.select(6.0).name, "tier0")
+        self.assertEqual(tiers.select(4.0).name, "tier1")
+        self.assertEqual(tiers.select(1.0).name, "tier2")
+
+    def test_unmeasured_tiers_are_tried(self) -> None:
+        tiers = selector(0.0, 0.5)
+        self.assertEqual(tiers.select(10.0).name, "tier0")
+
+    def test_record_smooths_real_time_factor(self) -> None:
+        tiers = selector(0.0)
+        tier = tiers.tiers[0]
+        tiers.record(tier, audio_secs=2.0, compute_secs=1.0, segments=2)
+        self.assertEqual(tier.real_time_factor, 0.5)
+        tiers.record(tier, audio_secs=1.0, compute_secs=1.5, segments=1)
+        self.assertAlmostEqual(tier.real_time_factor, 0.5 + 0.2 * 1.0)
+        tiers.record(tier, audio_secs=0.0, compute_secs=0.1, segments=1)
+        self.assertEqual(tier.segments, 4)
+
+    def test_needs_a_tier(self) -> None:
+        with self.assertRaises(ValueError):
+            TierSelector([])
@@ -1,15 +1,24 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from typing import Any, AsyncIterator
+
 from django.test import SimpleTestCase
 
-from app.services.open_ai import AIUtilityClient
+from app.services.open_ai import AIUtilityClient, AsyncAIUtilityClient
+from app.services.response_cache import ResponseCache
+from app.services.topic_router import TopicRouter
 
 
+@unittest.skipUnless(os.getenv("OPENAI_API_KEY"), "OPENAI_API_KEY not set")
 class TestOpenAI(SimpleTestCase):
 
     @classmethod
     def setUpClass(cls) -> None:
         super().setUpClass()
         
-        cls.API_KEY = "sk-YfSO3RgAtWp8-SBGwXva1w"
+        cls.API_KEY = os.environ["OPENAI_API_KEY"]
         cls.BASE_URL = "https://aiportalapi.stu-platform.live/jpe"
         cls.MODEL_NAME = "gpt-4o-mini"
 
@@ -46,3 +55,109 @@ class TestOpenAI(SimpleTestCase):
 
         self.assertIsNotNone(result)
         self.assertTrue(len(result) > 20)
+
+
+class FakeCompletions:
+    """Stand-in for `client.chat.completions` that tracks concurrency."""
+
+    def __init__(self, delay_secs: float = 0.02) -> None:
+        self.delay_secs = delay_secs
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay_secs)
+        self.in_flight -= 1
+        content = f"feedback for: {kwargs['messages'][-1]['content']}"
+        if kwargs.get("stream"):
+            return self._stream(content)
+        message = SimpleNamespace(content=content, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def _stream(self, content: str) -> AsyncIterator[SimpleNamespace]:
+        for piece in [None, *content.split(" ")]:
+            delta = SimpleNamespace(content=piece and f"{piece} ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class TestAsyncOpenAI(SimpleTestCase):
+    """AsyncAIUtilityClient without network access."""
+
+    def make_client(
+        self, max_concurrency: int, topic_router: TopicRouter | None = None
+    ) -> AsyncAIUtilityClient:
+        ai = AsyncAIUtilityClient(
+            api_key="test",
+            base_url="http://127.0.0.1:9/v1",
+            max_concurrency=max_concurrency,
+            topic_router=topic_router,
+        )
+        self.completions = FakeCompletions()
+        ai.client = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        return ai
+
+    def test_clients_share_connection_pool(self) -> None:
+        """Clients for the same endpoint reuse one AsyncOpenAI instance."""
+        first = AsyncAIUtilityClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+        second = AsyncAIUtilityClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+
+        self.assertIs(first.client, second.client)
+
+    async def test_preset_topic_feedback(self) -> None:
+        """Preset topics need a single completion."""
+        ai = self.make_client(max_concurrency=4)
+
+        result = await ai.generate_feedback("I like trains.", "travel")
+
+        self.assertEqual(result, "feedback for: I like trains.")
+
+    async def test_concurrency_is_limited(self) -> None:
+        """No more than max_concurrency requests are in flight at once."""
+        ai = self.make_client(max_concurrency=2)
+
+        await asyncio.gather(
+            *(ai.generate_feedback(f"text {i}", "free_talk") for i in range(6))
+        )
+
+        self.assertEqual(self.completions.max_in_flight, 2)
+
+    async def test_stream_feedback(self) -> None:
+        """Streamed pieces concatenate to the full feedback."""
+        ai = self.make_client(max_concurrency=4)
+
+        pieces = [d async for d in ai.stream_feedback("I like trains.", "travel")]
+
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual("".join(pieces).strip(), "feedback for: I like trains.")
+
+    async def test_stream_feedback_invalid_topic(self) -> None:
+        """An unknown topic yields the error message as a single piece."""
+        ai = self.make_client(max_concurrency=4)
+
+        pieces = [d async for d in ai.stream_feedback("text", "unknown")]
+
+        self.assertEqual(pieces, [ai.INVALID_TOPIC_ERROR])
+
+    async def test_routed_custom_topic_needs_one_request(self) -> None:
+        """A confident local route skips the keyword-extraction request."""
+        ai = self.make_client(max_concurrency=4, topic_router=TopicRouter())
+
+        await ai.generate_feedback("We booked a hotel for our trip.", "custom_topic")
+
+        self.assertEqual(self.completions.calls, 1)
+
+    async def test_repeated_answer_is_served_from_cache(self) -> None:
+        """The same normalized answer calls the API once."""
+        ai = self.make_client(max_concurrency=4)
+        ai.response_cache = ResponseCache()
+
+        first = await ai.generate_feedback("I like trains.", "travel")
+        pieces = [d async for d in ai.stream_feedback("i like trains", "travel")]
+
+        self.assertEqual(pieces, [first])
+        self.assertEqual(self.completions.calls, 1)
+        self.assertEqual(ai.response_cache.stats.hits, 1)
@@ -0,0 +1,112 @@
+"""
+test_process_pool.py
+
+Unit tests for ProcessPoolWhisper with a describing engine loaded in the
+worker processes, so no model is needed.
+"""
+
+import sys
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services import process_pool
+from app.services.process_pool import ProcessPoolWhisper
+from app.services.speech_to_text import AudioInput, SpeechToText, Word
+
+
+class DescribingEngine(SpeechToText):
+    """Describes the samples it received instead of recognizing them."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        return f"{self.model_name} {audio_bytes.dtype} {audio_bytes.tolist()}"
+
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        return [Word(str(len(audio_bytes)), 0.0, 1.0)]
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+def load_describing_engine(model_name: str) -> SpeechToText:
+    return DescribingEngine(model_name)
+
+
+class RecordingSharedMemory(SharedMemory):
+    """SharedMemory that remembers the blocks created in this process."""
+
+    created: list[str] = []
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if kwargs.get("create"):
+            self.created.append(self.name)
+
+
+@unittest.skipUnless(
+    sys.version_info >= (3, 13), "SharedMemory(track=) needs Python 3.13"
+)
+class TestProcessPoolWhisper(SimpleTestCase):
+    """Segments sent to worker processes through shared memory."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.engine = ProcessPoolWhisper(
+            "stub",
+            num_processes=2,
+            threads_per_process=1,
+            loader=load_describing_engine,
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.engine.close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        RecordingSharedMemory.created = []
+        patcher = mock.patch.object(process_pool, "SharedMemory", RecordingSharedMemory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_unlinked(self) -> None:
+        self.assertTrue(RecordingSharedMemory.created)
+        for name in RecordingSharedMemory.created:
+            with self.assertRaises(FileNotFoundError):
+                SharedMemory(name=name)
+
+    def test_transcribe_pcm16_bytes(self) -> None:
+        audio = np.array([1, -2, 3], np.int16).tobytes()
+        self.assertEqual(self.engine.transcribe(audio), "stub int16 [1, -2, 3]")
+        self.assert_unlinked()
+
+    def test_transcribe_batch_keeps_dtype_and_order(self) -> None:
+        texts = self.engine.transcribe_batch(
+            [
+                np.array([0.5, -0.25], np.float32),
+                np.array([7], np.int16),
+                np.array([1.0], np.float32),
+            ]
+        )
+        self.assertEqual(
+            texts,
+            ["stub float32 [0.5, -0.25]", "stub int16 [7]", "stub float32 [1.0]"],
+        )
+        self.assertEqual(len(RecordingSharedMemory.created), 3)
+        self.assert_unlinked()
+
+    def test_transcribe_words(self) -> None:
+        words = self.engine.transcribe_words(np.zeros(160, np.float32))
+        self.assertEqual(words, [Word("160", 0.0, 1.0)])
+        self.assert_unlinked()
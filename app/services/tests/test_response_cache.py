@@ -0,0 +1,95 @@
+"""
+test_response_cache.py
+
+Unit tests for the LLM response cache.
+"""
+
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.services.response_cache import HashingEmbedder, ResponseCache, normalize_text
+
+
+class TestResponseCache(SimpleTestCase):
+    """Exact and near-duplicate lookups, TTL and LRU eviction."""
+
+    def test_normalize_text(self) -> None:
+        self.assertEqual(normalize_text("  Hello,   World!! "), "hello world")
+
+    def test_exact_hit_after_normalization(self) -> None:
+        cache = ResponseCache()
+        cache.put("gpt", "coach", "I like trains.", "Nice sentence.")
+
+        self.assertEqual(cache.get("gpt", "coach", "i like  TRAINS"), "Nice sentence.")
+        self.assertEqual(cache.stats.hits, 1)
+
+    def test_key_includes_model_and_prompt(self) -> None:
+        """The same text under another model or prompt is a miss."""
+        cache = ResponseCache()
+        cache.put("gpt", "coach", "I like trains.", "Nice sentence.")
+
+        self.assertIsNone(cache.get("other", "coach", "I like trains."))
+        self.assertIsNone(cache.get("gpt", "travel coach", "I like trains."))
+        self.assertEqual(cache.stats.misses, 2)
+
+    def test_entries_expire(self) -> None:
+        """Lookups skip expired entries; the next put deletes them."""
+        cache = ResponseCache(ttl_secs=60)
+        cache.put("gpt", "coach", "hello", "hi")
+
+        with mock.patch("time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("gpt", "coach", "hello"))
+            self.assertEqual(len(cache), 1)
+            cache.put("gpt", "coach", "bye", "see you")
+        self.assertEqual(cache.stats.expired, 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_hits_do_not_commit(self) -> None:
+        """Recency of hits is kept in memory and written by the next put."""
+        cache = ResponseCache(ttl_secs=0)
+        with mock.patch("time.time", return_value=1.0):
+            cache.put("gpt", "coach", "hello", "hi")
+        changes = cache._db.total_changes
+
+        with mock.patch("time.time", return_value=5.0):
+            for _ in range(10):
+                cache.get("gpt", "coach", "hello")
+        self.assertEqual(cache._db.total_changes, changes)
+
+        with mock.patch("time.time", return_value=9.0):
+            cache.put("gpt", "coach", "bye", "see you")
+        last_used = cache._db.execute(
+            "SELECT last_used FROM responses WHERE created_at = 1.0"
+        ).fetchone()[0]
+        self.assertEqual(last_used, 5.0)
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = ResponseCache(max_entries=2, ttl_secs=0)
+        with mock.patch("time.time", side_effect=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0]):
+            cache.put("gpt", "coach", "a", "A")
+            cache.put("gpt", "coach", "b", "B")
+            cache.get("gpt", "coach", "a")  # "b" is now least recently used
+            cache.put("gpt", "coach", "c", "C")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertIsNone(cache.get("gpt", "coach", "b"))
+        self.assertEqual(cache.get("gpt", "coach", "a"), "A")
+
+    def test_near_duplicate_hit(self) -> None:
+        """Similar sentences share an entry only above the threshold."""
+        cache = ResponseCache(similarity_threshold=0.8)
+        cache.put("gpt", "coach", "I want to travel to Japan next summer.", "Good!")
+
+        self.assertEqual(
+            cache.get("gpt", "coach", "I want to travel to Japan next sumer."), "Good!"
+        )
+        self.assertIsNone(cache.get("gpt", "coach", "My favourite food is pizza."))
+        self.assertEqual(cache.stats.near_hits, 1)
+
+    def test_hashing_embedder_is_normalized(self) -> None:
+        vector = HashingEmbedder(dims=64)("Hello there")
+
+        self.assertAlmostEqual(float(vector @ vector), 1.0, places=5)
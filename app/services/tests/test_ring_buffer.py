@@ -0,0 +1,48 @@
+"""
+test_ring_buffer.py
+
+Unit tests for AudioRingBuffer: windows stay contiguous views across
+wrap-around and the storage is never reallocated.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.ring_buffer import AudioRingBuffer
+
+
+class TestAudioRingBuffer(SimpleTestCase):
+    """Append / window / retain-tail behaviour."""
+
+    def test_window_is_view_after_wraparound(self) -> None:
+        """A wrapped window is contiguous and shares the preallocated storage."""
+        buffer = AudioRingBuffer(capacity=5)
+        storage = buffer._data  # pylint: disable=protected-access
+        buffer.append(np.arange(4, dtype=np.int16))
+        buffer.retain_tail(2)
+        buffer.append(np.arange(4, 7, dtype=np.int16))
+
+        window = buffer.window()
+
+        np.testing.assert_array_equal(window, [2, 3, 4, 5, 6])
+        self.assertTrue(np.shares_memory(window, storage))
+        self.assertIs(buffer._data, storage)  # pylint: disable=protected-access
+
+    def test_overflow_drops_oldest_samples(self) -> None:
+        """Appending past capacity keeps only the newest samples."""
+        buffer = AudioRingBuffer(capacity=3)
+        buffer.append(np.arange(2, dtype=np.int16))
+        buffer.append(np.arange(2, 6, dtype=np.int16))
+
+        np.testing.assert_array_equal(buffer.window(), [3, 4, 5])
+
+    def test_pcm16_bytes_converted_to_float32(self) -> None:
+        """PCM16 input is scaled to [-1, 1] when the buffer holds float32."""
+        buffer = AudioRingBuffer(capacity=4, dtype=np.float32)
+        buffer.append(np.array([16384, -32768], dtype=np.int16).tobytes())
+
+        window = buffer.window()
+
+        self.assertEqual(window.dtype, np.float32)
+        np.testing.assert_allclose(window, [0.5, -1.0])
@@ -0,0 +1,84 @@
+"""
+test_segmenter.py
+
+Unit tests for UtteranceSegmenter: utterances close at pauses, respect
+the duration caps and survive arbitrary chunk sizes.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.segmenter import UtteranceSegmenter
+from app.services.vad import SpeechDetector
+
+SAMPLE_RATE = 16000
+
+
+def tone(secs: float, amplitude: int = 8000) -> np.ndarray:
+    """Voice-band tone that WebRTC VAD classifies as speech."""
+    t = np.arange(int(SAMPLE_RATE * secs)) / SAMPLE_RATE
+    wave = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (amplitude * wave / 1.5).astype(np.int16)
+
+
+def silence(secs: float) -> np.ndarray:
+    """Return `secs` seconds of PCM16 silence."""
+    return np.zeros(int(SAMPLE_RATE * secs), dtype=np.int16)
+
+
+class TestUtteranceSegmenter(SimpleTestCase):
+    """Endpointing behaviour."""
+
+    def setUp(self) -> None:
+        self.segmenter = UtteranceSegmenter(
+            SpeechDetector(SAMPLE_RATE, mode=2, rms_threshold=500),
+            padding_ms=300,
+            hangover_ms=600,
+            min_speech_secs=0.3,
+            max_utterance_secs=5,
+        )
+
+    def feed_in_chunks(self, audio: np.ndarray, chunk: int) -> list[np.ndarray]:
+        """Feed `audio` in `chunk`-sample pieces and collect utterances."""
+        utterances = []
+        for start in range(0, len(audio), chunk):
+            utterances += self.segmenter.feed(audio[start : start + chunk].tobytes())
+        return utterances
+
+    def test_emits_utterances_at_pauses(self) -> None:
+        """Two phrases separated by a long pause become two utterances."""
+        audio = np.concatenate(
+            [silence(0.5), tone(1.0), silence(1.0), tone(1.5), silence(1.0)]
+        )
+
+        utterances = self.feed_in_chunks(audio, 8000)
+
+        self.assertEqual(len(utterances), 2)
+        self.assertFalse(self.segmenter.in_speech)
+        # speech plus at most the padding on each side
+        self.assertLess(len(utterances[0]) / SAMPLE_RATE, 1.0 + 0.7)
+        self.assertEqual(utterances[0].dtype, np.float32)
+
+    def test_short_pause_keeps_utterance_open(self) -> None:
+        """A pause shorter than the hangover does not split the utterance."""
+        audio = np.concatenate([tone(1.0), silence(0.2), tone(1.0), silence(1.0)])
+
+        utterances = self.feed_in_chunks(audio, 320)  # 20 ms packets
+
+        self.assertEqual(len(utterances), 1)
+        self.assertGreater(len(utterances[0]) / SAMPLE_RATE, 2.0)
+
+    def test_max_duration_cuts_long_speech(self) -> None:
+        """Continuous speech is cut at max_utterance_secs."""
+        utterances = self.feed_in_chunks(tone(7.0), 8000)
+
+        self.assertEqual(len(utterances), 1)
+        self.assertAlmostEqual(len(utterances[0]) / SAMPLE_RATE, 5.0, delta=0.1)
+        self.assertTrue(self.segmenter.in_speech)
+
+    def test_flush_drops_noise_bursts(self) -> None:
+        """Voiced bursts shorter than min_speech_secs are discarded."""
+        self.feed_in_chunks(np.concatenate([silence(0.3), tone(0.1)]), 8000)
+
+        self.assertEqual(self.segmenter.flush(), [])
@@ -0,0 +1,47 @@
+"""
+test_session_protocol.py
+
+Unit tests for the /ws/audio/ control messages.
+"""
+
+from django.test import SimpleTestCase
+
+from app.services import session_protocol as protocol
+from app.services.open_ai import BaseAIUtilityClient
+
+
+class TestParseControl(SimpleTestCase):
+    """Validation of client control messages."""
+
+    def test_start_message(self) -> None:
+        message = protocol.parse_control('{"type": "start", "topic": "travel"}')
+
+        self.assertEqual(message["type"], protocol.START)
+        self.assertEqual(message["topic"], "travel")
+
+    def test_rejects_invalid_messages(self) -> None:
+        """Bad JSON, non-objects and unknown types raise ProtocolError."""
+        for text_data in ["not json", "[1, 2]", '{"type": "pause"}', "{}"]:
+            with self.subTest(text_data=text_data):
+                with self.assertRaises(protocol.ProtocolError):
+                    protocol.parse_control(text_data)
+
+
+class TestResolveTopic(SimpleTestCase):
+    """Mapping of client topics to feedback prompts."""
+
+    def test_page_topics_map_to_prompts(self) -> None:
+        """Every topic of the selection page has a preset prompt."""
+        prompts = BaseAIUtilityClient().prompts
+        for page_topic in protocol.TOPIC_KEYS:
+            with self.subTest(topic=page_topic):
+                self.assertIn(protocol.resolve_topic(page_topic), prompts)
+
+    def test_prompt_keys_are_accepted(self) -> None:
+        self.assertEqual(protocol.resolve_topic("Job Interview"), "job_interview")
+
+    def test_unknown_topic_is_custom(self) -> None:
+        """Missing or unknown topics let the model infer the topic."""
+        for topic in [None, "", "cooking", 42]:
+            with self.subTest(topic=topic):
+                self.assertEqual(protocol.resolve_topic(topic), protocol.CUSTOM_TOPIC)
@@ -0,0 +1,64 @@
+"""
+test_streaming.py
+
+Unit tests for LocalAgreementStreamer: commit only the prefix two
+consecutive decodes agree on, and skip the audio it covers.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.speech_to_text import Word
+from app.services.streaming import LocalAgreementStreamer
+
+SAMPLE_RATE = 16000
+
+
+def silence(secs: float) -> np.ndarray:
+    """Return `secs` seconds of float32 silence."""
+    return np.zeros(int(SAMPLE_RATE * secs), dtype=np.float32)
+
+
+class TestLocalAgreementStreamer(SimpleTestCase):
+    """Commit / partial behaviour of the streamer."""
+
+    def setUp(self) -> None:
+        self.streamer = LocalAgreementStreamer(SAMPLE_RATE, stride_secs=1.0)
+
+    def test_ready_after_stride(self) -> None:
+        """A decode is due only once the utterance grew by a full stride."""
+        self.assertFalse(self.streamer.ready(len(silence(0.5))))
+        self.assertTrue(self.streamer.ready(len(silence(1.0))))
+        self.streamer.window(silence(1.0))
+        self.assertFalse(self.streamer.ready(len(silence(1.5))))
+
+    def test_first_decode_is_partial_only(self) -> None:
+        """Nothing is committed before two decodes agree."""
+        self.streamer.window(silence(1.0))
+        update = self.streamer.update([Word("Hello", 0.0, 0.4)])
+
+        self.assertEqual(update.committed, "")
+        self.assertEqual(update.partial, "Hello")
+
+    def test_commits_agreed_prefix_and_skips_its_audio(self) -> None:
+        """Agreed words are committed and their audio is not decoded again."""
+        utterance = silence(2.0)
+        self.streamer.window(utterance)
+        self.streamer.update([Word("Hello", 0.0, 0.4), Word("word", 0.4, 0.9)])
+        self.streamer.window(utterance)
+        update = self.streamer.update(
+            [Word("hello,", 0.0, 0.5), Word("world", 0.5, 1.0), Word("how", 1.1, 1.3)]
+        )
+
+        self.assertEqual(update.committed, "hello,")
+        self.assertEqual(update.partial, "world how")
+        self.assertEqual(len(self.streamer.window(utterance)), len(silence(1.5)))
+
+    def test_finish_commits_everything(self) -> None:
+        """The final decode is committed in full and the state is reset."""
+        self.streamer.window(silence(1.0))
+        update = self.streamer.finish([Word("bye", 0.0, 0.3)])
+
+        self.assertEqual(update.committed, "bye")
+        self.assertEqual(len(self.streamer.window(silence(1.0))), len(silence(1.0)))
@@ -0,0 +1,86 @@
+"""
+test_topic_router.py
+
+Unit tests for the local TF-IDF topic router.
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.services.open_ai import AIUtilityClient
+from app.services.topic_router import TopicRouter, tokenize
+
+
+class TestTopicRouter(SimpleTestCase):
+    """Routing decisions and confidence threshold."""
+
+    def setUp(self) -> None:
+        self.router = TopicRouter()
+
+    def test_tokenize(self) -> None:
+        """Stopwords are dropped and plurals folded."""
+        self.assertEqual(tokenize("I bought the stocks!"), ["bought", "stock"])
+
+    def test_routes_preset_topics(self) -> None:
+        """Texts about a preset topic route to that topic's prompt key."""
+        cases = {
+            "When I travel abroad I get lost at the airport and the hotel.": "travel",
+            "In my last job I managed a team and a project deadline.": "job_interview",
+            "AI and machine learning software are changing the future.": "technology",
+        }
+        for text, topic in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.router.route(text).label, topic)
+
+    def test_routes_free_form_keyword(self) -> None:
+        """Labels outside the presets become keyword prompts."""
+        text = "I want to invest money using compound interest and buy stocks."
+
+        self.assertEqual(self.router.route(text).label, "finance")
+
+    def test_low_confidence_returns_none(self) -> None:
+        """Generic or off-topic text is left to the model."""
+        for text in [
+            "",
+            "I think that is a good idea.",
+            "Yesterday I told my sister a long story about a strange painting in "
+            "the gallery and she laughed about the colours, then we had coffee.",
+        ]:
+            with self.subTest(text=text):
+                self.assertIsNone(self.router.route(text))
+
+    def make_client(self) -> tuple[AIUtilityClient, mock.Mock]:
+        """Client with the router whose completions are recorded, not sent."""
+        client = AIUtilityClient(
+            "test", "http://127.0.0.1:9/v1", topic_router=self.router
+        )
+        message = SimpleNamespace(content="", tool_calls=None)
+        create = mock.Mock(
+            return_value=SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        )
+        client.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        return client, create
+
+    def test_client_skips_keyword_request_when_confident(self) -> None:
+        """A routed custom topic resolves to its prompt without a request."""
+        client, create = self.make_client()
+
+        prompt, error = client._system_prompt(
+            "We booked a hotel and flights for our trip.", "custom_topic"
+        )
+
+        self.assertEqual((prompt, error), (client.prompts["travel"], None))
+        create.assert_not_called()
+
+    def test_client_requests_keyword_when_not_confident(self) -> None:
+        """Text the router cannot place is sent for keyword extraction."""
+        client, create = self.make_client()
+
+        client._system_prompt("I think that is a good idea.", "custom_topic")
+
+        create.assert_called_once()
+        self.assertEqual(create.call_args.kwargs["tools"], client.tools)
@@ -0,0 +1,201 @@
+"""
+test_transcription_scheduler.py
+
+Unit tests for TranscriptionScheduler using an in-memory fake engine,
+so no model has to be loaded.
+"""
+
+import asyncio
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.model_registry import ModelRegistry, ModelSpec
+from app.services.model_tiers import ModelTier, TierSelector
+from app.services.speech_to_text import SpeechToText
+from app.services.transcription_scheduler import TranscriptionScheduler
+
+
+class FakeEngine(SpeechToText):
+    """Echo engine that sleeps to simulate a slow decode."""
+
+    def __init__(self, delay_secs: float = 0.05) -> None:
+        self.delay_secs = delay_secs
+        self.threads: set[str] = set()
+
+    def transcribe(self, audio_bytes: bytes) -> str:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay_secs)
+        return f"{len(audio_bytes)} bytes"
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class CountingEngine(FakeEngine):
+    """Records how many decodes ran at the same time."""
+
+    def __init__(self, delay_secs: float = 0.05) -> None:
+        super().__init__(delay_secs)
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio_bytes: bytes) -> str:
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return super().transcribe(audio_bytes)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestTranscriptionScheduler(SimpleTestCase):
+    """Scheduler behaviour seen from async consumers."""
+
+    async def test_transcribe_returns_engine_text(self) -> None:
+        """Results are routed back to the awaiting caller."""
+        scheduler = TranscriptionScheduler(FakeEngine(delay_secs=0))
+
+        texts = await asyncio.gather(
+            scheduler.transcribe(b"\x00" * 4), scheduler.transcribe(b"\x00" * 8)
+        )
+
+        self.assertEqual(texts, ["4 bytes", "8 bytes"])
+        self.assertEqual(scheduler.stats.completed, 2)
+        await scheduler.close()
+
+    async def test_decode_does_not_block_event_loop(self) -> None:
+        """The loop keeps ticking while a segment is being decoded."""
+        engine = FakeEngine(delay_secs=0.2)
+        scheduler = TranscriptionScheduler(engine)
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        await scheduler.transcribe(b"\x00" * 2)
+        tick_task.cancel()
+
+        self.assertGreater(ticks, 5)
+        self.assertTrue(all(n.startswith("stt-worker") for n in engine.threads))
+        await scheduler.close()
+
+    async def test_reports_wait_and_compute_time(self) -> None:
+        """A request queued behind another one accumulates wait time."""
+        scheduler = TranscriptionScheduler(FakeEngine(delay_secs=0.05))
+
+        first, second = await asyncio.gather(
+            scheduler.submit(b"\x00" * 2), scheduler.submit(b"\x00" * 2)
+        )
+
+        self.assertGreaterEqual(first.compute_secs, 0.04)
+        self.assertGreaterEqual(second.wait_secs, 0.04)
+        self.assertEqual(scheduler.queue_depth, 0)
+        await scheduler.close()
+
+    async def test_workers_share_an_engine_one_at_a_time(self) -> None:
+        """Only thread-safe engines decode on several workers at once."""
+
+        class ThreadSafeEngine(CountingEngine):
+            thread_safe = True
+
+        for engine, peak in [(CountingEngine(), 1), (ThreadSafeEngine(), 3)]:
+            scheduler = TranscriptionScheduler(engine, num_workers=3)
+            await asyncio.gather(*(scheduler.submit(b"\x00" * 2) for _ in range(3)))
+            self.assertEqual(engine.peak, peak)
+            await scheduler.close()
+
+    async def test_batches_concurrent_segments(self) -> None:
+        """Segments arriving within the wait window share one engine call."""
+        engine = FakeEngine(delay_secs=0)
+        scheduler = TranscriptionScheduler(engine, max_batch_size=4, max_wait_secs=0.05)
+
+        results = await asyncio.gather(
+            *(scheduler.submit(b"\x00" * (2 * n)) for n in range(1, 7))
+        )
+
+        self.assertEqual(
+            [r.text for r in results], [f"{2 * n} bytes" for n in range(1, 7)]
+        )
+        self.assertEqual([r.batch_size for r in results], [4, 4, 4, 4, 2, 2])
+        self.assertEqual(scheduler.stats.batches, 2)
+        self.assertAlmostEqual(scheduler.stats.mean_batch_size, 3.0)
+        await scheduler.close()
+
+    async def test_routes_batches_to_model_tiers(self) -> None:
+        """A backlog moves decoding to the smaller tier, recorded per result."""
+        small = ModelTier("small", FakeEngine(delay_secs=0))
+        large = ModelTier("large", FakeEngine(delay_secs=0.05))
+        scheduler = TranscriptionScheduler(
+            FakeEngine(), tiers=TierSelector([small, large], latency_target_secs=0.1)
+        )
+        segment = b"\x00" * 3200  # 0.1 s of audio
+
+        first = await scheduler.submit(segment)
+        self.assertEqual(first.model, "large")
+        self.assertGreater(large.real_time_factor, 0.3)
+
+        # 0.6 s queued at RTF 0.5 would take 0.3 s on the large model
+        results = await asyncio.gather(*(scheduler.submit(segment) for _ in range(6)))
+        self.assertEqual(results[0].model, "small")
+        self.assertEqual(small.segments + large.segments, 7)
+        self.assertEqual(scheduler.queued_secs, 0)
+        await scheduler.close()
+
+    async def test_model_load_is_not_compute_time(self) -> None:
+        """A slow (re)load of a tier's model does not downgrade it."""
+
+        def load(spec: ModelSpec) -> FakeEngine:
+            time.sleep(0.3)
+            return FakeEngine(delay_secs=0)
+
+        registry = ModelRegistry(loader=load)
+        small, large = (
+            ModelTier(name, registry.engine(ModelSpec("fake", name, "cpu", "int8")))
+            for name in ("small", "large")
+        )
+        scheduler = TranscriptionScheduler(
+            FakeEngine(), tiers=TierSelector([small, large], latency_target_secs=0.1)
+        )
+        segment = b"\x00" * 3200  # 0.1 s of audio
+
+        first = await scheduler.submit(segment)
+        self.assertEqual(registry.stats.loads, 1)
+        self.assertLess(first.compute_secs, 0.1)
+        self.assertGreaterEqual(first.wait_secs, 0.3)  # the load was waited for
+        self.assertLess(large.real_time_factor, 1.0)
+        self.assertEqual((await scheduler.submit(segment)).model, "large")
+        await scheduler.close()
+
+    async def test_decodes_from_features_when_supported(self) -> None:
+        """Engines that accept features get them; others get the audio."""
+
+        class FeatureEngine(FakeEngine):
+            def transcribe_features(self, features_batch):
+                return [f"features {f.shape}" for f in features_batch]
+
+        features = np.zeros((80, 3000), np.float32)
+        featured = TranscriptionScheduler(FeatureEngine(delay_secs=0))
+        audio_only = TranscriptionScheduler(FakeEngine(delay_secs=0))
+
+        result = await featured.submit(b"\x00" * 4, features=features)
+        self.assertEqual(result.text, "features (80, 3000)")
+        for _ in range(2):
+            result = await audio_only.submit(b"\x00" * 4, features=features)
+            self.assertEqual(result.text, "4 bytes")
+        self.assertIn(audio_only.engine, audio_only._audio_only)
+        await featured.close()
+        await audio_only.close()
@@ -0,0 +1,48 @@
+"""
+test_vad.py
+
+Unit tests for SpeechDetector's per-frame flags and energy gate.
+"""
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.vad import SpeechDetector
+
+SAMPLE_RATE = 16000
+FRAME = 480  # 30 ms at 16 kHz
+
+
+def tone(num_frames: int, amplitude: int = 8000) -> np.ndarray:
+    """Voice-band tone that WebRTC VAD classifies as speech."""
+    t = np.arange(num_frames * FRAME) / SAMPLE_RATE
+    wave = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (amplitude * wave / 1.5).astype(np.int16)
+
+
+class TestSpeechDetector(SimpleTestCase):
+    """Frame-level speech detection."""
+
+    def setUp(self) -> None:
+        self.detector = SpeechDetector(SAMPLE_RATE, mode=2, rms_threshold=500)
+
+    def test_one_flag_per_complete_frame(self) -> None:
+        """A trailing partial frame does not produce a flag."""
+        audio = np.zeros(3 * FRAME + 100, dtype=np.int16)
+        self.assertEqual(len(self.detector.frame_flags(audio.tobytes())), 3)
+
+    def test_silence_is_gated_by_energy(self) -> None:
+        """Frames below the RMS threshold never reach WebRTC VAD."""
+        audio = np.zeros(5 * FRAME, dtype=np.int16)
+        self.assertFalse(self.detector.frame_flags(audio.tobytes()).any())
+
+    def test_flags_voiced_frames(self) -> None:
+        """Voiced frames are flagged, the silence around them is not."""
+        silence = np.zeros(4 * FRAME, dtype=np.int16)
+        audio = np.concatenate([silence, tone(10), silence])
+        flags = self.detector.frame_flags(audio.tobytes())
+
+        self.assertEqual(len(flags), 18)
+        self.assertTrue(flags[4:14].any())
+        self.assertFalse(flags[:4].any())
@@ -0,0 +1,144 @@
+"""
+test_whisper_features.py
+
+Unit tests for Whisper.transcribe_features / transcribe_features_words
+with stub torch and transformers modules, so neither is needed.
+"""
+
+import contextlib
+import importlib
+import sys
+import types
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import numpy as np
+
+from app.services.speech_to_text import Word
+
+CHUNKS = [
+    {"text": " hello", "timestamp": (0.0, 0.4)},
+    {"text": " world", "timestamp": (0.4, None)},
+]
+
+
+class StubTensor:
+    """Wraps the array given to torch.from_numpy and records `.to()`."""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+        self.placement = None
+
+    def to(self, device, dtype) -> "StubTensor":
+        self.placement = (device, dtype)
+        return self
+
+
+class StubModel:
+    """Records generate() calls; one token id per input row."""
+
+    device = "cpu"
+    dtype = "float16"
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[StubTensor, dict]] = []
+
+    def generate(self, input_features: StubTensor, **kwargs) -> list[list[int]]:
+        self.calls.append((input_features, kwargs))
+        return [[len(self.calls) * 10 + i] for i in range(len(input_features.array))]
+
+    def to(self, device) -> "StubModel":
+        return self
+
+
+class StubPipeline:
+    """Stands in for the transformers ASR pipeline."""
+
+    def __init__(self) -> None:
+        self.model = StubModel()
+        self.feature_extractor = SimpleNamespace(feature_size=80)
+        self.tokenizer = SimpleNamespace(
+            batch_decode=lambda ids, skip_special_tokens: [f" tokens {i}" for i in ids]
+        )
+        self.forward_inputs: list[dict] = []
+
+    def __call__(self, audio, **kwargs) -> dict:
+        return {"text": " hello world", "chunks": CHUNKS}
+
+    def forward(self, model_inputs: dict, return_timestamps: str) -> dict:
+        self.forward_inputs.append(model_inputs)
+        return {"tokens": [1, 2]}
+
+    def postprocess(self, outputs: list[dict], return_timestamps: str) -> dict:
+        return {"text": " hello world", "chunks": CHUNKS}
+
+
+def stub_modules() -> dict[str, types.ModuleType]:
+    torch = types.ModuleType("torch")
+    torch.Tensor = StubTensor
+    torch.from_numpy = StubTensor
+    torch.inference_mode = contextlib.nullcontext
+    transformers = types.ModuleType("transformers")
+    transformers.pipeline = lambda task, model, device: StubPipeline()
+    transformers.AutoModelForSpeechSeq2Seq = SimpleNamespace(
+        from_pretrained=lambda name, torch_dtype: StubModel()
+    )
+    return {"torch": torch, "transformers": transformers}
+
+
+class TestWhisperFeatures(SimpleTestCase):
+    """Precomputed log-mel features reach the model as input_features."""
+
+    def setUp(self) -> None:
+        patcher = mock.patch.dict(sys.modules, stub_modules())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sys.modules.pop("app.services.whisper", None)
+        self.whisper_module = importlib.import_module("app.services.whisper")
+        self.engine = self.whisper_module.Whisper("tiny.en", device="cpu")
+        self.features = [
+            np.full((80, 3000), value, np.float32) for value in (0.25, -0.5)
+        ]
+
+    def test_features_are_passed_as_input_features(self) -> None:
+        texts = self.engine.transcribe_features(self.features)
+
+        self.assertEqual(texts, ["tokens [10]", "tokens [11]"])
+        ((tensor, kwargs),) = self.engine.pipe.model.calls
+        np.testing.assert_array_equal(tensor.array, np.stack(self.features))
+        self.assertEqual(tensor.placement, ("cpu", "float16"))
+        self.assertEqual(kwargs, {})
+
+    def test_assisted_decodes_one_segment_at_a_time(self) -> None:
+        engine = self.whisper_module.Whisper(
+            "medium.en", device="cpu", assistant_model_name="tiny.en"
+        )
+
+        texts = engine.transcribe_features(self.features)
+
+        self.assertEqual(len(texts), 2)
+        calls = engine.pipe.model.calls
+        self.assertEqual([len(tensor.array) for tensor, _ in calls], [1, 1])
+        self.assertIs(calls[0][1]["assistant_model"], engine.assistant_model)
+
+    def test_wrong_number_of_mel_bins(self) -> None:
+        with self.assertRaises(ValueError):
+            self.engine.transcribe_features([np.zeros((128, 3000), np.float32)])
+        self.assertEqual(self.engine.transcribe_features([]), [])
+
+    def test_words_keep_the_audio_path_shape(self) -> None:
+        """Feature and audio word timestamps give the same Word list."""
+        words = self.engine.transcribe_features_words(self.features[0], 1.5)
+
+        (inputs,) = self.engine.pipe.forward_inputs
+        self.assertTrue(inputs["is_last"])
+        np.testing.assert_array_equal(
+            inputs["input_features"].array, self.features[0][np.newaxis]
+        )
+        expected = [Word("hello", 0.0, 0.4), Word("world", 0.4, 1.5)]
+        self.assertEqual(words, expected)
+        self.assertEqual(
+            self.engine.transcribe_words(np.zeros(24000, np.float32)), expected
+        )
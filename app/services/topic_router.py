@@ -0,0 +1,197 @@
+"""
+topic_router.py
+
+Local topic classification for custom-topic feedback.
+
+Without a router, a custom-topic session costs two chat completions: one
+tool call to extract a topic keyword and one for the feedback itself. The
+router replaces the first one with a TF-IDF nearest-centroid classifier
+that runs in-process in well under a millisecond: each label (a preset
+prompt key or a free-form keyword such as "finance") is described by a
+short seed vocabulary, and the transcript is assigned to the most similar
+label. When the best score is below `min_score`, or too close to the
+runner-up, `route()` returns None and the caller falls back to the remote
+keyword extraction.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+STOPWORDS = frozenset("""
+    a about after all also am an and any are as at be because been before
+    being but by can could did do does doing for from get got had has have
+    having he her here him his how i if in into is it its just like me more
+    most my no not now of on one only or other our out over really said she
+    so some than that the their them then there these they this those to
+    too up us very was we were what when where which while who why will
+    with would you your yeah okay um uh
+    """.split())
+
+# Seed vocabulary per label. Preset prompt keys come first; the remaining
+# labels are free-form keywords handled by the keyword prompt.
+DEFAULT_TOPIC_SEEDS: dict[str, str] = {
+    "daily_conversation": (
+        "morning breakfast lunch dinner weekend family friend home house "
+        "routine shopping neighbor hobby sleep wake chat coffee evening "
+        "weather day week usually sometimes chores clean cook movie"
+    ),
+    "travel": (
+        "travel trip flight airport hotel passport visa luggage ticket "
+        "tourist vacation holiday booking reservation customs immigration "
+        "directions map train station beach country city abroad sightseeing "
+        "guide museum journey destination"
+    ),
+    "job_interview": (
+        "job interview company position role experience skill salary resume "
+        "career manager team project responsibility strength weakness "
+        "employer hire hiring candidate qualification promotion colleague "
+        "leadership deadline office work"
+    ),
+    "technology": (
+        "technology computer software hardware internet app application "
+        "artificial intelligence ai machine learning data robot smartphone "
+        "phone digital online program programming code algorithm device "
+        "cloud network innovation future automation"
+    ),
+    "finance": (
+        "money invest investment stock stocks bank saving savings interest "
+        "compound loan budget finance financial market price income tax "
+        "debt credit fund economy profit"
+    ),
+    "cooking": (
+        "cook cooking recipe kitchen food meal ingredient bake baking fry "
+        "boil taste delicious dish restaurant chef vegetable meat spicy "
+        "sauce oven"
+    ),
+    "sports": (
+        "sport sports football soccer basketball tennis game match team "
+        "player score goal win lose exercise gym training coach fitness run "
+        "running swim championship"
+    ),
+    "health": (
+        "health healthy doctor hospital medicine sick illness disease "
+        "symptom pain diet nutrition exercise stress mental sleep patient "
+        "treatment vitamin"
+    ),
+    "education": (
+        "school university college student teacher class lesson study "
+        "exam test homework grade learn learning course degree subject "
+        "lecture"
+    ),
+    "environment": (
+        "environment climate change pollution recycle recycling plastic "
+        "energy renewable solar carbon emission nature forest ocean "
+        "sustainable waste planet"
+    ),
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case words without stopwords, with plural "s" stripped."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass(frozen=True)
+class TopicMatch:
+    """
+    A confident routing decision.
+
+    Attributes:
+        label (str): Preset prompt key or free-form keyword.
+        score (float): Cosine similarity between transcript and label.
+        margin (float): Score lead over the runner-up label.
+    """
+
+    label: str
+    score: float
+    margin: float
+
+
+class TopicRouter:
+    """
+    TF-IDF nearest-centroid classifier over a fixed set of labels.
+
+    Attributes:
+        labels (list[str]): Labels in matrix row order.
+        min_score (float): Minimum cosine similarity to accept a label.
+        min_margin (float): Minimum lead over the runner-up label.
+    """
+
+    def __init__(
+        self,
+        seeds: dict[str, str] | None = None,
+        min_score: float = 0.12,
+        min_margin: float = 0.03,
+    ):
+        seeds = DEFAULT_TOPIC_SEEDS if seeds is None else seeds
+        if len(seeds) < 2:
+            raise ValueError("TopicRouter needs at least two labels")
+        self.labels = list(seeds)
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        documents = [Counter(tokenize(seeds[label])) for label in self.labels]
+        vocabulary = sorted(set().union(*documents))
+        self._index = {token: i for i, token in enumerate(vocabulary)}
+
+        # Smoothed IDF: words shared by several labels weigh less
+        num_docs = len(documents)
+        df = Counter(token for doc in documents for token in doc)
+        self._idf = np.array(
+            [math.log((1 + num_docs) / (1 + df[t])) + 1 for t in vocabulary],
+            dtype=np.float32,
+        )
+        self._oov_idf = float(self._idf.max())
+        self._centroids = np.stack([self._vectorize(doc) for doc in documents])
+
+    def _vectorize(self, counts: Counter) -> np.ndarray:
+        """
+        L2-normalized TF-IDF vector (sublinear TF) of a token count.
+
+        Words outside the seed vocabulary have no column but still count
+        towards the norm (with the highest IDF), so a single topic word in
+        a long off-topic transcript does not look like a confident match.
+        """
+        vector = np.zeros(len(self._index), dtype=np.float32)
+        oov_sq = 0.0
+        for token, count in counts.items():
+            tf = 1.0 + math.log(count)
+            i = self._index.get(token)
+            if i is None:
+                oov_sq += tf * tf
+            else:
+                vector[i] = tf
+        vector *= self._idf
+        norm = math.sqrt(float(vector @ vector) + oov_sq * self._oov_idf**2)
+        return vector / norm if norm else vector
+
+    def scores(self, text: str) -> dict[str, float]:
+        """Cosine similarity of `text` to every label."""
+        similarities = self._centroids @ self._vectorize(Counter(tokenize(text)))
+        return dict(zip(self.labels, similarities.tolist()))
+
+    def route(self, text: str) -> TopicMatch | None:
+        """
+        Return the best label for `text`, or None if the decision is not
+        confident enough and the caller should ask the model instead.
+        """
+        similarities = self._centroids @ self._vectorize(Counter(tokenize(text)))
+        order = np.argsort(similarities)[::-1]
+        best, runner_up = similarities[order[0]], similarities[order[1]]
+        margin = float(best - runner_up)
+        if best < self.min_score or margin < self.min_margin:
+            return None
+        return TopicMatch(self.labels[order[0]], float(best), margin)
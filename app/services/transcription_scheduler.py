@@ -0,0 +1,429 @@
+"""
+transcription_scheduler.py
+
+Asyncio front end for a shared `SpeechToText` engine.
+
+Consumers submit audio segments through an asyncio queue and await the
+result, while the (blocking) decode runs on a dedicated worker thread.
+This keeps the event loop free to serve pings, audio frames and sends for
+every other connected client while a segment is being transcribed.
+
+With `max_batch_size > 1` a worker collects segments from concurrent
+sessions for up to `max_wait_secs` and decodes them with a single
+`transcribe_batch()` call, trading a bounded amount of latency for
+throughput. Segments submitted with `word_timestamps=True` (streaming
+mode) share the same queue but are decoded with `transcribe_words()`.
+
+Segments may carry precomputed log-mel features (see features.py); they
+are decoded from the features when the engine accepts them and from the
+audio otherwise.
+
+With a `TierSelector` (see model_tiers) each batch is decoded by the
+largest model that keeps the queued audio within the latency target, and
+every result records which model produced it.
+
+Engines are loaded (see `SpeechToText.loaded`) before the decode clock
+starts: a lazy or evicted model's load time counts as queueing, not as
+compute time, so it never inflates a tier's measured real-time factor.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .metrics import (
+    AUDIO_SECONDS,
+    DECODE_SECONDS,
+    REAL_TIME_FACTOR,
+    SEGMENTS_BY_MODEL,
+    STAGE_SECONDS,
+)
+from .model_tiers import ModelTier, TierSelector
+from .speech_to_text import AudioInput, SpeechToText, Word
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class TranscriptionResult:
+    """
+    Output of a scheduled transcription.
+
+    Attributes:
+        text (str): The recognized text.
+        wait_secs (float): Time spent queued, including the batching window,
+            before the engine started on it.
+        compute_secs (float): Time spent inside the engine for the whole batch.
+        batch_size (int): Number of segments decoded together with this one.
+        words (list[Word]): Timed words, only for `word_timestamps` requests.
+        model (str): Tier that decoded the segment ("" without tiers).
+    """
+
+    text: str
+    wait_secs: float
+    compute_secs: float
+    batch_size: int = 1
+    words: list[Word] = field(default_factory=list)
+    model: str = ""
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Running counters used to size inference workers.
+    """
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    batches: int = 0
+    total_wait_secs: float = 0.0
+    total_compute_secs: float = 0.0
+    max_wait_secs: float = 0.0
+    max_compute_secs: float = 0.0
+
+    def record_batch(self, results: list[TranscriptionResult]) -> None:
+        """Account for one finished batch."""
+        if not results:
+            return
+        compute_secs = results[0].compute_secs
+        self.batches += 1
+        self.completed += len(results)
+        self.total_compute_secs += compute_secs
+        self.max_compute_secs = max(self.max_compute_secs, compute_secs)
+        for result in results:
+            self.total_wait_secs += result.wait_secs
+            self.max_wait_secs = max(self.max_wait_secs, result.wait_secs)
+
+    @property
+    def mean_wait_secs(self) -> float:
+        """Average latency added by queueing and batching."""
+        return self.total_wait_secs / self.completed if self.completed else 0.0
+
+    @property
+    def mean_compute_secs(self) -> float:
+        """Average engine time per batch."""
+        return self.total_compute_secs / self.batches if self.batches else 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of segments per engine call."""
+        return self.completed / self.batches if self.batches else 0.0
+
+    @property
+    def segments_per_sec(self) -> float:
+        """Segments decoded per second of engine time."""
+        if not self.total_compute_secs:
+            return 0.0
+        return self.completed / self.total_compute_secs
+
+    def __str__(self) -> str:
+        return (
+            f"{self.segments_per_sec:.2f} segments/s, "
+            f"batch {self.mean_batch_size:.1f}, "
+            f"wait {self.mean_wait_secs * 1000:.0f} ms "
+            f"(max {self.max_wait_secs * 1000:.0f} ms), "
+            f"compute {self.mean_compute_secs * 1000:.0f} ms"
+        )
+
+
+@dataclass
+class _Request:
+    audio_bytes: AudioInput
+    future: "asyncio.Future[TranscriptionResult]"
+    word_timestamps: bool = False
+    features: np.ndarray | None = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+def _num_samples(audio: AudioInput) -> int:
+    """Length of a segment (PCM16 bytes or a sample array) in samples."""
+    return len(audio) // 2 if isinstance(audio, bytes) else len(audio)
+
+
+def _audio_secs(audio: AudioInput) -> float:
+    """Duration of a 16 kHz segment (PCM16 bytes or a sample array)."""
+    return _num_samples(audio) / SAMPLE_RATE
+
+
+def _record_metrics(
+    requests: list[_Request], results: list[TranscriptionResult]
+) -> None:
+    """Export queueing, decode time and real-time factor of one batch."""
+    for result in results:
+        STAGE_SECONDS.observe(result.wait_secs, stage="queue")
+    compute_secs = results[0].compute_secs
+    audio_secs = sum(_audio_secs(request.audio_bytes) for request in requests)
+    if results[0].model:
+        SEGMENTS_BY_MODEL.inc(len(results), model=results[0].model)
+    STAGE_SECONDS.observe(compute_secs, stage="decode")
+    DECODE_SECONDS.inc(compute_secs)
+    AUDIO_SECONDS.inc(audio_secs)
+    if audio_secs:
+        REAL_TIME_FACTOR.observe(compute_secs / audio_secs)
+
+
+class TranscriptionScheduler:
+    """
+    Owns a `SpeechToText` engine and serializes access to it.
+
+    Requests are queued on the running event loop and consumed by
+    `num_workers` worker tasks. Each worker hands the decode to a thread
+    pool so the loop itself never blocks on the model. Batches run
+    concurrently only on engines marked `thread_safe`; any other engine
+    (e.g. the transformers pipeline) decodes one batch at a time, however
+    many workers there are.
+
+    Attributes:
+        max_batch_size (int): Upper bound on segments per engine call.
+        max_wait_secs (float): How long a worker waits for more segments
+            after the first one arrives before running a partial batch.
+        tiers (TierSelector | None): Model sizes to choose from per batch;
+            without it every batch goes to `engine`.
+    """
+
+    def __init__(
+        self,
+        engine: SpeechToText,
+        num_workers: int = 1,
+        max_batch_size: int = 1,
+        max_wait_secs: float = 0.0,
+        tiers: TierSelector | None = None,
+    ):
+        self.engine = engine
+        self.num_workers = num_workers
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_secs = max_wait_secs
+        self.tiers = tiers
+        self.stats = SchedulerStats()
+        self._queued_samples = 0
+        # Engines found not to accept features; decoded from audio instead
+        self._audio_only: set[SpeechToText] = set()
+        # One decode at a time per engine that is not thread-safe
+        self._engine_locks: dict[SpeechToText, threading.Lock] = {}
+        self._engine_locks_guard = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="stt-worker"
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: "asyncio.Queue[_Request] | None" = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of segments waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def queued_secs(self) -> float:
+        """Seconds of audio waiting for a worker."""
+        return self._queued_samples / SAMPLE_RATE
+
+    def _ensure_workers(self) -> "asyncio.Queue[_Request]":
+        """Bind the queue and worker tasks to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._workers = [
+                loop.create_task(self._worker(self._queue))
+                for _ in range(self.num_workers)
+            ]
+        return self._queue
+
+    async def submit(
+        self,
+        audio_bytes: AudioInput,
+        word_timestamps: bool = False,
+        features: np.ndarray | None = None,
+    ) -> TranscriptionResult:
+        """
+        Queue a segment and wait for its transcription.
+
+        Parameters
+        ----------
+        audio_bytes : bytes or np.ndarray
+            Audio as accepted by the engine's `transcribe()`. Arrays must not
+            be modified until the returned coroutine completes.
+        word_timestamps : bool
+            Decode with `transcribe_words()` and fill `TranscriptionResult.words`.
+        features : np.ndarray, optional
+            Log-mel features of `audio_bytes`, used instead of the audio by
+            engines that accept them.
+
+        Returns
+        -------
+        TranscriptionResult
+            The text together with its queueing and compute times.
+        """
+        queue = self._ensure_workers()
+        future: "asyncio.Future[TranscriptionResult]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.stats.submitted += 1
+        self._queued_samples += _num_samples(audio_bytes)
+        await queue.put(_Request(audio_bytes, future, word_timestamps, features))
+        return await future
+
+    async def transcribe(self, audio_bytes: AudioInput) -> str:
+        """Queue a segment and return only its text."""
+        result = await self.submit(audio_bytes)
+        return result.text
+
+    async def _collect_batch(self, queue: "asyncio.Queue[_Request]") -> list[_Request]:
+        """Wait for one request, then gather more until full or timed out."""
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.max_wait_secs
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        for request in batch:
+            self._queued_samples -= _num_samples(request.audio_bytes)
+        return batch
+
+    def _select_tier(self, requests: list[_Request]) -> ModelTier | None:
+        """The tier for a batch, given the audio still queued behind it."""
+        if self.tiers is None:
+            return None
+        batch_secs = sum(_audio_secs(request.audio_bytes) for request in requests)
+        return self.tiers.select(batch_secs + self.queued_secs)
+
+    def _decode_timed(
+        self, engine: SpeechToText, requests: list[_Request]
+    ) -> tuple[list[tuple[str, list[Word]]], float, float]:
+        """
+        Load the engine if needed, then decode one batch (called on the
+        executor thread). Returns the outputs, when the decode started and
+        how long it took, model load excluded.
+        """
+        with engine.loaded() as ready, self._exclusive(ready):
+            started_at = time.perf_counter()
+            outputs = self._decode(ready, requests)
+            return outputs, started_at, time.perf_counter() - started_at
+
+    def _exclusive(self, engine: SpeechToText) -> contextlib.AbstractContextManager:
+        """The lock serializing decodes on `engine` (none if thread-safe)."""
+        if engine.thread_safe:
+            return contextlib.nullcontext()
+        with self._engine_locks_guard:
+            return self._engine_locks.setdefault(engine, threading.Lock())
+
+    def _decode(
+        self, engine: SpeechToText, requests: list[_Request]
+    ) -> list[tuple[str, list[Word]]]:
+        """Run one batch on a loaded engine."""
+        outputs: list[tuple[str, list[Word]]] = [("", [])] * len(requests)
+        plain = [i for i, request in enumerate(requests) if not request.word_timestamps]
+        texts = self._decode_texts(engine, [requests[i] for i in plain])
+        for i, text in zip(plain, texts):
+            outputs[i] = (text, [])
+        for i, request in enumerate(requests):
+            if request.word_timestamps:
+                words = self._decode_words(engine, request)
+                outputs[i] = (" ".join(word.text for word in words), words)
+        return outputs
+
+    def _decode_texts(
+        self, engine: SpeechToText, requests: list[_Request]
+    ) -> list[str]:
+        """Plain segments, from their features if all of them have some."""
+        if (
+            requests
+            and all(request.features is not None for request in requests)
+            and engine not in self._audio_only
+        ):
+            try:
+                return engine.transcribe_features([r.features for r in requests])
+            except NotImplementedError:
+                self._audio_only.add(engine)
+        return engine.transcribe_batch([request.audio_bytes for request in requests])
+
+    def _decode_words(self, engine: SpeechToText, request: _Request) -> list[Word]:
+        """A word-timestamps segment, from its features if it has some."""
+        if request.features is not None and engine not in self._audio_only:
+            try:
+                return engine.transcribe_features_words(
+                    request.features, _audio_secs(request.audio_bytes)
+                )
+            except NotImplementedError:
+                self._audio_only.add(engine)
+        return engine.transcribe_words(request.audio_bytes)
+
+    async def _worker(self, queue: "asyncio.Queue[_Request]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch(queue)
+            try:
+                live = [request for request in batch if not request.future.done()]
+                if not live:
+                    continue
+                tier = self._select_tier(live)
+                engine = tier.engine if tier is not None else self.engine
+                try:
+                    outputs, started_at, compute_secs = await loop.run_in_executor(
+                        self._executor, self._decode_timed, engine, live
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    self.stats.failed += len(live)
+                    for request in live:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    continue
+
+                self._complete(live, outputs, started_at, compute_secs, tier)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _complete(
+        self,
+        requests: list[_Request],
+        outputs: list[tuple[str, list[Word]]],
+        started_at: float,
+        compute_secs: float,
+        tier: ModelTier | None,
+    ) -> None:
+        """Account for a decoded batch and resolve its futures."""
+        results = [
+            TranscriptionResult(
+                text=text,
+                wait_secs=started_at - request.enqueued_at,
+                compute_secs=compute_secs,
+                batch_size=len(requests),
+                words=words,
+                model=tier.name if tier is not None else "",
+            )
+            for request, (text, words) in zip(requests, outputs)
+        ]
+        if tier is not None:
+            audio_secs = sum(_audio_secs(r.audio_bytes) for r in requests)
+            self.tiers.record(tier, audio_secs, compute_secs, len(requests))
+        self.stats.record_batch(results)
+        _record_metrics(requests, results)
+        for request, result in zip(requests, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the worker tasks and release the engine."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._executor.shutdown(wait=True)
+        self.engine.close()
+        if self.tiers is not None:
+            self.tiers.close()
@@ -1,22 +1,30 @@
 """
 whisper.py
 
-Concrete implementation of the SpeechToText abstract class using
-Faster-Whisper, PyAudio, and WebRTC VAD for streaming transcription.
+Concrete implementation of the SpeechToText abstract class using the
+HuggingFace transformers Whisper pipeline. The engine is inference-only;
+microphone capture lives in microphone.py. See fast_whisper.py for the
+quantized Faster-Whisper engine.
+
+With an assistant model (a small checkpoint with the same tokenizer,
+e.g. "tiny.en" or "distil-whisper/distil-medium.en"), text is decoded
+with assisted generation: the assistant drafts a few tokens and the main
+model verifies them in one forward pass, keeping those it would have
+produced itself. Greedy transcripts are the same as without the
+assistant (see decoding_parity.py to check), with fewer slow decoder
+steps. Assisted generation decodes one segment at a time, and word
+timestamps are always decoded without the assistant.
 """
 
-from typing import Generator, TypedDict, cast
+from typing import TypedDict, cast
 
 import numpy as np
-import pyaudio
-import webrtcvad
-from transformers import pipeline
+import torch
+from transformers import AutoModelForSpeechSeq2Seq, pipeline
 
-from .speech_to_text import SpeechToText
+from .speech_to_text import AudioInput, SpeechToText, Word, to_float32
 
 SAMPLE_RATE = 16000
-CHUNK_DURATION_IN_SECS = 0.512
-BUFFER_DURATION_IN_SECS = 3
 USE_CUDA = 0
 USE_CPU = -1
 
@@ -29,21 +37,43 @@ class PipeResult(TypedDict):
     text: str
 
 
+class PipeChunk(TypedDict):
+    """
+    Class Pipe Chunk for one word when transcribing with word timestamps
+    """
+
+    text: str
+    timestamp: tuple[float, float | None]
+
+
+class PipeWordsResult(TypedDict):
+    """
+    Class Pipe Words Result for handle output when transcribe with timestamps
+    """
+
+    text: str
+    chunks: list[PipeChunk]
+
+
 class Whisper(SpeechToText):
     """
-    Whisper STT engine using Faster-Whisper + VAD + PyAudio streaming.
+    Whisper STT engine using the transformers ASR pipeline.
 
-    This class handles:
-        - audio capture via PyAudio
-        - VAD segmentation using WebRTC VAD
-        - buffering logic for speech chunks
-        - transcription using Faster-Whisper
-        - sending transcriptions to Django server
+    Constructing it loads the model only: no audio device is opened, so it
+    runs headless in the server, batch commands and tests. Use
+    `microphone.transcribe_microphone()` (or `start_streaming()`) for live
+    local transcription.
 
     Implements required abstract methods:
         - preprocess_audio()
         - transcribe()
         - close()
+
+    Overrides transcribe_batch() to run several segments through a
+    single batched pipeline call, and transcribe_words() to return
+    word-level timestamps for streaming mode. transcribe_features() and
+    transcribe_features_words() take log-mel features computed by the
+    caller (see features.py) instead of audio.
     """
 
     PREFIX = "openai/whisper-"
@@ -52,110 +82,169 @@ class Whisper(SpeechToText):
         self,
         model_name: str = "medium.en",
         device: str = "cuda",
+        assistant_model_name: str | None = None,
     ):
-        """Load HuggingFace Whisper pipeline and initialize components."""
-        if "/" in model_name:
-            self.model_name = model_name
-        else:
-            self.model_name = f"{self.PREFIX}{model_name}"
+        """
+        Load HuggingFace Whisper pipeline and initialize components.
+
+        `assistant_model_name` enables assisted decoding with that draft
+        model; `assisted` can switch it off again per instance.
+        """
+        self.model_name = self._checkpoint(model_name)
         self.device = device
         self.pipe = pipeline(
             "automatic-speech-recognition",
             model=self.model_name,
             device=USE_CUDA if device == "cuda" else USE_CPU,
         )
-
-        self.vad = webrtcvad.Vad()
-        self.vad.set_mode(2)
-
-        self.audio = pyaudio.PyAudio()
-
-        self.stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=1024,
-        )
-
-        self.buffer_audio = b""
-        self.accumulated_transcription = ""
+        self.assistant_model = None
+        if assistant_model_name:
+            self.assistant_model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                self._checkpoint(assistant_model_name),
+                torch_dtype=self.pipe.model.dtype,
+            ).to(self.pipe.model.device)
+        self.assisted = self.assistant_model is not None
+
+    @classmethod
+    def _checkpoint(cls, model_name: str) -> str:
+        """Hub id of a checkpoint: short names are OpenAI Whisper models."""
+        return model_name if "/" in model_name else f"{cls.PREFIX}{model_name}"
+
+    def _generate_kwargs(self, assisted: bool | None = None) -> dict:
+        """Generation options: the assistant model when decoding assisted."""
+        if assisted is None:
+            assisted = self.assisted
+        if assisted and self.assistant_model is not None:
+            return {"assistant_model": self.assistant_model}
+        return {}
 
     def preprocess_audio(self, audio_bytes: bytes) -> bytes:
         """Return raw PCM16 mono audio (already PCM16)."""
         return audio_bytes
 
-    def transcribe(self, audio_bytes: bytes) -> str:
+    def transcribe(self, audio_bytes: AudioInput) -> str:
+        """
+        Transcribe with pipeline (assisted, if enabled).
         """
-        Transcribe with pipeline.
+        return self._transcribe(audio_bytes, self.assisted)
+
+    def transcribe_plain(self, audio_bytes: AudioInput) -> str:
         """
-        audio_np = (
-            np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        Transcribe without the assistant model, e.g. as the reference of
+        a parity check.
+        """
+        return self._transcribe(audio_bytes, assisted=False)
+
+    def _transcribe(self, audio_bytes: AudioInput, assisted: bool) -> str:
+        result = self.pipe(
+            to_float32(audio_bytes), generate_kwargs=self._generate_kwargs(assisted)
         )
-        result = self.pipe(audio_np)
         typed = cast(PipeResult, result)
         return typed["text"].strip()
 
-    def close(self) -> None:
-        """Release PyAudio streams and Whisper model."""
-        try:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.audio.terminate()
-        except (OSError, ValueError) as e:
-            print(f"[close] PyAudio error: {e}")
-
-    def _record_small_chunk(self) -> bytes:
-        """Record a small chunk of raw PCM audio."""
-        frames = []
-        num_frames = int(SAMPLE_RATE * CHUNK_DURATION_IN_SECS / 1024)
-        for _ in range(num_frames):
-            data = self.stream.read(1024, exception_on_overflow=False)
-            frames.append(data)
-        return b"".join(frames)
-
-    def _frame_generator(
-        self, audio_bytes: bytes, frame_duration_ms: int = 30
-    ) -> Generator[bytes, None, None]:
-        """Generate frames of fixed duration for VAD."""
-        bytes_per_frame = int(SAMPLE_RATE * 2 * frame_duration_ms / 1000)
-        for i in range(0, len(audio_bytes), bytes_per_frame):
-            frame = audio_bytes[i : i + bytes_per_frame]
-            if len(frame) == bytes_per_frame:
-                yield frame
-
-    def _is_speech(self, audio_bytes: bytes) -> bool:
-        """Detect if chunk contains speech."""
-        for frame in self._frame_generator(audio_bytes):
-            if self.vad.is_speech(frame, SAMPLE_RATE):
-                return True
-        return False
-
-    def start_streaming(self) -> None:
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
         """
-        Start VAD-powered streaming transcription.
-        This function blocks until KeyboardInterrupt.
+        Transcribe several segments with one batched pipeline call.
         """
-        print("Listening... Press Ctrl+C to stop.")
-
-        try:
-            while True:
-                small_chunk = self._record_small_chunk()
+        if not audio_batch:
+            return []
+        if self.assisted:
+            # Assisted generation verifies drafts of one sequence at a time
+            return [self.transcribe(audio_bytes) for audio_bytes in audio_batch]
+        results = self.pipe(
+            [to_float32(audio_bytes) for audio_bytes in audio_batch],
+            batch_size=len(audio_batch),
+        )
+        typed = cast(list[PipeResult], results)
+        return [item["text"].strip() for item in typed]
 
-                # Speech?
-                if self._is_speech(small_chunk):
-                    self.buffer_audio += small_chunk
+    def transcribe_words(self, audio_bytes: AudioInput) -> list[Word]:
+        """
+        Transcribe with pipeline and return word-level timestamps.
+        """
+        audio_np = to_float32(audio_bytes)
+        result = self.pipe(audio_np, return_timestamps="word")
+        return self._words(cast(PipeWordsResult, result), len(audio_np) / SAMPLE_RATE)
+
+    @property
+    def n_mels(self) -> int:
+        """Mel bins of the model input (80, or 128 for large-v3)."""
+        return self.pipe.feature_extractor.feature_size
+
+    def _input_features(self, features_batch: list[np.ndarray]) -> torch.Tensor:
+        """Stack features into a model input tensor on the model's device."""
+        for features in features_batch:
+            if features.shape[0] != self.n_mels:
+                raise ValueError(
+                    f"{self.model_name} expects {self.n_mels} mel bins, "
+                    f"got {features.shape[0]}"
+                )
+        model = self.pipe.model
+        return torch.from_numpy(np.stack(features_batch)).to(model.device, model.dtype)
+
+    def transcribe_features(self, features_batch: list[np.ndarray]) -> list[str]:
+        """
+        Transcribe precomputed log-mel features, skipping the pipeline's
+        feature extraction.
+        """
+        if not features_batch:
+            return []
+        # Assisted generation verifies drafts of one sequence at a time
+        groups = [[f] for f in features_batch] if self.assisted else [features_batch]
+        texts = []
+        with torch.inference_mode():
+            for group in groups:
+                token_ids = self.pipe.model.generate(
+                    input_features=self._input_features(group),
+                    **self._generate_kwargs(),
+                )
+                texts += self.pipe.tokenizer.batch_decode(
+                    token_ids, skip_special_tokens=True
+                )
+        return [text.strip() for text in texts]
+
+    def transcribe_features_words(
+        self, features: np.ndarray, duration_secs: float
+    ) -> list[Word]:
+        """
+        Transcribe precomputed log-mel features with word-level timestamps,
+        running only the pipeline's model and decoding steps.
+        """
+        model_inputs = {
+            "input_features": self._input_features([features]),
+            "is_last": True,
+        }
+        outputs = self.pipe.forward(model_inputs, return_timestamps="word")
+        result = self.pipe.postprocess([outputs], return_timestamps="word")
+        return self._words(cast(PipeWordsResult, result), duration_secs)
+
+    @staticmethod
+    def _words(result: PipeWordsResult, duration: float) -> list[Word]:
+        """Words of a pipeline result; an open last word ends at `duration`."""
+        words = []
+        for chunk in result["chunks"]:
+            start, end = chunk["timestamp"]
+            words.append(
+                Word(
+                    text=chunk["text"].strip(),
+                    start=start,
+                    end=end if end is not None else duration,
+                )
+            )
+        return words
 
-                # Enough buffer?
-                if len(self.buffer_audio) >= SAMPLE_RATE * 2 * BUFFER_DURATION_IN_SECS:
-                    transcription = self.transcribe(self.buffer_audio)
-                    self.buffer_audio = b""
+    def close(self) -> None:
+        """Release the Whisper pipeline and the assistant model."""
+        self.pipe = None
+        self.assistant_model = None
+        self.assisted = False
 
-                    if transcription:
-                        print("\033[92m" + transcription + "\033[0m")
-                        self.accumulated_transcription += transcription + " "
+    def start_streaming(self) -> None:
+        """
+        Transcribe the local microphone until KeyboardInterrupt.
+        This function blocks; it opens the audio device only when called.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from .microphone import transcribe_microphone
 
-        except KeyboardInterrupt:
-            print("\n--- Transcription finished ---")
-            print("Full transcript:\n", self.accumulated_transcription)
-            self.close()
+        transcribe_microphone(self)
@@ -6,11 +6,26 @@ let audioContext;
 let mediaStream;
 let workletNode;
 let workletLoaded = false;
+let encoder; // WebCodecs Opus encoder when "audio.opus" was negotiated
+let encodedSamples = 0;
+
+// Audio formats offered to the server, most compact first
+const OPUS_CONFIG = {
+  codec: "opus",
+  sampleRate: 16000,
+  numberOfChannels: 1,
+  bitrate: 24000,
+};
 
 const recordBtn = document.getElementById("speakingButton");
 const translationBox = document.getElementById("translationBox");
 const feedbackSection = document.getElementById("feedbackSection");
 
+// Transcript state: committed text never changes, partial text may be revised
+let committedText = "";
+let partialText = "";
+let awaitingFeedback = false; // placeholder shown until the first delta
+
 // Button content
 const buttonContentWhenNotSpeaking = recordBtn.textContent;
 const buttonContentWhenSpeaking = `
@@ -33,19 +48,115 @@ function float32ToPCM16(float32Array) {
   return buffer;
 }
 
+// Offer Opus only if this browser can encode it; PCM16 is always offered
+async function audioSubprotocols() {
+  if ("AudioEncoder" in window) {
+    try {
+      const { supported } = await AudioEncoder.isConfigSupported(OPUS_CONFIG);
+      if (supported) return ["audio.opus", "audio.pcm16"];
+    } catch (err) {
+      console.warn("Opus encoder unavailable:", err);
+    }
+  }
+  return ["audio.pcm16"];
+}
+
+// One Opus packet per WebSocket message
+function createOpusEncoder(socket) {
+  const opusEncoder = new AudioEncoder({
+    output: (chunk) => {
+      if (socket.readyState !== WebSocket.OPEN) return;
+      const packet = new ArrayBuffer(chunk.byteLength);
+      chunk.copyTo(packet);
+      socket.send(packet);
+    },
+    error: (err) => console.error("Opus encoder error:", err),
+  });
+  opusEncoder.configure(OPUS_CONFIG);
+  encodedSamples = 0;
+  return opusEncoder;
+}
+
+// Send a Float32Array chunk (16 kHz) in the negotiated format
+function sendAudio(chunk) {
+  if (encoder) {
+    const audioData = new AudioData({
+      format: "f32",
+      sampleRate: OPUS_CONFIG.sampleRate,
+      numberOfChannels: 1,
+      numberOfFrames: chunk.length,
+      timestamp: (encodedSamples * 1e6) / OPUS_CONFIG.sampleRate,
+      data: chunk,
+    });
+    encodedSamples += chunk.length;
+    encoder.encode(audioData);
+    audioData.close();
+  } else {
+    ws.send(float32ToPCM16(chunk)); // raw PCM16 fallback
+  }
+}
+
+// Show committed text followed by the current (unstable) partial text
+function renderTranscript() {
+  translationBox.textContent = "";
+  translationBox.append(committedText);
+  if (partialText) {
+    const partial = document.createElement("span");
+    partial.className = "partial-text";
+    partial.textContent = ` ${partialText}`;
+    translationBox.append(partial);
+  }
+}
+
 // Start recording
 async function startRecording() {
-  ws = new WebSocket(WS_URL);
+  ws = new WebSocket(WS_URL, await audioSubprotocols());
   ws.binaryType = "arraybuffer";
 
-  // Update the translation box when server sends transcription
+  // Server events are JSON, see app/services/session_protocol.py
   ws.onmessage = (e) => {
-    console.log("TRANSCRIBED:", e.data);
-    translationBox.textContent = e.data; // display transcription in the box
+    const event = JSON.parse(e.data);
+
+    if (event.type === "ack") {
+      console.log(`Server acknowledged "${event.request}"`, event);
+    } else if (event.type === "transcript") {
+      if (event.final) {
+        committedText = `${committedText} ${event.text}`.trim();
+        partialText = "";
+      } else {
+        partialText = event.text;
+      }
+      renderTranscript();
+    } else if (event.type === "final_transcript") {
+      committedText = event.text;
+      partialText = "";
+      renderTranscript();
+    } else if (event.type === "feedback_delta") {
+      // Feedback is streamed: append each piece as it arrives
+      if (awaitingFeedback) {
+        feedbackSection.textContent = "";
+        awaitingFeedback = false;
+      }
+      feedbackSection.textContent += event.text;
+    } else if (event.type === "feedback_done") {
+      awaitingFeedback = false;
+      feedbackSection.textContent = event.text;
+    } else if (event.type === "error") {
+      console.error("Server error:", event.message);
+    }
   };
 
   ws.onopen = async () => {
-    console.log("WebSocket connected");
+    console.log(`WebSocket connected (${ws.protocol || "audio.pcm16"})`);
+    ws.send(
+      JSON.stringify({
+        type: "start",
+        topic: localStorage.getItem("selected_topic") || "custom_topic",
+      })
+    );
+    if (ws.protocol === "audio.opus") {
+      encoder = createOpusEncoder(ws);
+    }
 
     // Get microphone
     mediaStream = await navigator.mediaDevices.getUserMedia({ audio: true });
@@ -70,8 +181,7 @@ async function startRecording() {
       if (!ws || ws.readyState !== WebSocket.OPEN) return;
 
       const chunk = event.data; // Float32Array chunk
-      const pcm16 = float32ToPCM16(chunk); // convert to PCM16 bytes
-      ws.send(pcm16); // send to Django WebSocket
+      sendAudio(chunk); // send to Django WebSocket
     };
 
     source.connect(workletNode);
@@ -81,6 +191,11 @@ async function startRecording() {
 
   ws.onclose = () => {
     console.log("WebSocket disconnected");
+    if (awaitingFeedback) {
+      // Session ended without feedback (e.g. nothing was said)
+      feedbackSection.textContent = "";
+      awaitingFeedback = false;
+    }
   };
 
   ws.onerror = (err) => {
@@ -100,8 +215,19 @@ async function stopRecording() {
     mediaStream = null;
   }
 
+  if (encoder) {
+    // Send the packets still buffered in the encoder
+    await encoder.flush().catch(() => {});
+    encoder.close();
+    encoder = null;
+  }
+
+  // Ask the server to finish the session: it sends the final transcript
+  // and feedback, then closes the socket itself
   if (ws && ws.readyState === WebSocket.OPEN) {
-    ws.close();
+    ws.send(JSON.stringify({ type: "end" }));
+    feedbackSection.textContent = "Generating feedback...";
+    awaitingFeedback = true;
   }
   ws = null;
 }
@@ -111,6 +237,9 @@ recordBtn.addEventListener("click", () => {
   if (!recordBtn.classList.contains("recording")) {
     // Start speaking
     translationBox.textContent = ""; // clear previous transcription
+    feedbackSection.textContent = "";
+    committedText = "";
+    partialText = "";
     recordBtn.classList.add("recording");
     recordBtn.innerHTML = buttonContentWhenSpeaking;
     startRecording();
@@ -1,4 +1,5 @@
 let selectedDecs = "";
+let selectedTopic = "";
 
 document.querySelectorAll(".select-topic-item").forEach(item => {
     item.addEventListener("click", () => {
@@ -17,6 +18,7 @@ document.querySelectorAll(".select-topic-item").forEach(item => {
         item.classList.add("active");
 
         selectedDecs = item.querySelector("p").innerText;
+        selectedTopic = item.dataset.topic;
     })
 })
 
@@ -27,6 +29,7 @@ document.getElementById("start-btn").addEventListener("click", () => {
   }
 
   localStorage.setItem("selected_topic_desc", selectedDecs);
+  localStorage.setItem("selected_topic", selectedTopic);
 
   window.location.href = "/speaking";
 });
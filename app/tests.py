@@ -2,12 +2,30 @@
 Test suite for the 'app' Django application.
 
 This module includes tests for the home view to ensure
-it returns the correct HTTP response and content.
+it returns the correct HTTP response and content, for the metrics
+endpoint, and for sessions offloaded to channel-layer workers.
 """
 
-from django.test import SimpleTestCase
+import asyncio
+import importlib
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 
+import numpy as np
+from channels.layers import get_channel_layer
+from channels.testing import ApplicationCommunicator, WebsocketCommunicator
+
+from app import consumers, routing
+from app.services.admission import CLOSE_OVERLOADED, AdmissionController
+from app.services.codecs import PCM16
+from app.services.speech_to_text import SpeechToText
+from app.workers import FeedbackWorker, TranscriptionWorker
+
 
 class HomeViewTests(SimpleTestCase):
     """Tests for the home page view."""
@@ -26,3 +44,361 @@ class HomeViewTests(SimpleTestCase):
         """Home page should contain expected base content."""
         response = self.client.get(reverse("home"))
         self.assertContains(response, "AI Communication")
+
+
+class MetricsViewTests(SimpleTestCase):
+    """Tests for the Prometheus metrics endpoint."""
+
+    def test_metrics_exposes_pipeline_metrics(self) -> None:
+        """Metrics should be served as Prometheus text."""
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertContains(response, "# TYPE ai_communication_stage_seconds histogram")
+        self.assertContains(response, "ai_communication_active_sessions ")
+
+    def test_metrics_rejects_post(self) -> None:
+        """Only GET should be allowed."""
+        response = self.client.post(reverse("metrics"))
+        self.assertEqual(response.status_code, 405)
+
+
+def speech(secs: float) -> np.ndarray:
+    """Voice-band tone that WebRTC VAD classifies as speech."""
+    t = np.arange(int(16000 * secs)) / 16000
+    wave_ = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (8000 * wave_ / 1.5).astype(np.int16)
+
+
+class NumberingEngine(SpeechToText):
+    """Transcribes the n-th utterance as "utterance n"."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def transcribe(self, audio_bytes) -> str:
+        self.count += 1
+        return f"utterance {self.count}"
+
+    def preprocess_audio(self, audio_bytes: bytes) -> bytes:
+        return audio_bytes
+
+    def close(self) -> None:
+        pass
+
+
+class SkipFirstEngine(NumberingEngine):
+    """Hears nothing in the first utterance."""
+
+    def transcribe(self, audio_bytes) -> str:
+        text = super().transcribe(audio_bytes)
+        return "" if self.count == 1 else text
+
+
+class FailingEngine(NumberingEngine):
+    """Fails every decode."""
+
+    def transcribe(self, audio_bytes) -> str:
+        raise RuntimeError("model crashed")
+
+
+class CannedFeedbackClient:
+    """Streams fixed feedback in two pieces."""
+
+    response_cache = None
+
+    async def stream_feedback(self, user_text: str, topic: str):
+        yield f"{topic}: "
+        yield "well done"
+
+
+async def run_session(consumer, chunks: list[bytes]) -> list[dict]:
+    """Send a whole session to a consumer and return its events up to close."""
+    communicator = WebsocketCommunicator(
+        consumer.as_asgi(), "/ws/audio/", subprotocols=[PCM16]
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+    await communicator.send_json_to({"type": "start", "topic": "free"})
+    for chunk in chunks:
+        await communicator.send_to(bytes_data=chunk)
+    await communicator.send_json_to({"type": "end"})
+
+    events = []
+    while True:
+        message = await communicator.receive_output(timeout=10)
+        if message["type"] == "websocket.close":
+            break
+        events.append(json.loads(message["text"]))
+    await communicator.disconnect()
+    return events
+
+
+def two_utterances() -> list[bytes]:
+    silence = np.zeros(16000, np.int16)
+    return [chunk.tobytes() for chunk in [speech(1), silence, speech(1)]]
+
+
+def replies(events: list[dict]) -> list[tuple[str, str]]:
+    """Type and text of the events, without acks (their order varies)."""
+    return [(e["type"], e.get("text")) for e in events if e["type"] != "ack"]
+
+
+class AudioConsumerTests(SimpleTestCase):
+    """Sessions transcribed in the WebSocket process."""
+
+    def test_session_without_feedback_client(self) -> None:
+        """Without an LLM API key the session ends after the transcript."""
+        with (
+            mock.patch.object(consumers.scheduler, "engine", NumberingEngine()),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(run_session(consumers.AudioConsumer, two_utterances()))
+
+        self.assertEqual(events[0]["type"], "ack")
+        self.assertFalse(events[0]["feedback"])
+        self.assertEqual(
+            replies(events),
+            [
+                ("transcript", "utterance 1"),
+                ("transcript", "utterance 2"),
+                ("final_transcript", "utterance 1 utterance 2"),
+            ],
+        )
+
+    def test_transcripts_name_their_utterance(self) -> None:
+        """An utterance without text leaves a gap in the numbering."""
+        with (
+            mock.patch.object(consumers.scheduler, "engine", SkipFirstEngine()),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(run_session(consumers.AudioConsumer, two_utterances()))
+
+        transcripts = [e for e in events if e["type"] == "transcript"]
+        self.assertEqual(
+            [(e["text"], e["utterance"]) for e in transcripts], [("utterance 2", 1)]
+        )
+
+    def test_failed_transcription_is_reported(self) -> None:
+        """Decoding errors become error events and the session still ends."""
+        with (
+            mock.patch.object(consumers.scheduler, "engine", FailingEngine()),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(run_session(consumers.AudioConsumer, two_utterances()))
+
+        errors = [e["message"] for e in events if e["type"] == "error"]
+        self.assertEqual(errors, ["Transcription failed: model crashed"] * 2)
+        self.assertEqual(replies(events)[-1], ("final_transcript", ""))
+
+    def test_corrupt_packet_is_dropped(self) -> None:
+        """An undecodable message is reported and the session goes on."""
+        chunks = two_utterances()
+        chunks.insert(1, b"\x00\x01\x02")  # cut inside a sample
+        with (
+            mock.patch.object(consumers.scheduler, "engine", NumberingEngine()),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(run_session(consumers.AudioConsumer, chunks))
+
+        errors = [e for e in events if e["type"] == "error"]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("odd length", errors[0]["message"])
+        self.assertEqual(
+            replies(events)[-1], ("final_transcript", "utterance 1 utterance 2")
+        )
+
+
+class ChannelWorkerTests(SimpleTestCase):
+    """Sessions whose inference runs on channel-layer workers."""
+
+    async def serve(self, channel: str, worker) -> None:
+        """Deliver one channel's messages to a worker, like runworker."""
+        layer = get_channel_layer()
+        communicator = ApplicationCommunicator(
+            worker.as_asgi(), {"type": "channel", "channel": channel}
+        )
+        try:
+            while True:
+                await communicator.send_input(await layer.receive(channel))
+        finally:
+            communicator.stop(exceptions=False)
+
+    async def run_offloaded_session(
+        self, channels: tuple[str, ...] = ("transcribe", "feedback")
+    ) -> list[dict]:
+        """Run a session with workers serving only the given channels."""
+        served = {
+            "transcribe": (consumers.TRANSCRIBE_CHANNEL, TranscriptionWorker),
+            "feedback": (consumers.FEEDBACK_CHANNEL, FeedbackWorker),
+        }
+        workers = [asyncio.create_task(self.serve(*served[name])) for name in channels]
+        try:
+            return await run_session(consumers.OffloadedAudioConsumer, two_utterances())
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await get_channel_layer().flush()  # jobs nobody took
+
+    def test_offloaded_session(self) -> None:
+        """Transcripts and feedback come back from the workers in order."""
+        engine = NumberingEngine()
+        feedback = CannedFeedbackClient()
+        with (
+            mock.patch.object(consumers.scheduler, "engine", engine),
+            mock.patch.object(consumers, "ai_client", feedback),
+        ):
+            events = asyncio.run(self.run_offloaded_session())
+
+        self.assertEqual(events[0]["type"], "ack")
+        self.assertEqual(events[0]["streaming"], False)
+        # Acks of "end" may arrive before or after the first transcript
+        self.assertEqual(
+            replies(events),
+            [
+                ("transcript", "utterance 1"),
+                ("transcript", "utterance 2"),
+                ("final_transcript", "utterance 1 utterance 2"),
+                ("feedback_delta", "free_talk: "),
+                ("feedback_delta", "well done"),
+                ("feedback_done", "free_talk: well done"),
+            ],
+        )
+        transcripts = [e for e in events if e["type"] == "transcript"]
+        self.assertEqual([e["utterance"] for e in transcripts], [0, 1])
+        self.assertEqual(consumers.OffloadedAudioConsumer.jobs_in_flight, 0)
+
+    def test_worker_errors_are_reported(self) -> None:
+        """A failed transcription job becomes an error event."""
+        with (
+            mock.patch.object(consumers.scheduler, "engine", FailingEngine()),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(self.run_offloaded_session())
+
+        errors = [e["message"] for e in events if e["type"] == "error"]
+        self.assertEqual(len(errors), 2)
+        self.assertIn("model crashed", errors[0])
+        self.assertEqual(replies(events)[-1], ("final_transcript", ""))
+
+    def test_missing_transcripts_time_out(self) -> None:
+        """Without transcription workers the session ends at the deadline."""
+        with (
+            mock.patch.object(consumers, "REPLY_TIMEOUT_SECS", 0.2),
+            mock.patch.object(consumers, "ai_client", None),
+        ):
+            events = asyncio.run(self.run_offloaded_session(("feedback",)))
+
+        self.assertEqual(
+            [e["message"] for e in events if e["type"] == "error"],
+            ["2 utterance(s) not transcribed in time"],
+        )
+        self.assertEqual(replies(events)[-1], ("final_transcript", ""))
+        self.assertEqual(consumers.OffloadedAudioConsumer.jobs_in_flight, 0)
+
+    def test_missing_feedback_times_out(self) -> None:
+        """Without feedback workers the feedback ends with an error."""
+        feedback = CannedFeedbackClient()
+        with (
+            mock.patch.object(consumers.scheduler, "engine", NumberingEngine()),
+            mock.patch.object(consumers, "REPLY_TIMEOUT_SECS", 0.2),
+            mock.patch.object(consumers, "ai_client", feedback),
+        ):
+            events = asyncio.run(self.run_offloaded_session(("transcribe",)))
+
+        self.assertEqual(
+            replies(events)[-2:],
+            [
+                ("final_transcript", "utterance 1 utterance 2"),
+                ("feedback_done", "Error generating feedback"),
+            ],
+        )
+        self.assertTrue(events[-1]["error"])
+
+    def test_feedback_worker_without_client(self) -> None:
+        """A worker process without an API key answers with an error."""
+
+        async def request_feedback() -> dict:
+            layer = get_channel_layer()
+            reply_channel = await layer.new_channel()
+            worker = ApplicationCommunicator(
+                FeedbackWorker.as_asgi(),
+                {"type": "channel", "channel": consumers.FEEDBACK_CHANNEL},
+            )
+            await worker.send_input(
+                {
+                    "type": "feedback.request",
+                    "reply_channel": reply_channel,
+                    "text": "I like pasta",
+                    "topic": "free_talk",
+                }
+            )
+            try:
+                return await asyncio.wait_for(layer.receive(reply_channel), 5)
+            finally:
+                worker.stop(exceptions=False)
+
+        with mock.patch.object(consumers, "ai_client", None):
+            reply = asyncio.run(request_feedback())
+
+        self.assertEqual(reply["type"], "feedback.done")
+        self.assertEqual(reply["text"], "Feedback not configured")
+        self.assertTrue(reply["error"])
+
+    def test_refused_on_in_memory_layer(self) -> None:
+        """Workers in other processes cannot get jobs from an in-memory layer."""
+        workers = dict(settings.CHANNEL_WORKERS, ENABLED=True)
+        self.addCleanup(importlib.reload, routing)
+        with (
+            override_settings(CHANNEL_WORKERS=workers),
+            self.assertRaises(ImproperlyConfigured),
+        ):
+            importlib.reload(routing)
+
+
+class AdmissionTests(SimpleTestCase):
+    """Sessions refused while the process is at capacity."""
+
+    async def connect_two(self) -> tuple[bool, dict, dict]:
+        first = WebsocketCommunicator(consumers.AudioConsumer.as_asgi(), "/ws/audio/")
+        connected, _ = await first.connect()
+        second = WebsocketCommunicator(consumers.AudioConsumer.as_asgi(), "/ws/audio/")
+        await second.connect()
+        error = await second.receive_json_from()
+        close = await second.receive_output()
+        await second.wait()
+        await first.disconnect()
+        return connected, error, close
+
+    def test_refused_over_session_limit(self) -> None:
+        admission = AdmissionController(max_sessions=1)
+        with mock.patch.object(consumers, "admission", admission):
+            connected, error, close = asyncio.run(self.connect_two())
+
+        self.assertTrue(connected)
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(close, {"type": "websocket.close", "code": CLOSE_OVERLOADED})
+        self.assertEqual((admission.stats.admitted, admission.stats.rejected), (1, 1))
+        self.assertEqual(admission.active, 0)
+
+    async def connect_offloaded(self) -> dict:
+        communicator = WebsocketCommunicator(
+            consumers.OffloadedAudioConsumer.as_asgi(), "/ws/audio/"
+        )
+        await communicator.connect()
+        close = [await communicator.receive_output() for _ in range(2)][-1]
+        await communicator.wait()
+        return close
+
+    def test_offloaded_sessions_see_worker_backlog(self) -> None:
+        """Jobs waiting for worker replies count as the queue depth."""
+        admission = AdmissionController(max_queue_depth=2, policy="reject")
+        with (
+            mock.patch.object(consumers, "admission", admission),
+            mock.patch.object(consumers.OffloadedAudioConsumer, "jobs_in_flight", 2),
+        ):
+            close = asyncio.run(self.connect_offloaded())
+
+        self.assertEqual(close, {"type": "websocket.close", "code": CLOSE_OVERLOADED})
+        self.assertEqual(admission.stats.rejected, 1)
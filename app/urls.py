@@ -13,4 +13,5 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("select_topic", views.select_topic, name="select_topic"),
     path("speaking", views.speaking, name="speaking"),
+    path("metrics", views.metrics, name="metrics"),
 ]
@@ -7,6 +7,9 @@ for the root page of the application
 
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from .services.metrics import CONTENT_TYPE, metrics as pipeline_metrics
 
 
 def home(request: HttpRequest) -> HttpResponse:
@@ -28,3 +31,12 @@ def speaking(request: HttpRequest) -> HttpResponse:
     Handle requests to the speaking page
     """
     return render(request, "app/speaking.html")
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Expose pipeline latency histograms and gauges in the Prometheus text
+    format (see services/metrics.py)
+    """
+    return HttpResponse(pipeline_metrics.render(), content_type=CONTENT_TYPE)
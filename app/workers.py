@@ -0,0 +1,107 @@
+"""
+Channel-layer background workers for the 'app' Django application.
+
+`OffloadedAudioConsumer` publishes jobs on two channels, consumed by
+`python manage.py runworker stt-transcribe llm-feedback` on any node that
+shares the channel layer:
+
+    stt-transcribe   "transcribe.request": one utterance, answered with a
+                     "transcribe.result" event
+    llm-feedback     "feedback.request": the final transcript, answered
+                     with "feedback.delta" events and one "feedback.done"
+
+Replies go to the `reply_channel` of the request, i.e. the consumer that
+owns the WebSocket. Workers use the same lazily loaded speech-to-text
+scheduler and OpenAI client as the consumer module, looked up there on
+every job. Without an OpenAI API key in the worker process, feedback
+jobs are answered with a "feedback not configured" error.
+"""
+
+import asyncio
+from typing import Any, Coroutine
+
+from channels.consumer import AsyncConsumer
+
+from . import consumers
+from .services.inference_server import decode_segments
+
+
+class _JobConsumer(AsyncConsumer):
+    """
+    Runs each job in its own task: a consumer handles one message at a
+    time, and awaiting a job inline would keep concurrent jobs from being
+    batched (transcription) or streamed in parallel (feedback).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tasks: set[asyncio.Task] = set()
+
+    def spawn(self, job: Coroutine[Any, Any, None]) -> None:
+        """Run a job in the background, keeping a reference until done."""
+        task = asyncio.create_task(job)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+class TranscriptionWorker(_JobConsumer):
+    """Transcribes utterances published on the stt-transcribe channel."""
+
+    async def transcribe_request(self, message: dict) -> None:
+        self.spawn(self.transcribe(message))
+
+    async def transcribe(self, message: dict) -> None:
+        reply = {"type": "transcribe.result", "request_id": message["request_id"]}
+        try:
+            (segment,) = decode_segments(message["segments"], message["audio"])
+            result = await consumers.scheduler.submit(segment)
+            reply.update(
+                text=result.text,
+                wait_secs=result.wait_secs,
+                compute_secs=result.compute_secs,
+                model=result.model,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print("Transcription job failed:", e)
+            reply.update(text="", error=str(e))
+        await self.channel_layer.send(message["reply_channel"], reply)
+
+
+class FeedbackWorker(_JobConsumer):
+    """Streams LLM feedback for requests on the llm-feedback channel."""
+
+    async def feedback_request(self, message: dict) -> None:
+        self.spawn(self.feedback(message))
+
+    async def feedback(self, message: dict) -> None:
+        reply_channel = message["reply_channel"]
+        ai_client = consumers.ai_client
+        if ai_client is None:
+            print("[WARN] Feedback job refused: OPENAI_API_KEY is not set")
+            await self.channel_layer.send(
+                reply_channel,
+                {
+                    "type": "feedback.done",
+                    "text": "Feedback not configured",
+                    "error": True,
+                },
+            )
+            return
+        pieces = []
+        try:
+            async for delta in ai_client.stream_feedback(
+                message["text"], topic=message["topic"]
+            ):
+                pieces.append(delta)
+                await self.channel_layer.send(
+                    reply_channel, {"type": "feedback.delta", "text": delta}
+                )
+            done = {"type": "feedback.done", "text": "".join(pieces)}
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print("Error calling OpenAI:", e)
+            done = {
+                "type": "feedback.done",
+                "text": "Error generating feedback",
+                "error": True,
+            }
+        await self.channel_layer.send(reply_channel, done)